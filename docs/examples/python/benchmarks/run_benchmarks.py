@@ -0,0 +1,345 @@
+"""
+Run Benchmarks
+
+Measures requests/sec, p50/p99 request latency and peak memory for the
+fetch-and-analyze paths of the Python examples, against the local fake
+server in geoguessr.fakeserver instead of the live API. Each benchmark runs
+in its own process so memory figures do not leak between benchmarks, and
+the server runs in another so its work is not counted.
+
+Benchmarks:
+    duels        fetch_duels() with worker threads, then team and player stats from geoguessr.duelstats
+    async-duels  AsyncGeoGuessrClient.get_duel() with asyncio.gather, same analysis
+    replays      duels plus every player's replays, summarized with geoguessr.replay
+    highscores   stream_highscores() leaderboards, round stats and winners from geoguessr.challengestats
+    feed         friends feed pagination with payload parsing
+
+Usage:
+    python run_benchmarks.py
+    python run_benchmarks.py duels replays --latency 0.05 --jitter 0.02 --throttle-rate 0.02
+    python run_benchmarks.py --save before.json
+    python run_benchmarks.py --compare before.json
+
+Requires: pip install requests aiohttp numpy
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import (  # noqa: E402
+    GeoGuessrClient, Metrics, RateLimiter, endpoints, fastjson, fetch_duels, iter_concurrent, iter_replays, replay_keys,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace, 'LatencyRecorder'], Dict[str, int]]] = {}
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark function under a name."""
+    def register(fn: Callable) -> Callable:
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+class LatencyRecorder(Metrics):
+    """Metrics registry that also keeps every request latency for exact percentiles."""
+
+    def __init__(self):
+        super().__init__()
+        self.latencies: List[float] = []
+        self.retries = 0
+
+    def record_request(self, method: str, url: str, status: Any, seconds: float, size: int = 0) -> None:
+        self.latencies.append(seconds)
+        super().record_request(method, url, status, seconds, size)
+
+    def record_retry(self, method: str, url: str) -> None:
+        self.retries += 1
+        super().record_retry(method, url)
+
+
+def make_client(args: argparse.Namespace, metrics: LatencyRecorder) -> GeoGuessrClient:
+    limiter = RateLimiter(rate=args.rate, burst=args.rate)
+    return GeoGuessrClient('fake', pool_maxsize=args.workers, rate_limiter=limiter, metrics=metrics)
+
+
+def duel_ids(count: int) -> List[str]:
+    return [f'{index:024x}' for index in range(1, count + 1)]
+
+
+def analyze_duels(games: List[Dict]) -> None:
+    """Team damage and per-player score and rating summaries with geoguessr.duelstats."""
+    from geoguessr.duelstats import summarize_players, summarize_teams, to_duel_columns
+
+    if games:
+        columns = to_duel_columns(games)
+        summarize_teams(columns)
+        summarize_players(columns)
+
+
+@benchmark('duels')
+def bench_duels(args: argparse.Namespace, metrics: LatencyRecorder) -> Dict[str, int]:
+    client = make_client(args, metrics)
+    games = []
+    errors = 0
+    for result in fetch_duels(duel_ids(args.duels), client=client, max_workers=args.workers):
+        if result.error:
+            errors += 1
+            continue
+        games.append(result.data)
+    analyze_duels(games)
+    return {'items': len(games), 'errors': errors}
+
+
+@benchmark('async-duels')
+def bench_async_duels(args: argparse.Namespace, metrics: LatencyRecorder) -> Dict[str, int]:
+    from geoguessr.async_client import AsyncGeoGuessrClient
+
+    async def run() -> Dict[str, int]:
+        limiter = RateLimiter(rate=args.rate, burst=args.rate)
+        async with AsyncGeoGuessrClient('fake', per_host_limit=args.workers, rate_limiter=limiter,
+                                        metrics=metrics) as client:
+            results = await asyncio.gather(*(client.get_duel(game_id) for game_id in duel_ids(args.duels)),
+                                           return_exceptions=True)
+        games = [result for result in results if not isinstance(result, Exception)]
+        analyze_duels(games)
+        return {'items': len(games), 'errors': len(results) - len(games)}
+
+    return asyncio.run(run())
+
+
+@benchmark('replays')
+def bench_replays(args: argparse.Namespace, metrics: LatencyRecorder) -> Dict[str, int]:
+    from geoguessr.replay import ReplayColumns, summarize_replays, to_columns
+
+    client = make_client(args, metrics)
+    keys = []
+    errors = 0
+    for result in fetch_duels(duel_ids(args.replay_duels), client=client, max_workers=args.workers):
+        if result.error:
+            errors += 1
+            continue
+        keys.extend(replay_keys(result.key, result.data))
+
+    columns = []
+    for result in iter_replays(keys, client=client, max_workers=args.workers):
+        if result.error or not result.data:
+            errors += 1
+            continue
+        columns.append(to_columns(result.data))
+
+    if columns:
+        summarize_replays(ReplayColumns.concat(columns))
+    return {'items': len(columns), 'errors': errors}
+
+
+@benchmark('highscores')
+def bench_highscores(args: argparse.Namespace, metrics: LatencyRecorder) -> Dict[str, int]:
+    from geoguessr.challengestats import MATRIX_FIELDS, round_stats, round_winners, to_challenge_matrix
+    from geoguessr.highscores import stream_highscores
+
+    client = make_client(args, metrics)
+    tokens = [f'Challenge{index:07d}' for index in range(args.challenges)]
+
+    def fetch(token: str) -> None:
+        matrix = to_challenge_matrix(stream_highscores(token, fields=MATRIX_FIELDS, client=client))
+        round_stats(matrix)
+        round_winners(matrix)
+
+    items = errors = 0
+    for result in iter_concurrent(fetch, tokens, max_workers=args.workers):
+        if result.error:
+            errors += 1
+            continue
+        items += 1
+    return {'items': items, 'errors': errors}
+
+
+@benchmark('feed')
+def bench_feed(args: argparse.Namespace, metrics: LatencyRecorder) -> Dict[str, int]:
+    client = make_client(args, metrics)
+    types = Counter()
+    pagination_token = None
+    entries = 0
+
+    while True:
+        params = {'paginationToken': pagination_token} if pagination_token else None
+        page = client.get_json(endpoints.FRIENDS_FEED, params=params)
+        for entry in page['entries']:
+            types[entry['type']] += 1
+            fastjson.loads(entry['payload'])
+            entries += 1
+        pagination_token = page.get('paginationToken')
+        if not pagination_token or not page['entries']:
+            break
+
+    return {'items': entries, 'errors': 0}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_one(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one benchmark in this process and return its measurements."""
+    metrics = LatencyRecorder()
+    rss_before = peak_rss()
+
+    started = time.perf_counter()
+    counts = BENCHMARKS[name](args, metrics)
+    seconds = time.perf_counter() - started
+
+    rss_after = peak_rss()
+    requests = len(metrics.latencies)
+    p50, p99 = percentile(metrics.latencies, 0.5), percentile(metrics.latencies, 0.99)
+    return {
+        'name': name,
+        'requests': requests,
+        'items': counts['items'],
+        'errors': counts['errors'],
+        'retries': metrics.retries,
+        'seconds': seconds,
+        'requests_per_second': requests / seconds if seconds else None,
+        'items_per_second': counts['items'] / seconds if seconds else None,
+        'p50_ms': p50 * 1000 if p50 is not None else None,
+        'p99_ms': p99 * 1000 if p99 is not None else None,
+        'peak_memory_mb': (rss_after - rss_before) / 2 ** 20 if rss_before is not None else None,
+    }
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    """Start the fake server in a subprocess and wait for its base URL."""
+    command = [
+        sys.executable, '-m', 'geoguessr.fakeserver', '--port', '0', '--prepare',
+        '--latency', str(args.latency), '--jitter', str(args.jitter),
+        '--throttle-rate', str(args.throttle_rate), '--retry-after', str(args.retry_after),
+        '--error-rate', str(args.error_rate), '--duel-rounds', str(args.duel_rounds),
+        '--replay-events', str(args.replay_events), '--leaderboard-size', str(args.leaderboard_size),
+        '--feed-pages', str(args.feed_pages),
+    ]
+    process = subprocess.Popen(command, cwd=PYTHON_DIR, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Serving'):
+        process.kill()
+        raise RuntimeError('Fake server failed to start')
+    process.base_url = line.split()[-1]
+    return process
+
+
+def format_row(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    def cell(key: str, fmt: str) -> str:
+        value = result[key]
+        text = format(value, fmt) if value is not None else '-'
+        if baseline and baseline.get(key) and value is not None:
+            text += f' ({(value - baseline[key]) / baseline[key]:+.0%})'
+        return text
+
+    return (f"{result['name']:<12} {result['requests']:>8} {result['errors']:>6} {result['retries']:>7} "
+            f"{cell('requests_per_second', '.0f'):>14} {cell('p50_ms', '.1f'):>14} "
+            f"{cell('p99_ms', '.1f'):>14} {cell('peak_memory_mb', '.1f'):>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Python examples against a local fake server')
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--server', help='Base URL of an already running fake server')
+    parser.add_argument('--save', help='Write results to a JSON file')
+    parser.add_argument('--compare', help='Show changes against results saved with --save')
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+
+    load = parser.add_argument_group('load')
+    load.add_argument('--workers', type=int, default=16, help='Concurrent requests (default: 16)')
+    load.add_argument('--rate', type=float, default=10_000,
+                      help='Client rate limit per host in requests/sec (default: 10000)')
+    load.add_argument('--duels', type=int, default=500, help='Duels to fetch (default: 500)')
+    load.add_argument('--replay-duels', type=int, default=20, help='Duels whose replays are fetched (default: 20)')
+    load.add_argument('--challenges', type=int, default=100, help='Leaderboards to fetch (default: 100)')
+
+    server = parser.add_argument_group('fake server')
+    server.add_argument('--latency', type=float, default=0.0, help='Mean added latency in seconds')
+    server.add_argument('--jitter', type=float, default=0.0, help='Latency standard deviation in seconds')
+    server.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    server.add_argument('--retry-after', type=float, default=0.1, help='Retry-After sent with 429s')
+    server.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    server.add_argument('--duel-rounds', type=int, default=8)
+    server.add_argument('--replay-events', type=int, default=120)
+    server.add_argument('--leaderboard-size', type=int, default=50)
+    server.add_argument('--feed-pages', type=int, default=20)
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    if args.run:
+        print(json.dumps(run_one(args.run, args)))
+        return
+
+    process = None
+    base_url = args.server
+    if base_url is None:
+        process = start_server(args)
+        base_url = process.base_url
+
+    env = dict(os.environ, GEOGUESSR_WWW_API=base_url, GEOGUESSR_GAME_SERVER_API=base_url)
+    env.pop('GEOGUESSR_CACHE', None)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {result['name']: result for result in json.load(f)['results']}
+
+    print(f"Fake server: {base_url}")
+    print(f"{'benchmark':<12} {'requests':>8} {'errors':>6} {'retries':>7} "
+          f"{'req/s':>14} {'p50 ms':>14} {'p99 ms':>14} {'peak MB':>14}")
+
+    results = []
+    try:
+        for name in args.benchmarks or list(BENCHMARKS):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run', name] + sys.argv[1:],
+                                    env=env, stdout=subprocess.PIPE, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(format_row(result, baseline.get(name)), flush=True)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items() if k not in ('save', 'compare', 'run')},
+                       'results': results}, f, indent=2)
+        print(f"✅ Results saved to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
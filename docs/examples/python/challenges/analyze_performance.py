@@ -11,62 +11,79 @@ Requirements:
 """
 
 import requests
+import sys
 import os
-import statistics
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+from geoguessr.highscores import Leaderboard, stream_highscores  # noqa: E402
 
-def analyze_performance(challenge_token, cookie):
+# The only parts of each leaderboard item this analysis needs
+FIELDS = {
+    'player_id': 'game.player.id',
+    'nick': 'game.player.nick',
+    'score': 'game.player.totalScore.amount',
+}
+
+
+def get_leaderboard(challenge_token, cookie):
+    """
+    Fetch a challenge leaderboard indexed by player ID.
+
+    Build it once per challenge and pass it to analyze_performance() for
+    every player you answer for: rank, percentile and neighbours are then
+    O(log n) lookups instead of a scan of the full response.
+
+    Args:
+        challenge_token (str): The challenge token/ID
+        cookie (str): Your _ncfa cookie value
+
+    Returns:
+        Leaderboard: Ranked entries (see geoguessr.highscores)
+    """
+    return Leaderboard(stream_highscores(challenge_token, cookie, fields=FIELDS))
+
+
+def analyze_performance(challenge_token, cookie, leaderboard=None):
     """
     Analyze your performance on a challenge.
 
     Args:
         challenge_token (str): The challenge token/ID
         cookie (str): Your _ncfa cookie value
+        leaderboard (Leaderboard): Leaderboard from get_leaderboard(), fetched if not given
 
     Returns:
         dict: Performance statistics
     """
     try:
         # Get your profile
-        profile_response = requests.get(
-            'https://www.geoguessr.com/api/v3/profiles',
-            cookies={'_ncfa': cookie}
-        )
+        profile_response = get_client(cookie).get(endpoints.PROFILE)
         profile_response.raise_for_status()
         profile = profile_response.json()
         my_user_id = profile['user']['id']
 
-        # Get leaderboard
-        leaderboard_url = f'https://www.geoguessr.com/api/v3/results/highscores/{challenge_token}'
-        leaderboard_response = requests.get(leaderboard_url, cookies={'_ncfa': cookie})
-        leaderboard_response.raise_for_status()
-        data = leaderboard_response.json()
+        # Get leaderboard, keeping only the fields above from each item
+        if leaderboard is None:
+            leaderboard = get_leaderboard(challenge_token, cookie)
 
         # Find your entry
-        my_entry = None
-        my_rank = None
-
-        for index, item in enumerate(data['items']):
-            if item['game']['player']['id'] == my_user_id:
-                my_entry = item
-                my_rank = index + 1
-                break
+        my_rank = leaderboard.rank(my_user_id)
 
-        if not my_entry:
+        if my_rank is None:
             print('❌ You have not played this challenge yet.')
             return None
 
-        my_score = int(my_entry['game']['player']['totalScore']['amount'])
-        total_players = len(data['items'])
+        my_score = leaderboard.get(my_user_id)['score']
+        total_players = len(leaderboard)
 
         # Calculate statistics
-        scores = [int(item['game']['player']['totalScore']['amount']) for item in data['items']]
-        top_score = scores[0]
-        avg_score = statistics.mean(scores)
-        median_score = statistics.median(scores)
+        top_score = leaderboard.top_score
+        avg_score = leaderboard.mean_score
+        median_score = leaderboard.median_score
 
         # Calculate percentile
-        percentile = ((total_players - my_rank + 1) / total_players) * 100
+        percentile = leaderboard.percentile(my_user_id)
 
         # Display results
         print(f"\n📊 Your Performance Analysis\n")
@@ -85,17 +102,10 @@ def analyze_performance(challenge_token, cookie):
 
         # Show nearby players
         print(f"\n👥 Nearby Players:")
-        start = max(0, my_rank - 3)
-        end = min(total_players, my_rank + 2)
-
-        for index in range(start, end):
-            item = data['items'][index]
-            rank = index + 1
-            player = item['game']['player']
-            score = int(player['totalScore']['amount'])
-            indicator = '👉' if player['id'] == my_user_id else '  '
+        for rank, entry in leaderboard.neighbours(my_user_id, above=2, below=2):
+            indicator = '👉' if entry['player_id'] == my_user_id else '  '
 
-            print(f"{indicator} #{rank} {player['nick']}: {score:,}")
+            print(f"{indicator} #{rank} {entry['nick']}: {entry['score']:,}")
 
         return {
             'rank': my_rank,
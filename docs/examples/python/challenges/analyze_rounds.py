@@ -0,0 +1,90 @@
+"""
+Analyze Challenge Rounds
+
+Shows the winners and score statistics of every round of a challenge, and
+optionally one player's rank in each round.
+
+Usage:
+    python analyze_rounds.py TOKEN_OR_URL
+    python analyze_rounds.py TOKEN_OR_URL --player PLAYER_ID --top 5
+
+Requirements:
+    pip install requests numpy
+"""
+
+import argparse
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr.challengestats import (  # noqa: E402
+    MATRIX_FIELDS, round_ranks, round_stats, round_winners, to_challenge_matrix,
+)
+from geoguessr.highscores import stream_highscores  # noqa: E402
+
+
+def print_rounds(matrix, top=3):
+    """Print the top players and score statistics of each round."""
+    winners = round_winners(matrix, top=top)
+    stats = round_stats(matrix)
+
+    for r in range(matrix.round_count):
+        print(f"\n🎯 Round {r + 1} ({stats['players'][r]} guesses)")
+        for place, row in enumerate(winners['top'][r], start=1):
+            if row >= 0:
+                print(f"   {place}. {matrix.nicks[row]}: {int(matrix.score[row, r]):,}")
+        print(f"   Mean {stats['mean_score'][r]:,.0f} | Median {stats['median_score'][r]:,.0f} | "
+              f"Stdev {stats['stdev_score'][r]:,.0f} | Perfect {stats['perfect'][r]}")
+        print(f"   Median distance {stats['median_distance'][r] / 1000:,.1f} km | "
+              f"Median time {stats['median_time'][r]:.0f}s")
+
+
+def print_player_rounds(matrix, player_id):
+    """Print one player's score, distance, time and rank in each round."""
+    row = matrix.row(player_id)
+    if row < 0:
+        print(f"\n❌ {player_id} has not played this challenge.")
+        return
+
+    ranks = round_ranks(matrix)
+    print(f"\n👤 {matrix.nicks[row]} ({matrix.player_count} players)")
+    print(f"   {'Round':<6} {'Score':>6} {'Distance':>12} {'Time':>6} {'Rank':>8}")
+    for r in range(matrix.round_count):
+        if ranks[row, r] == 0:
+            print(f"   {r + 1:<6} {'-':>6}")
+            continue
+        print(f"   {r + 1:<6} {int(matrix.score[row, r]):>6} {matrix.distance[row, r] / 1000:>10.1f}km "
+              f"{matrix.time[row, r]:>5.0f}s {'#' + str(ranks[row, r]):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Round winners and per-round statistics of a challenge')
+    parser.add_argument('challenge', help='Challenge token or URL')
+    parser.add_argument('--player', help='Also show this player ID\'s rank in each round')
+    parser.add_argument('--top', type=int, default=3, help='Players to list per round (default: 3)')
+    args = parser.parse_args()
+
+    cookie = os.getenv('GEOGUESSR_COOKIE')
+    if not cookie:
+        print("❌ Error: GEOGUESSR_COOKIE environment variable not set")
+        print("Set it with: export GEOGUESSR_COOKIE='your_cookie_value'")
+        return
+
+    challenge_token = args.challenge.rstrip('/').split('/')[-1]
+
+    try:
+        matrix = to_challenge_matrix(stream_highscores(challenge_token, cookie, fields=MATRIX_FIELDS))
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request Error: {e}")
+        return
+
+    print(f"\n📊 {matrix.player_count} players, {matrix.round_count} rounds")
+    print_rounds(matrix, top=args.top)
+    if args.player:
+        print_player_rounds(matrix, args.player)
+
+
+if __name__ == '__main__':
+    main()
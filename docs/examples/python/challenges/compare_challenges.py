@@ -0,0 +1,118 @@
+"""
+Compare Challenges
+
+Fetches the settings and leaderboards of many challenges concurrently and
+compares them: one line per challenge with its map, settings and score
+statistics, then league standings of the players across all challenges.
+Tokens or URLs are read from the command line or, if none are given,
+streamed from stdin.
+
+Usage:
+    python compare_challenges.py TOKEN_OR_URL [TOKEN_OR_URL ...]
+    cat week_12.txt | python compare_challenges.py --workers 32 --csv week_12.csv
+
+Requirements:
+    pip install requests numpy
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import read_ids  # noqa: E402
+from geoguessr.challengestats import challenge_summary, fetch_challenge_dataset  # noqa: E402
+
+
+def settings_label(dataset, index):
+    """Short label such as 'NMPZ 60s' for a challenge's restrictions and time limit."""
+    moving, zooming, rotating = (dataset.forbid_moving[index], dataset.forbid_zooming[index],
+                                 dataset.forbid_rotating[index])
+    if moving and zooming and rotating:
+        label = 'NMPZ'
+    elif moving:
+        label = 'NM'
+    else:
+        label = 'Moving'
+    limit = dataset.time_limits[index]
+    return f"{label} {limit}s" if limit else label
+
+
+def print_challenges(dataset):
+    """Print map, settings and score statistics of every challenge."""
+    summary = challenge_summary(dataset)
+    print(f"\n{'Challenge':<18} {'Map':<28} {'Settings':<12} {'Players':>8} {'Top':>7} {'Mean':>7} {'Median':>7}")
+    for i in range(dataset.challenge_count):
+        if not summary['players'][i]:
+            print(f"{dataset.tokens[i]:<18} {str(dataset.map_names[i])[:28]:<28} {settings_label(dataset, i):<12} "
+                  f"{0:>8}")
+            continue
+        print(f"{dataset.tokens[i]:<18} {str(dataset.map_names[i])[:28]:<28} {settings_label(dataset, i):<12} "
+              f"{summary['players'][i]:>8} {summary['top_score'][i]:>7,.0f} {summary['mean_score'][i]:>7,.0f} "
+              f"{summary['median_score'][i]:>7,.0f}")
+
+
+def print_standings(dataset, top=20):
+    """Print the players with the highest total score across all challenges."""
+    player_ids, scores = dataset.pivot('score')
+    played = np.sum(~np.isnan(scores), axis=1)
+    totals = np.nansum(scores, axis=1)
+    order = np.lexsort((-played, -totals))[:top]
+
+    nicks = dict(zip(dataset.player_ids, dataset.nicks))
+    print(f"\n🏆 Standings over {dataset.challenge_count} challenges\n")
+    for place, row in enumerate(order, start=1):
+        print(f"{place:>3}. {nicks[player_ids[row]]:<20} {totals[row]:>10,.0f} "
+              f"({played[row]} played, avg {totals[row] / played[row]:,.0f})")
+
+
+def write_csv(dataset, path):
+    """Write one line per (challenge, player) with the challenge's map and settings."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['challenge', 'map_id', 'map_name', 'time_limit', 'forbid_moving', 'forbid_zooming',
+                         'forbid_rotating', 'player_id', 'nick', 'country', 'rank', 'score', 'distance', 'time']
+                        + [f'round_{r + 1}' for r in range(dataset.round_score.shape[1])])
+        for row in range(dataset.row_count):
+            c = dataset.challenge_index[row]
+            writer.writerow([dataset.tokens[c], dataset.map_ids[c], dataset.map_names[c], dataset.time_limits[c],
+                             dataset.forbid_moving[c], dataset.forbid_zooming[c], dataset.forbid_rotating[c],
+                             dataset.player_ids[row], dataset.nicks[row], dataset.countries[row],
+                             dataset.rank[row], dataset.score[row], dataset.distance[row], dataset.time[row]]
+                            + ['' if np.isnan(score) else int(score) for score in dataset.round_score[row]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch and compare many challenges concurrently')
+    parser.add_argument('challenges', nargs='*', help='Challenge tokens or URLs (default: read from stdin)')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent requests (default: 16)')
+    parser.add_argument('--top', type=int, default=20, help='Players in the standings (default: 20)')
+    parser.add_argument('--csv', help='Also write every (challenge, player) row to this CSV file')
+    args = parser.parse_args()
+
+    cookie = os.getenv('GEOGUESSR_COOKIE')
+    if not cookie:
+        print("❌ Error: GEOGUESSR_COOKIE environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    tokens = args.challenges or read_ids(sys.stdin)
+    dataset, errors = fetch_challenge_dataset(tokens, cookie, max_workers=args.workers)
+
+    for token, error in errors.items():
+        print(f"❌ {token}: {error}", file=sys.stderr)
+    print(f"✅ Fetched {dataset.challenge_count} challenges, {dataset.row_count} results ({len(errors)} failed)",
+          file=sys.stderr)
+
+    print_challenges(dataset)
+    if dataset.row_count:
+        print_standings(dataset, top=args.top)
+    if args.csv:
+        write_csv(dataset, args.csv)
+        print(f"\n💾 Saved {dataset.row_count} rows to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
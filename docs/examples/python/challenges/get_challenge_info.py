@@ -11,9 +11,13 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def get_challenge_info(challenge_token, cookie):
     """
@@ -27,9 +31,9 @@ def get_challenge_info(challenge_token, cookie):
         dict: Challenge information
     """
     try:
-        url = f'https://www.geoguessr.com/api/v3/challenges/{challenge_token}'
+        url = endpoints.CHALLENGE.format(token=challenge_token)
 
-        response = requests.get(url, cookies={'_ncfa': cookie})
+        response = get_client(cookie).get(url)
         response.raise_for_status()
 
         challenge = response.json()
@@ -7,18 +7,25 @@ Usage:
     python get_leaderboard.py
 
 Requirements:
-    pip install requests
+    pip install requests (watch_leaderboards also needs aiohttp)
 """
 
 import requests
+import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr.highscores import stream_highscores  # noqa: E402
+
 
 def get_challenge_leaderboard(challenge_token, cookie):
     """
     Fetch and display challenge leaderboard.
 
+    Entries are parsed as the response streams in, keeping only the fields
+    shown below, so large community challenges are never held in memory whole.
+
     Args:
         challenge_token (str): The challenge token/ID
         cookie (str): Your _ncfa cookie value
@@ -27,30 +34,23 @@ def get_challenge_leaderboard(challenge_token, cookie):
         list: List of leaderboard entries
     """
     try:
-        url = f'https://www.geoguessr.com/api/v3/results/highscores/{challenge_token}'
-
-        response = requests.get(url, cookies={'_ncfa': cookie})
-        response.raise_for_status()
-
-        data = response.json()
-
         # Extract and format leaderboard
         leaderboard = []
-        for index, item in enumerate(data['items']):
-            player = item['game']['player']
+        for index, entry in enumerate(stream_highscores(challenge_token, cookie)):
+            created = entry['created']
             leaderboard.append({
                 'rank': index + 1,
-                'username': player['nick'],
-                'score': int(player['totalScore']['amount']),
-                'is_pro': player['isProUser'],
-                'country': player['countryCode'],
+                'username': entry['nick'],
+                'score': int(entry['score']),
+                'is_pro': entry['is_pro'],
+                'country': entry['country'],
                 'played_at': datetime.fromisoformat(
-                    item['game']['created'].replace('Z', '+00:00')
-                ).strftime('%Y-%m-%d %H:%M:%S')
+                    created.replace('Z', '+00:00')
+                ).strftime('%Y-%m-%d %H:%M:%S') if created else None
             })
 
         # Display results
-        print(f"\n🏆 Challenge Leaderboard ({len(data['items'])} players)\n")
+        print(f"\n🏆 Challenge Leaderboard ({len(leaderboard)} players)\n")
         print(f"{'Rank':<6} {'Username':<20} {'Score':<10} {'Pro':<5} {'Country'}")
         print("-" * 60)
 
@@ -80,6 +80,37 @@ def get_challenge_leaderboard(challenge_token, cookie):
         return None
 
 
+def watch_leaderboards(challenge_tokens, interval_seconds=5.0, top=10, players=()):
+    """
+    Watch live challenge leaderboards and print only what changes.
+
+    Instead of re-fetching and re-printing the whole leaderboard, each poll
+    is compared with a compact snapshot of the previous one: new results,
+    replaced results and rank changes in the top ranks (or of the given
+    players) are printed. Unchanged responses are not even parsed, and
+    quiet leaderboards are polled less and less often. Runs until
+    interrupted. Requires aiohttp (pip install aiohttp).
+
+    Args:
+        challenge_tokens (list): Challenge tokens/IDs to watch
+        interval_seconds (float): Seconds between polls while a leaderboard is changing
+        top (int): Report rank changes within this many top ranks
+        players (list): Player IDs whose rank changes are always reported
+    """
+    import asyncio
+
+    from geoguessr.challengemonitor import LeaderboardMonitor
+
+    print(f"Watching {len(challenge_tokens)} leaderboard(s)...")
+
+    monitor = LeaderboardMonitor(interval=interval_seconds, top=top, players=players)
+    monitor.subscribe(print)
+    try:
+        asyncio.run(monitor.run(challenge_tokens))
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
 def main():
     # Get credentials from environment variables
     cookie = os.getenv('GEOGUESSR_COOKIE')
@@ -104,3 +135,10 @@ def main():
 
 if __name__ == '__main__':
     main()
+
+
+# Watch leaderboards for new results and rank changes (pip install aiohttp)
+"""
+if __name__ == '__main__':
+    watch_leaderboards(['YOUR_CHALLENGE_TOKEN', 'YOUR_CHALLENGE_TOKEN_2'], interval_seconds=5, top=10)
+"""
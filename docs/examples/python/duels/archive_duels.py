@@ -0,0 +1,70 @@
+"""
+Archive Duels
+
+Keeps a local SQLite archive of duel game states up to date. Finished games
+already in the archive are skipped, games archived while in progress are
+re-fetched, and an interrupted run picks up where it stopped the next time
+it is started. Game IDs are read from the command line or, if none are
+given, streamed from stdin.
+
+Usage:
+    cat game_ids.txt | python archive_duels.py duels.sqlite
+    python archive_duels.py duels.sqlite --resume
+    python archive_duels.py duels.sqlite --export duels.ndjson
+
+Requires: pip install requests
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import read_ids  # noqa: E402
+from geoguessr.archive import DuelArchive  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync duel game states into a local archive')
+    parser.add_argument('archive', help='SQLite archive file (created if missing)')
+    parser.add_argument('game_ids', nargs='*', help='Duel game IDs (default: read from stdin)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Only finish the queue of an interrupted sync, without reading IDs')
+    parser.add_argument('--no-refresh', action='store_true',
+                        help='Do not re-fetch archived games that were still in progress')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent requests (default: 16)')
+    parser.add_argument('--export', metavar='PATH', help='Write every archived duel to PATH as NDJSON and exit')
+    args = parser.parse_args()
+
+    with DuelArchive(args.archive) as archive:
+        if args.export:
+            with open(args.export, 'wb') as f:
+                for body in archive.iter_bodies():
+                    f.write(body.strip() + b'\n')
+            print(f"✅ Exported {len(archive)} duels to {args.export}", file=sys.stderr)
+            return
+
+        cookie = os.getenv('GEOGUESSR_COOKIE')
+        if not cookie:
+            print("❌ Error: GEOGUESSR_COOKIE environment variable not set", file=sys.stderr)
+            sys.exit(1)
+
+        pending = len(archive.pending())
+        if pending:
+            print(f"Resuming {pending} queued duels", file=sys.stderr)
+
+        def report(result):
+            if result.error:
+                print(f"❌ {result.key}: {result.error}", file=sys.stderr)
+
+        game_ids = () if args.resume else args.game_ids or read_ids(sys.stdin)
+        result = archive.sync(game_ids, cookie, max_workers=args.workers, refresh=not args.no_refresh,
+                              progress=report)
+
+        print(f"✅ Fetched {result.fetched} duels, skipped {result.skipped} finished, "
+              f"{result.failed} failed, {result.remaining} still queued", file=sys.stderr)
+        print(f"   Archive: {archive.count('Finished')} finished, {len(archive)} total", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
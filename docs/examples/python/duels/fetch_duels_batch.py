@@ -0,0 +1,51 @@
+"""
+Batch Fetch Duels
+
+Fetches many duel game states concurrently and writes one JSON document per
+line (NDJSON) as each duel finishes. Game IDs are read from the command line
+or, if none are given, streamed from stdin.
+
+Usage:
+    python fetch_duels_batch.py GAME_ID [GAME_ID ...] > duels.ndjson
+    cat game_ids.txt | python fetch_duels_batch.py --workers 32 > duels.ndjson
+
+Requires: pip install requests
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import fetch_duels, read_ids  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch duel game states concurrently')
+    parser.add_argument('game_ids', nargs='*', help='Duel game IDs (default: read from stdin)')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent requests (default: 16)')
+    args = parser.parse_args()
+
+    cookie = os.getenv('GEOGUESSR_COOKIE')
+    if not cookie:
+        print("❌ Error: GEOGUESSR_COOKIE environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    game_ids = args.game_ids or read_ids(sys.stdin)
+    fetched = failed = 0
+
+    for result in fetch_duels(game_ids, cookie, max_workers=args.workers):
+        if result.error:
+            failed += 1
+            print(f"❌ {result.key}: {result.error}", file=sys.stderr)
+            continue
+
+        fetched += 1
+        sys.stdout.write(json.dumps(result.data, separators=(',', ':')) + '\n')
+
+    print(f"✅ Fetched {fetched} duels ({failed} failed)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
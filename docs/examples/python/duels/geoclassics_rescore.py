@@ -0,0 +1,82 @@
+"""
+Re-score Duels under GeoClassics Rules
+
+Replays archived duels under the rules of the GeoClassics Duels userscript
+(see docs/userscripts/geoclassics-duels.md) and compares rule variants:
+how many games each variant decides, how long they last, and how often
+the GeoClassics winner differs from the GeoGuessr winner. An increment of
+0 selects PINPOINTING rules.
+
+Usage:
+    python geoclassics_rescore.py duels.sqlite
+    python geoclassics_rescore.py duels.ndjson --increments 0 0.25 0.5 1 --tie-divisors 1 2 4
+    python geoclassics_rescore.py duels.sqlite --game GAME_ID --increments 0.5
+
+Requires: pip install requests numpy
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import DuelGame  # noqa: E402
+from geoguessr.archive import DuelArchive  # noqa: E402
+from geoguessr.geoclassics import (  # noqa: E402
+    GeoClassicsRules, compare_rules, geoclassics_summary, to_geoclassics_columns,
+)
+
+
+def load_games(source: str):
+    """Finished duels from a DuelArchive or an NDJSON file."""
+    if source.endswith(('.ndjson', '.jsonl')):
+        with open(source, 'rb') as f:
+            games = [DuelGame.decode(line) for line in f if line.strip()]
+        return [game for game in games if game.is_finished]
+    with DuelArchive(source) as archive:
+        return list(archive.iter_games(status='Finished'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-score duels under GeoClassics rule variants')
+    parser.add_argument('source', help='DuelArchive SQLite file or NDJSON file of duels')
+    parser.add_argument('--increments', type=float, nargs='+', default=[0.5, 1.0],
+                        help='roundWinMultiplierIncrement values (0 = PINPOINTING, default: 0.5 1)')
+    parser.add_argument('--tie-divisors', type=float, nargs='+', default=[2.0],
+                        help='Tie divisors (default: 2)')
+    parser.add_argument('--win-threshold', type=int, help="PINPOINTING points to win (default: each game's setting)")
+    parser.add_argument('--game', help='Show the final GeoClassics state of one game instead')
+    args = parser.parse_args()
+
+    rule_sets = [GeoClassicsRules(round_win_multiplier_increment=increment, tie_divisor=divisor,
+                                  win_threshold=args.win_threshold)
+                 for increment in args.increments for divisor in args.tie_divisors]
+
+    games = load_games(args.source)
+
+    if args.game:
+        game = next((game for game in games if game.game_id == args.game), None)
+        if game is None:
+            sys.exit(f'{args.game} is not a finished duel in {args.source}')
+        actual = game.winner.name if game.winner else None
+        print(f"=== {game.game_id} (GeoGuessr winner: {actual}) ===")
+        for rules in rule_sets:
+            print(f"  increment {rules.round_win_multiplier_increment:g}, tie divisor {rules.tie_divisor:g}: "
+                  f"{geoclassics_summary(game, rules)}")
+        return
+
+    columns = to_geoclassics_columns(games)
+    print(f"=== {columns.game_count} finished two-team duels ===")
+
+    table = compare_rules(columns, rule_sets)
+    print(f"\n  {'Mode':<12} {'Increment':>9} {'Tie Div':>8} {'Decided':>8} {'Avg Rounds':>11} "
+          f"{'Agreement':>10} {'Upsets':>7}")
+    for i, rules in enumerate(rule_sets):
+        mode = 'Classics' if rules.round_win_multiplier_increment > 0 else 'Pinpointing'
+        print(f"  {mode:<12} {rules.round_win_multiplier_increment:>9g} {rules.tie_divisor:>8g} "
+              f"{table['decided'][i] * 100:>7.1f}% {table['avg_rounds'][i]:>11.2f} "
+              f"{table['agreement'][i] * 100:>9.1f}% {table['upsets'][i]:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,15 +5,25 @@ Fetches complete replay data for a player's actions during a specific round.
 Includes camera movements, map interactions, and guess placement with timestamps.
 
 Usage: python get_duel_replay.py
-Requires: pip install requests
+Requires: pip install requests numpy
 """
 
+import math
 import os
 import requests
-from typing import Dict, List, Any
+import sys
+from typing import Dict, List, Any, Optional
 from collections import Counter
 import json
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client, iter_replays  # noqa: E402
+from geoguessr.countries import CountryIndex  # noqa: E402
+from geoguessr.geo import WORLD_MAX_ERROR_DISTANCE, score_pins  # noqa: E402
+from geoguessr.replay import PIN_POSITION, summarize_replay, to_columns  # noqa: E402
+
 
 def get_duel_replay(player_id: str, duel_id: str, round_number: int) -> List[Dict]:
     """
@@ -27,17 +37,15 @@ def get_duel_replay(player_id: str, duel_id: str, round_number: int) -> List[Dic
     Returns:
         list: Array of replay events with timestamps
     """
-    url = f"https://game-server.geoguessr.com/api/replays/{player_id}/{duel_id}/{round_number}"
+    url = endpoints.REPLAY.format(player_id=player_id, duel_id=duel_id, round_number=round_number)
 
-    cookies = {
-        '_ncfa': os.getenv('GEOGUESSR_COOKIE')
-    }
+    cookie = os.getenv('GEOGUESSR_COOKIE')
 
-    if not cookies['_ncfa']:
+    if not cookie:
         raise ValueError("GEOGUESSR_COOKIE environment variable not set")
 
     try:
-        response = requests.get(url, cookies=cookies)
+        response = get_client(cookie).get(url)
         response.raise_for_status()
 
         replay_events = response.json()
@@ -79,59 +87,43 @@ def analyze_player_behavior(events: List[Dict]) -> None:
         print("No events to analyze")
         return
 
-    # Calculate total time
-    start_time = events[0]['time']
-    end_time = events[-1]['time']
-    total_seconds = (end_time - start_time) / 1000
+    # Convert once to columns and compute every statistic in one pass
+    summary = summarize_replay(to_columns(events))
 
     print(f"\nTiming:")
-    print(f"  Total Time: {total_seconds:.1f}s")
-
-    # Find key events
-    guess_event = next((e for e in events if e['type'] == 'GuessWithLatLng'), None)
-    map_display_events = [e for e in events if e['type'] == 'MapDisplay']
-    pin_position_events = [e for e in events if e['type'] == 'PinPosition']
-    zoom_events = [e for e in events if e['type'] == 'PanoZoom']
+    print(f"  Total Time: {summary['total_seconds']:.1f}s")
 
     print(f"\nActions:")
-    map_opens = sum(1 for e in map_display_events if e['payload'].get('isActive'))
-    print(f"  Map Opens: {map_opens}")
-    print(f"  Pin Adjustments: {len(pin_position_events)}")
-    print(f"  Zoom Changes: {len(zoom_events)}")
+    print(f"  Map Opens: {summary['map_opens']}")
+    print(f"  Pin Adjustments: {summary['pin_adjustments']}")
+    print(f"  Zoom Changes: {summary['zoom_changes']}")
 
-    if guess_event:
-        guess_time = (guess_event['time'] - start_time) / 1000
-        print(f"  Time to Guess: {guess_time:.1f}s")
-        print(f"  Final Guess: {guess_event['payload']['lat']:.5f}, {guess_event['payload']['lng']:.5f}")
+    if not math.isnan(summary['time_to_guess']):
+        print(f"  Time to Guess: {summary['time_to_guess']:.1f}s")
+        print(f"  Final Guess: {summary['guess_lat']:.5f}, {summary['guess_lng']:.5f}")
 
     # Analyze map usage
-    first_map_open = next((e for e in map_display_events if e['payload'].get('isActive')), None)
-    if first_map_open:
-        map_open_time = (first_map_open['time'] - start_time) / 1000
+    if not math.isnan(summary['first_map_open']):
         print(f"\nMap Usage:")
-        print(f"  First Map Open: {map_open_time:.1f}s")
-
-        map_closes = sum(1 for e in map_display_events if not e['payload'].get('isActive'))
-        print(f"  Map Opens/Closes: {map_closes} times")
+        print(f"  First Map Open: {summary['first_map_open']:.1f}s")
+        print(f"  Map Opens/Closes: {summary['map_closes']} times")
 
     # Analyze camera movements
-    pov_events = [e for e in events if e['type'] == 'PanoPov']
-    if pov_events:
+    if summary['pov_changes']:
         print(f"\nCamera Movement:")
-        print(f"  POV Changes: {len(pov_events)}")
-
-        headings = [e['payload']['heading'] for e in pov_events]
-        heading_range = max(headings) - min(headings)
-        print(f"  Heading Range: {heading_range:.0f}°")
+        print(f"  POV Changes: {summary['pov_changes']}")
+        print(f"  Heading Range: {summary['heading_range']:.0f}°")
 
 
-def display_timeline(events: List[Dict], max_events: int = 20) -> None:
+def display_timeline(events: List[Dict], max_events: int = 20, countries: Optional[CountryIndex] = None) -> None:
     """
     Display replay timeline with key moments.
 
     Args:
         events: Replay events from get_duel_replay
         max_events: Maximum number of events to display
+        countries: Country index (see geoguessr.countries) to show the
+            country of each pin and guess
     """
     print('\n=== Replay Timeline ===')
 
@@ -147,6 +139,13 @@ def display_timeline(events: List[Dict], max_events: int = 20) -> None:
 
     events_to_show = important_events[:max_events]
 
+    # Resolve every pin and guess in one lookup
+    placed = [e['payload'] for e in events_to_show if e['type'] in ('PinPosition', 'GuessWithLatLng')]
+    placed_countries = iter(())
+    if countries is not None and placed:
+        codes = countries.lookup([p['lat'] for p in placed], [p['lng'] for p in placed])
+        placed_countries = iter(f" ({code.upper() or 'no country'})" for code in codes)
+
     for event in events_to_show:
         relative_time = (event['time'] - start_time) / 1000
         description = ''
@@ -158,8 +157,10 @@ def display_timeline(events: List[Dict], max_events: int = 20) -> None:
             description = '📍 Opened map' if payload.get('isActive') else '📍 Closed map'
         elif event_type == 'PinPosition':
             description = f"📌 Placed pin at {payload['lat']:.2f}, {payload['lng']:.2f}"
+            description += next(placed_countries, '')
         elif event_type == 'GuessWithLatLng':
             description = f"✅ FINAL GUESS at {payload['lat']:.2f}, {payload['lng']:.2f}"
+            description += next(placed_countries, '')
         elif event_type == 'PanoPosition':
             country = payload.get('countryCode', 'unknown').upper()
             description = f"🌍 Moved to {country}"
@@ -170,6 +171,37 @@ def display_timeline(events: List[Dict], max_events: int = 20) -> None:
         print(f"\n... and {len(important_events) - max_events} more events")
 
 
+def analyze_pin_progress(events: List[Dict], target_lat: float, target_lng: float,
+                         max_error: float = WORLD_MAX_ERROR_DISTANCE) -> None:
+    """
+    Score every pin placement to show how close the player got before guessing.
+
+    Args:
+        events: Replay events from get_duel_replay
+        target_lat, target_lng: Round location (rounds[].panorama in the duel state)
+        max_error: The map's maxErrorDistance (options.map.maxErrorDistance)
+    """
+    print('\n=== Pin Progress ===')
+
+    columns = to_columns(events)
+    pins = score_pins(columns, target_lat, target_lng, max_error)
+
+    if not pins['pin_count'][0]:
+        print("No pins placed")
+        return
+
+    start_time = columns.time[0]
+    for i in np.flatnonzero(columns.type == PIN_POSITION):
+        print(f"[{(columns.time[i] - start_time) / 1000:.1f}s] 📌 {pins['distance'][i] / 1000:,.1f} km "
+              f"({pins['score'][i]:.0f} pts)")
+
+    print(f"\nClosest Pin: {pins['closest_distance'][0] / 1000:,.1f} km ({pins['best_score'][0]:.0f} pts) "
+          f"at {pins['closest_time'][0]:.1f}s")
+    if not math.isnan(pins['final_distance'][0]):
+        print(f"Final Guess: {pins['final_distance'][0] / 1000:,.1f} km ({pins['final_score'][0]:.0f} pts)")
+        print(f"Points Lost After Closest Pin: {pins['best_score'][0] - pins['final_score'][0]:.0f}")
+
+
 def compare_player_replays(players: List[Dict[str, Any]]) -> None:
     """
     Compare replay events from multiple players in the same round.
@@ -179,17 +211,16 @@ def compare_player_replays(players: List[Dict[str, Any]]) -> None:
     """
     print('\n=== Comparing Player Replays ===')
 
-    replays = []
-    for player in players:
-        try:
-            events = get_duel_replay(
-                player['playerId'],
-                player['duelId'],
-                player['roundNumber']
-            )
-            replays.append((player, events))
-        except Exception as e:
-            print(f"Error fetching replay for {player['playerId']}: {e}")
+    # Fetch all replays concurrently
+    keys = [(p['playerId'], p['duelId'], p['roundNumber']) for p in players]
+    fetched = {}
+    for result in iter_replays(keys):
+        if result.error:
+            print(f"Error fetching replay for {result.key[0]}: {result.error}")
+        else:
+            fetched[result.key] = result.data
+
+    replays = [(player, fetched[key]) for player, key in zip(players, keys) if key in fetched]
 
     print('\nComparison Results:')
 
@@ -197,22 +228,15 @@ def compare_player_replays(players: List[Dict[str, Any]]) -> None:
         if not events:
             continue
 
-        start_time = events[0]['time']
-        end_time = events[-1]['time']
-        total_time = (end_time - start_time) / 1000
-
-        guess_event = next((e for e in events if e['type'] == 'GuessWithLatLng'), None)
-        guess_time = (guess_event['time'] - start_time) / 1000 if guess_event else None
-
-        map_opens = sum(1 for e in events if e['type'] == 'MapDisplay' and e['payload'].get('isActive'))
-        pin_adjustments = sum(1 for e in events if e['type'] == 'PinPosition')
+        summary = summarize_replay(to_columns(events))
+        guess_time = summary['time_to_guess']
 
         print(f"\nPlayer {i + 1} ({player['playerId'][:8]}...):")
-        print(f"  Total Time: {total_time:.1f}s")
-        print(f"  Time to Guess: {guess_time:.1f if guess_time else 'N/A'}s")
-        print(f"  Map Opens: {map_opens}")
-        print(f"  Pin Adjustments: {pin_adjustments}")
-        print(f"  Total Actions: {len(events)}")
+        print(f"  Total Time: {summary['total_seconds']:.1f}s")
+        print(f"  Time to Guess: {'N/A' if math.isnan(guess_time) else f'{guess_time:.1f}'}s")
+        print(f"  Map Opens: {summary['map_opens']}")
+        print(f"  Pin Adjustments: {summary['pin_adjustments']}")
+        print(f"  Total Actions: {summary['event_count']}")
 
 
 def export_replay_as_csv(events: List[Dict], filename: str = 'replay_events.csv') -> None:
@@ -268,13 +292,17 @@ def analyze_all_rounds(player_id: str, duel_id: str, total_rounds: int) -> None:
     """
     print(f"\n=== Analyzing all rounds for player {player_id[:8]}... ===")
 
+    # Fetch every round concurrently, then analyze in round order
+    keys = [(player_id, duel_id, round_num) for round_num in range(1, total_rounds + 1)]
+    results = {result.key[2]: result for result in iter_replays(keys)}
+
     for round_num in range(1, total_rounds + 1):
         print(f"\n--- Round {round_num} ---")
-        try:
-            events = get_duel_replay(player_id, duel_id, round_num)
-            analyze_player_behavior(events)
-        except Exception as e:
-            print(f"Error in round {round_num}: {e}")
+        result = results[round_num]
+        if result.error:
+            print(f"Error in round {round_num}: {result.error}")
+        else:
+            analyze_player_behavior(result.data)
 
 
 # ===== USAGE EXAMPLES =====
@@ -294,6 +322,7 @@ if __name__ == "__main__":
         print('\nAvailable analysis functions:')
         print('  analyze_player_behavior(events) - Analyze player actions')
         print('  display_timeline(events) - Show event timeline')
+        print('  analyze_pin_progress(events, lat, lng) - Score every pin placement')
         print('  export_replay_as_csv(events) - Export as CSV')
         print('  export_replay_as_json(events) - Export as JSON')
 
@@ -319,6 +348,32 @@ if __name__ == "__main__":
 """
 
 
+# Example 2b: How close did the player get before the final guess?
+"""
+from geoguessr import DuelGame
+
+if __name__ == "__main__":
+    game = DuelGame.from_dict(get_client().get_json(
+        endpoints.DUEL.format(game_id='6963ff12ec85cd5824375992')
+    ))
+    game_round = game.rounds[0]
+    events = get_duel_replay('5b68bcc7f438a60f64005817', game.game_id, game_round.round_number)
+    analyze_pin_progress(events, game_round.lat, game_round.lng, game.max_error_distance)
+"""
+
+
+# Example 2c: Show which country each pin and guess was in (offline)
+"""
+from geoguessr.countries import load_countries
+
+if __name__ == "__main__":
+    # GeoJSON country boundaries, e.g. Natural Earth ne_50m_admin_0_countries.geojson
+    countries = load_countries('ne_50m_admin_0_countries.geojson')
+    events = get_duel_replay('5b68bcc7f438a60f64005817', '6963ff12ec85cd5824375992', 1)
+    display_timeline(events, 30, countries=countries)
+"""
+
+
 # Example 3: Compare two players in the same round
 """
 if __name__ == "__main__":
@@ -360,3 +415,37 @@ if __name__ == "__main__":
     export_replay_as_csv(events, 'round1_replay.csv')
     export_replay_as_json(events, 'round1_replay.json')
 """
+
+
+# Example 6: Download every player's replay for every round of a duel
+"""
+if __name__ == "__main__":
+    from geoguessr import fetch_duel_replays
+
+    replays = fetch_duel_replays('6963ff12ec85cd5824375992', max_workers=32)
+
+    for player_id, rounds in replays.items():
+        print(f"\nPlayer {player_id[:8]}...:")
+        for round_num, events in rounds.items():
+            print(f"  Round {round_num}: {len(events) if events is not None else 'failed'} events")
+"""
+
+
+# Example 7: Stream every replay of many duels into one compressed dataset
+"""
+from geoguessr import fetch_duels, replay_keys
+from geoguessr.export import NdjsonReplayWriter, ParquetReplayWriter, export_replays
+
+if __name__ == "__main__":
+    duel_ids = ['6963ff12ec85cd5824375992', 'YOUR_GAME_ID_2']
+
+    # Use ParquetReplayWriter('replays_parquet/') for typed columns instead
+    with NdjsonReplayWriter('replays.ndjson.gz') as writer:
+        for duel in fetch_duels(duel_ids):
+            if duel.error:
+                print(f"Error fetching duel {duel.key}: {duel.error}")
+                continue
+
+            counts = export_replays(iter_replays(replay_keys(duel.key, duel.data)), writer)
+            print(f"Duel {duel.key}: {counts['events']} events from {counts['replays']} replays")
+"""
@@ -5,12 +5,17 @@ Fetches complete game state for a duel including teams, players,
 rounds, health, damage, and final results.
 
 Usage: python get_duel_state.py
-Requires: pip install requests
+Requires: pip install requests (monitor_games also needs aiohttp)
 """
 
 import os
 import requests
-from typing import Dict, List, Optional
+import sys
+from typing import Dict, List, Optional, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+from geoguessr.models import DuelGame, as_game  # noqa: E402
 
 
 def get_duel_game_state(game_id: str) -> Dict:
@@ -23,17 +28,15 @@ def get_duel_game_state(game_id: str) -> Dict:
     Returns:
         dict: Complete game data with teams, rounds, and results
     """
-    url = f"https://game-server.geoguessr.com/api/duels/{game_id}"
+    url = endpoints.DUEL.format(game_id=game_id)
 
-    cookies = {
-        '_ncfa': os.getenv('GEOGUESSR_COOKIE')
-    }
+    cookie = os.getenv('GEOGUESSR_COOKIE')
 
-    if not cookies['_ncfa']:
+    if not cookie:
         raise ValueError("GEOGUESSR_COOKIE environment variable not set")
 
     try:
-        response = requests.get(url, cookies=cookies)
+        response = get_client(cookie).get(url)
         response.raise_for_status()
 
         game_data = response.json()
@@ -99,60 +102,61 @@ def get_duel_game_state(game_id: str) -> Dict:
         raise
 
 
-def analyze_damage(game_data: Dict) -> None:
+def analyze_damage(game_data: Union[Dict, DuelGame]) -> None:
     """
     Analyze damage dealt across all rounds.
 
     Args:
-        game_data: Game data from get_duel_game_state
+        game_data: Game data from get_duel_game_state, or a DuelGame
     """
+    game = as_game(game_data)
     print('\n=== Damage Analysis ===')
 
-    for team in game_data['teams']:
-        total_damage = sum(r['damageDealt'] for r in team['roundResults'])
-        team_name = team['name'].upper()
+    for team in game.teams:
+        total_damage = team.total_damage
+        team_name = team.name.upper()
 
         print(f"\nTeam {team_name}:")
         print(f"  Total Damage Dealt: {total_damage}")
-        print(f"  Average per Round: {total_damage // len(team['roundResults'])}")
+        print(f"  Average per Round: {total_damage // len(team.round_results)}")
 
         # Find biggest damage round
-        max_damage_round = max(team['roundResults'], key=lambda r: r['damageDealt'])
-        print(f"  Biggest Hit: {max_damage_round['damageDealt']} "
-              f"(Round {max_damage_round['roundNumber']}, {max_damage_round['multiplier']}x)")
+        max_damage_round = max(team.round_results, key=lambda r: r.damage_dealt)
+        print(f"  Biggest Hit: {max_damage_round.damage_dealt} "
+              f"(Round {max_damage_round.round_number}, {max_damage_round.multiplier}x)")
 
 
-def display_player_stats(game_data: Dict) -> None:
+def display_player_stats(game_data: Union[Dict, DuelGame]) -> None:
     """
     Display player performance statistics.
 
     Args:
-        game_data: Game data from get_duel_game_state
+        game_data: Game data from get_duel_game_state, or a DuelGame
     """
+    game = as_game(game_data)
     print('\n=== Player Performance ===')
 
-    for team in game_data['teams']:
-        print(f"\nTeam {team['name'].upper()}:")
+    for team in game.teams:
+        print(f"\nTeam {team.name.upper()}:")
 
-        for player in team['players']:
-            valid_guesses = [g for g in player['guesses'] if g['score'] is not None]
+        for player in team.players:
+            valid_guesses = [g for g in player.guesses if g.score is not None]
 
             if valid_guesses:
-                total_score = sum(g['score'] for g in valid_guesses)
+                total_score = sum(g.score for g in valid_guesses)
                 avg_score = total_score / len(valid_guesses)
-                avg_distance = sum(g['distance'] for g in valid_guesses) / len(valid_guesses)
+                avg_distance = sum(g.distance for g in valid_guesses) / len(valid_guesses)
 
-                print(f"\n  Player {player['playerId'][:8]}...")
-                print(f"    Rating: {player['rating']}")
-                print(f"    Country: {player['countryCode'].upper()}")
+                print(f"\n  Player {player.player_id[:8]}...")
+                print(f"    Rating: {player.rating}")
+                print(f"    Country: {player.country_code.upper()}")
                 print(f"    Rounds Played: {len(valid_guesses)}")
                 print(f"    Average Score: {avg_score:.0f}")
                 print(f"    Average Distance: {avg_distance / 1000:.1f} km")
 
                 # Rating change
-                rating_change = player['progressChange'].get('rankedSystemProgress')
-                if rating_change:
-                    change = rating_change['gameModeRatingAfter'] - rating_change['gameModeRatingBefore']
+                change = player.rating_change
+                if change is not None:
                     print(f"    Rating Change: {'+' if change > 0 else ''}{change}")
 
 
@@ -172,37 +176,31 @@ def export_to_json(game_data: Dict, filename: str = 'duel_state.json') -> None:
     print(f"\n✓ Game data exported to {filename}")
 
 
-def monitor_game(game_id: str, interval_seconds: int = 10, max_checks: int = 100) -> None:
-    """
-    Monitor an ongoing game with periodic updates.
-
-    Args:
-        game_id: The duel game ID
-        interval_seconds: Seconds between checks
-        max_checks: Maximum number of checks before stopping
+def monitor_games(game_ids: List[str], interval_seconds: float = 2.0) -> Dict[str, DuelGame]:
     """
-    import time
+    Watch live duels and print only what changes.
 
-    print(f"Monitoring game {game_id}...")
+    All games are polled from one event loop. Each game is polled again
+    when its round timer runs out and less often while nothing happens;
+    finished games stop being polled and failing games are retried with
+    backoff. Requires aiohttp (pip install aiohttp).
 
-    for i in range(max_checks):
-        try:
-            data = get_duel_game_state(game_id)
+    Args:
+        game_ids: Duel game IDs, e.g. every game of a tournament bracket
+        interval_seconds: Seconds between polls while a game is changing
 
-            print(f"\n[Update {i+1}] Round {data['currentRoundNumber']} - Status: {data['status']}")
-            for team in data['teams']:
-                print(f"  Team {team['name']}: {team['health']} HP ({team['currentMultiplier']}x)")
+    Returns:
+        dict: Final state of each game, by game ID
+    """
+    import asyncio
 
-            if data['status'] == 'Finished':
-                print('\nGame finished! Stopping monitor.')
-                break
+    from geoguessr.monitor import DuelMonitor
 
-            if i < max_checks - 1:  # Don't sleep after last check
-                time.sleep(interval_seconds)
+    print(f"Monitoring {len(game_ids)} game(s)...")
 
-        except Exception as e:
-            print(f"Monitor error: {e}")
-            break
+    monitor = DuelMonitor(interval=interval_seconds)
+    monitor.subscribe(print)
+    return asyncio.run(monitor.run(game_ids))
 
 
 # ===== USAGE EXAMPLES =====
@@ -238,39 +236,41 @@ if __name__ == "__main__":
 """
 
 
-# Example 3: Monitor an ongoing game
+# Example 3: Monitor ongoing games (pip install aiohttp)
 """
 if __name__ == "__main__":
-    monitor_game('YOUR_GAME_ID', interval_seconds=10, max_checks=50)
+    monitor_games(['YOUR_GAME_ID', 'YOUR_GAME_ID_2'], interval_seconds=2)
 """
 
 
 # Example 4: Batch analysis of multiple games
+# fetch_duels() fetches concurrently and yields each duel as it finishes.
+# DuelGame keeps only the fields used here, so thousands of games fit in
+# a fraction of the memory of the response dicts.
+# See fetch_duels_batch.py for a command-line version that reads IDs from stdin.
 """
-def analyze_multiple_games(game_ids: List[str]) -> None:
-    results = []
-
-    for game_id in game_ids:
-        try:
-            print(f"\nAnalyzing game {game_id}...")
-            game_data = get_duel_game_state(game_id)
-
-            # Extract key metrics
-            winner = next(t for t in game_data['teams'] if t['id'] == game_data['result']['winningTeamId'])
-            results.append({
-                'game_id': game_id,
-                'winner': winner['name'],
-                'rounds': game_data['currentRoundNumber'],
-                'game_mode': game_data['options']['competitiveGameMode']
-            })
-
-        except Exception as e:
-            print(f"Error analyzing game {game_id}: {e}")
+from geoguessr import fetch_duels
+
+
+def analyze_multiple_games(game_ids: List[str]) -> List[DuelGame]:
+    games = []
+
+    for result in fetch_duels(game_ids, max_workers=16):
+        if result.error:
+            print(f"Error analyzing game {result.key}: {result.error}")
+            continue
+
+        game = DuelGame.from_dict(result.data)
+        if game.is_finished:
+            games.append(game)
 
     # Display summary
     print('\n=== Batch Analysis Summary ===')
-    for result in results:
-        print(f"Game {result['game_id']}: Winner {result['winner']}, {result['rounds']} rounds")
+    for game in games:
+        winner = game.winner.name if game.winner else 'draw'
+        print(f"Game {game.game_id}: Winner {winner}, {game.current_round_number} rounds ({game.game_mode})")
+
+    return games
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""
+Season Duel Statistics
+
+Computes statistics across many duels at once: per-player average score,
+win rate and rating change, damage by multiplier and, given country
+boundaries, which countries get confused for which. Duels are read from a
+DuelArchive (see archive_duels.py) or from an NDJSON file written by
+fetch_duels_batch.py.
+
+Usage:
+    python season_stats.py duels.sqlite
+    python season_stats.py duels.ndjson --top 50 --min-games 10
+    python season_stats.py duels.sqlite --countries ne_50m_admin_0_countries.geojson
+
+Requires: pip install requests numpy
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import DuelGame  # noqa: E402
+from geoguessr.archive import DuelArchive  # noqa: E402
+from geoguessr.countries import country_confusion, load_countries  # noqa: E402
+from geoguessr.duelstats import damage_by_multiplier, summarize_players, to_duel_columns  # noqa: E402
+
+
+def iter_ndjson_games(path: str):
+    """Yield finished duels from an NDJSON file, one duel per line."""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                game = DuelGame.decode(line)
+                if game.is_finished:
+                    yield game
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Season-long duel statistics')
+    parser.add_argument('source', help='DuelArchive SQLite file or NDJSON file of duels')
+    parser.add_argument('--top', type=int, default=20, help='Players to list (default: 20)')
+    parser.add_argument('--min-games', type=int, default=5, help='Minimum games to be listed (default: 5)')
+    parser.add_argument('--countries', metavar='PATH',
+                        help='Country boundaries (GeoJSON or compiled .npz) for country confusion statistics')
+    args = parser.parse_args()
+
+    if args.source.endswith(('.ndjson', '.jsonl')):
+        columns = to_duel_columns(iter_ndjson_games(args.source))
+    else:
+        with DuelArchive(args.source) as archive:
+            columns = to_duel_columns(archive.iter_games(status='Finished'))
+
+    print(f"=== {columns.game_count} finished duels, {columns.player_count} players ===")
+
+    players = summarize_players(columns)
+    eligible = np.flatnonzero(players['games'] >= args.min_games)
+    ranked = eligible[np.argsort(-players['avg_score'][eligible], kind='stable')][:args.top]
+
+    print(f"\nTop players by average score (at least {args.min_games} games):")
+    print(f"  {'Player':<10} {'Games':>6} {'Win %':>6} {'Avg Score':>10} {'Avg Dist':>10} {'Rating Δ':>9}")
+    for i in ranked:
+        print(f"  {players['player_id'][i][:8]:<10} {players['games'][i]:>6} "
+              f"{players['win_rate'][i] * 100:>5.0f}% {players['avg_score'][i]:>10.0f} "
+              f"{players['avg_distance'][i] / 1000:>8.1f}km {players['rating_change'][i]:>+9.0f}")
+
+    damage = damage_by_multiplier(columns)
+    print('\nDamage by multiplier:')
+    print(f"  {'Multiplier':>10} {'Rounds':>8} {'Avg Damage':>11} {'Max':>7}")
+    for i, multiplier in enumerate(damage['multiplier']):
+        print(f"  {multiplier:>9.1f}x {damage['rounds'][i]:>8} {damage['avg_damage'][i]:>11.0f} "
+              f"{damage['max_damage'][i]:>7}")
+
+    if args.countries:
+        print_country_confusion(columns, args.countries, args.top)
+
+
+def print_country_confusion(columns, countries_path: str, top: int) -> None:
+    """Print the countries most often guessed for each other."""
+    guessed = load_countries(countries_path).lookup(columns.guess_lat, columns.guess_lng)
+    known = columns.guess_target_country != ''
+    codes, counts = country_confusion(columns.guess_target_country[known], guessed[known])
+
+    actual_totals = counts.sum(axis=1)
+    correct = np.trace(counts)
+    print(f"\nCountry accuracy: {correct}/{known.sum()} guesses in the right country "
+          f"({correct / max(known.sum(), 1) * 100:.1f}%)")
+
+    np.fill_diagonal(counts, 0)
+    order = np.argsort(-counts, axis=None, kind='stable')[:top]
+    print('\nMost confused countries:')
+    print(f"  {'Actual':<8} {'Guessed':<10} {'Guesses':>8} {'Share':>6}")
+    for flat in order:
+        actual, guess = divmod(int(flat), len(codes))
+        if counts[actual, guess] == 0:
+            break
+        print(f"  {codes[actual].upper():<8} {codes[guess].upper() or '(none)':<10} {counts[actual, guess]:>8} "
+              f"{counts[actual, guess] / actual_totals[actual] * 100:>5.1f}%")
+
+
+if __name__ == '__main__':
+    main()
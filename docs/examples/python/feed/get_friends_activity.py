@@ -11,11 +11,15 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 import json
 from datetime import datetime
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, fastjson, get_client  # noqa: E402
+
 
 def get_friends_activity(cookie, pages=1):
     """
@@ -34,11 +38,11 @@ def get_friends_activity(cookie, pages=1):
 
         for page in range(pages):
             if pagination_token:
-                url = f'https://www.geoguessr.com/api/v4/feed/friends?paginationToken={pagination_token}'
+                url = f'{endpoints.FRIENDS_FEED}?paginationToken={pagination_token}'
             else:
-                url = 'https://www.geoguessr.com/api/v4/feed/friends'
+                url = endpoints.FRIENDS_FEED
 
-            response = requests.get(url, cookies={'_ncfa': cookie})
+            response = get_client(cookie).get(url)
             response.raise_for_status()
 
             data = response.json()
@@ -54,7 +58,7 @@ def get_friends_activity(cookie, pages=1):
         # Parse and display activities
         for entry in all_entries[:20]:  # Show first 20
             time_str = datetime.fromisoformat(entry['time'].replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M')
-            payload = json.loads(entry['payload'])
+            payload = fastjson.loads(entry['payload'])
 
             activity_text = ''
 
@@ -11,8 +11,12 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 # Preset configurations
 STREAK_PRESETS = {
@@ -55,7 +59,7 @@ def create_streak_game(cookie, settings=None):
         dict: Game state object
     """
     try:
-        url = 'https://www.geoguessr.com/api/v3/games/streak'
+        url = endpoints.STREAK_GAME
 
         # Default settings
         if settings is None:
@@ -67,11 +71,7 @@ def create_streak_game(cookie, settings=None):
                 'timeLimit': 0
             }
 
-        response = requests.post(
-            url,
-            json=settings,
-            cookies={'_ncfa': cookie}
-        )
+        response = get_client(cookie).post(url, json=settings)
         response.raise_for_status()
 
         game = response.json()
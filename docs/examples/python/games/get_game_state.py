@@ -11,9 +11,13 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def get_game_state(game_token, cookie):
     """
@@ -27,9 +31,9 @@ def get_game_state(game_token, cookie):
         dict: Game state object
     """
     try:
-        url = f'https://www.geoguessr.com/api/v3/games/{game_token}?client=web'
+        url = endpoints.GAME.format(token=game_token) + '?client=web'
 
-        response = requests.get(url, cookies={'_ncfa': cookie})
+        response = get_client(cookie).get(url)
         response.raise_for_status()
 
         game = response.json()
@@ -0,0 +1,66 @@
+"""
+GeoGuessr API helpers shared by the Python examples.
+
+Import the shared client instead of calling requests.get() directly so that
+connections to www.geoguessr.com and game-server.geoguessr.com are reused.
+
+Usage:
+    from geoguessr import get_client
+
+    client = get_client(os.getenv('GEOGUESSR_COOKIE'))
+    profile = client.get_json('https://www.geoguessr.com/api/v3/profiles')
+
+The asyncio client lives in geoguessr.async_client and needs aiohttp:
+
+    from geoguessr.async_client import AsyncGeoGuessrClient
+
+Requires: pip install requests
+"""
+
+from . import endpoints, fastjson
+from .batch import (
+    BatchResult, fetch_challenges, fetch_duel_replays, fetch_duels, iter_concurrent, iter_replays, read_ids,
+    replay_keys,
+)
+from .cache import ResponseCache, TtlPolicy
+from .client import GeoGuessrClient, get_client
+from .endpoints import GAME_SERVER_API, WWW_API
+from .metrics import Metrics, endpoint_label, get_metrics
+from .models import DuelGame, DuelGuess, DuelPlayer, DuelRound, DuelTeam, ReplayEvent, TeamRoundResult
+from .ratelimit import RateLimiter, RetryPolicy, TokenBucket, get_rate_limiter
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+__all__ = [
+    'AsyncSingleFlight',
+    'BatchResult',
+    'DuelGame',
+    'DuelGuess',
+    'DuelPlayer',
+    'DuelRound',
+    'DuelTeam',
+    'GAME_SERVER_API',
+    'WWW_API',
+    'endpoint_label',
+    'endpoints',
+    'fastjson',
+    'fetch_challenges',
+    'fetch_duel_replays',
+    'fetch_duels',
+    'GeoGuessrClient',
+    'get_client',
+    'get_metrics',
+    'get_rate_limiter',
+    'iter_concurrent',
+    'iter_replays',
+    'Metrics',
+    'read_ids',
+    'ReplayEvent',
+    'replay_keys',
+    'RateLimiter',
+    'ResponseCache',
+    'RetryPolicy',
+    'SingleFlight',
+    'TeamRoundResult',
+    'TokenBucket',
+    'TtlPolicy',
+]
@@ -0,0 +1,292 @@
+"""
+Duel Archive
+
+Local SQLite archive of duel game states with resumable, incremental sync.
+Each game is stored once by gameId. Games already archived as Finished are
+never fetched again, and games archived while in progress are re-fetched on
+the next sync. IDs to fetch are written to a queue table before any request
+is made and removed as each game is stored, so an interrupted sync of
+thousands of IDs continues where it stopped.
+
+Usage:
+    with DuelArchive('~/geoguessr/duels.sqlite') as archive:
+        result = archive.sync(read_ids(open('game_ids.txt')))
+        print(result)
+        for game in archive.iter_games(status='Finished'):
+            ...
+
+Requires: pip install requests
+"""
+
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from . import endpoints, fastjson
+from .batch import BatchResult, iter_concurrent
+from .client import GeoGuessrClient, get_client
+from .models import DuelGame
+
+# IDs are queued and checked against the archive in chunks of this size
+CHUNK_SIZE = 500
+
+
+class SyncResult(NamedTuple):
+    """
+    Outcome of DuelArchive.sync().
+
+    Attributes:
+        fetched: Games fetched and stored
+        skipped: Requested games already archived as Finished
+        failed: Games whose fetch failed (retried on the next sync until
+            max_attempts is reached)
+        remaining: Games still queued after this run
+    """
+    fetched: int
+    skipped: int
+    failed: int
+    remaining: int
+
+
+class DuelArchive:
+    """
+    SQLite archive of duels, keyed by gameId.
+
+    Response bodies are stored zlib-compressed exactly as received. A stored
+    game is only replaced by a response with the same or a higher version.
+
+    Args:
+        path: SQLite database file (':memory:' for a temporary archive)
+    """
+
+    def __init__(self, path: str):
+        self.path = path if path == ':memory:' else os.path.expanduser(path)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS duels (
+                game_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                round_number INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS duels_status ON duels (status)')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS sync_queue (
+                game_id TEXT PRIMARY KEY,
+                queued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+        ''')
+
+    # ===== Reading =====
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM duels').fetchone()[0]
+
+    def __contains__(self, game_id: str) -> bool:
+        return self.status(game_id) is not None
+
+    def status(self, game_id: str) -> Optional[str]:
+        """Archived status of a game ('Finished', 'InProgress', ...), or None if not archived."""
+        row = self._db.execute('SELECT status FROM duels WHERE game_id = ?', (game_id,)).fetchone()
+        return row[0] if row else None
+
+    def count(self, status: Optional[str] = None) -> int:
+        """Number of archived games, optionally only those with the given status."""
+        if status is None:
+            return len(self)
+        return self._db.execute('SELECT COUNT(*) FROM duels WHERE status = ?', (status,)).fetchone()[0]
+
+    def get_body(self, game_id: str) -> Optional[bytes]:
+        """Raw response body of an archived game, or None if not archived."""
+        row = self._db.execute('SELECT body FROM duels WHERE game_id = ?', (game_id,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def get(self, game_id: str) -> Optional[Dict]:
+        """Decoded duel state of an archived game, or None if not archived."""
+        body = self.get_body(game_id)
+        return fastjson.loads(body) if body is not None else None
+
+    def iter_bodies(self, status: Optional[str] = None) -> Iterator[bytes]:
+        """Yield raw response bodies in gameId order, optionally filtered by status."""
+        if status is None:
+            rows = self._db.execute('SELECT body FROM duels ORDER BY game_id')
+        else:
+            rows = self._db.execute('SELECT body FROM duels WHERE status = ? ORDER BY game_id', (status,))
+        for (body,) in rows:
+            yield zlib.decompress(body)
+
+    def iter_duels(self, status: Optional[str] = None) -> Iterator[Dict]:
+        """Yield decoded duel states, optionally filtered by status."""
+        for body in self.iter_bodies(status):
+            yield fastjson.loads(body)
+
+    def iter_games(self, status: Optional[str] = None) -> Iterator[DuelGame]:
+        """Yield archived games as DuelGame models, optionally filtered by status."""
+        for body in self.iter_bodies(status):
+            yield DuelGame.decode(body)
+
+    # ===== Writing =====
+
+    def store(self, game_id: str, body: bytes, data: Optional[Dict] = None) -> bool:
+        """
+        Archive one duel response and remove it from the sync queue.
+
+        Args:
+            game_id: Duel game ID
+            body: Raw response body
+            data: Decoded body, if already decoded
+
+        Returns:
+            bool: False if a newer version of the game was already archived
+        """
+        if data is None:
+            data = fastjson.loads(body)
+
+        with self._transaction():
+            cursor = self._db.execute('''
+                INSERT INTO duels (game_id, status, version, round_number, body, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (game_id) DO UPDATE SET
+                    status = excluded.status, version = excluded.version, round_number = excluded.round_number,
+                    body = excluded.body, fetched_at = excluded.fetched_at
+                WHERE excluded.version >= duels.version
+            ''', (game_id, data['status'], data.get('version', 0), data.get('currentRoundNumber', 0),
+                  zlib.compress(body), time.time()))
+            self._db.execute('DELETE FROM sync_queue WHERE game_id = ?', (game_id,))
+        return cursor.rowcount > 0
+
+    def enqueue(self, game_ids: Iterable[str], refresh: bool = True) -> int:
+        """
+        Queue games for the next sync, skipping those archived as Finished.
+
+        Args:
+            game_ids: Duel game IDs (duplicates are queued once)
+            refresh: Also queue every archived game that was not finished
+
+        Returns:
+            int: Number of requested games skipped because they are finished
+        """
+        skipped = 0
+        chunk: List[str] = []
+
+        for game_id in game_ids:
+            chunk.append(game_id)
+            if len(chunk) >= CHUNK_SIZE:
+                skipped += self._enqueue_chunk(chunk)
+                chunk = []
+        if chunk:
+            skipped += self._enqueue_chunk(chunk)
+
+        if refresh:
+            self._db.execute('''
+                INSERT OR IGNORE INTO sync_queue (game_id, queued_at)
+                SELECT game_id, ? FROM duels WHERE status != 'Finished'
+            ''', (time.time(),))
+        return skipped
+
+    def _enqueue_chunk(self, game_ids: List[str]) -> int:
+        placeholders = ','.join('?' * len(game_ids))
+        finished = {row[0] for row in self._db.execute(
+            f"SELECT game_id FROM duels WHERE status = 'Finished' AND game_id IN ({placeholders})", game_ids
+        )}
+        now = time.time()
+        with self._transaction():
+            self._db.executemany('INSERT OR IGNORE INTO sync_queue (game_id, queued_at) VALUES (?, ?)',
+                                 ((game_id, now) for game_id in game_ids if game_id not in finished))
+        return sum(1 for game_id in game_ids if game_id in finished)
+
+    def pending(self) -> List[str]:
+        """IDs waiting in the sync queue, in the order they were queued."""
+        return [row[0] for row in self._db.execute('SELECT game_id FROM sync_queue ORDER BY rowid')]
+
+    def sync(self, game_ids: Iterable[str] = (), cookie: Optional[str] = None, max_workers: int = 16,
+             client: Optional[GeoGuessrClient] = None, refresh: bool = True, max_attempts: int = 3,
+             progress: Optional[Callable[[BatchResult], None]] = None) -> SyncResult:
+        """
+        Fetch new and unfinished games into the archive.
+
+        The given IDs are queued first (see enqueue()), then the whole queue
+        is fetched concurrently, including IDs left over from an interrupted
+        sync. Calling sync() with no IDs resumes the queue.
+
+        Args:
+            game_ids: Duel game IDs to add
+            cookie: Your _ncfa cookie value (defaults to GEOGUESSR_COOKIE)
+            max_workers: Maximum number of concurrent requests
+            client: Client to use instead of the shared one for the cookie
+            refresh: Re-fetch archived games that were not finished
+            max_attempts: Failed fetches after which a game leaves the queue
+            progress: Called with each BatchResult (data is the decoded duel)
+
+        Returns:
+            SyncResult: Counts for this run
+        """
+        client = client or get_client(cookie)
+        skipped = self.enqueue(game_ids, refresh)
+        fetched = failed = 0
+
+        def fetch(game_id: str) -> Any:
+            response = client.get(endpoints.DUEL.format(game_id=game_id))
+            response.raise_for_status()
+            return response.content, fastjson.loads(response.content)
+
+        for result in iter_concurrent(fetch, self.pending(), max_workers):
+            if result.error:
+                failed += 1
+                self._record_failure(result.key, result.error, max_attempts)
+            else:
+                fetched += 1
+                body, data = result.data
+                self.store(result.key, body, data)
+                result = result._replace(data=data)
+            if progress:
+                progress(result)
+
+        remaining = self._db.execute('SELECT COUNT(*) FROM sync_queue').fetchone()[0]
+        return SyncResult(fetched, skipped, failed, remaining)
+
+    def _record_failure(self, game_id: str, error: BaseException, max_attempts: int) -> None:
+        with self._transaction():
+            self._db.execute('UPDATE sync_queue SET attempts = attempts + 1, last_error = ? WHERE game_id = ?',
+                             (repr(error), game_id))
+            self._db.execute('DELETE FROM sync_queue WHERE game_id = ? AND attempts >= ?', (game_id, max_attempts))
+
+    def _transaction(self) -> '_Transaction':
+        return _Transaction(self._db)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> 'DuelArchive':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _Transaction:
+    """BEGIN ... COMMIT (or ROLLBACK on error) on an autocommit connection."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+
+    def __enter__(self) -> None:
+        self._db.execute('BEGIN')
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self._db.execute('ROLLBACK' if exc_type else 'COMMIT')
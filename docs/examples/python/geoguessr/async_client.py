@@ -0,0 +1,304 @@
+"""
+Async GeoGuessr Client
+
+asyncio counterpart of GeoGuessrClient built on aiohttp. Every documented
+read endpoint has a coroutine method, and a per-host concurrency limit lets
+one process keep hundreds of requests in flight without flooding a host.
+
+Usage:
+    async with AsyncGeoGuessrClient(cookie, per_host_limit=50) as client:
+        duels = await asyncio.gather(*(client.get_duel(gid) for gid in game_ids))
+
+Requires: pip install aiohttp
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from . import endpoints, fastjson
+from .metrics import Metrics, get_metrics
+from .ratelimit import RateLimiter, RetryPolicy, get_rate_limiter, parse_retry_after
+from .singleflight import AsyncSingleFlight
+
+
+class AsyncGeoGuessrClient:
+    """
+    Async client for the www and game-server GeoGuessr APIs.
+
+    Args:
+        cookie: Your _ncfa cookie value. Falls back to the GEOGUESSR_COOKIE
+            environment variable when omitted.
+        per_host_limit: Maximum concurrent requests per host
+        total_limit: Maximum concurrent requests overall (0 for no limit)
+        timeout: Total request timeout in seconds
+        rate_limiter: Per-host rate limiter (defaults to the process-wide one,
+            shared with GeoGuessrClient)
+        retry: Retry policy for 429/5xx and connection errors
+        metrics: Metrics registry (defaults to the process-wide one, shared
+            with GeoGuessrClient)
+    """
+
+    def __init__(self, cookie: Optional[str] = None, per_host_limit: int = 32,
+                 total_limit: int = 0, timeout: float = 30.0,
+                 rate_limiter: Optional[RateLimiter] = None, retry: Optional[RetryPolicy] = None,
+                 metrics: Optional[Metrics] = None):
+        self.cookie = cookie if cookie is not None else os.getenv('GEOGUESSR_COOKIE')
+        self.per_host_limit = per_host_limit
+        self.total_limit = total_limit
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics or get_metrics()
+        self.inflight = AsyncSingleFlight()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The underlying aiohttp session, created on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.total_limit, limit_per_host=self.per_host_limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                cookies={'_ncfa': self.cookie} if self.cookie else None,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> bytes:
+        """
+        Send a request and return the raw body.
+
+        Requests wait for the host's token bucket and are retried with
+        backoff on 429/5xx (only 429 for non-GET requests).
+
+        Args:
+            method: HTTP method
+            url: Absolute endpoint URL
+            **kwargs: Extra arguments passed to aiohttp.ClientSession.request
+
+        Returns:
+            bytes: The response body
+
+        Raises:
+            aiohttp.ClientResponseError: On a non-2xx response
+        """
+        bucket = self.rate_limiter.bucket(url)
+        idempotent = method in ('GET', 'HEAD')
+        attempt = 0
+
+        while True:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            started = time.perf_counter()
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    self.metrics.record_request(method, url, response.status,
+                                                time.perf_counter() - started, len(body))
+
+                    if response.status in self.retry.statuses:
+                        retry_after = parse_retry_after(response.headers)
+                        bucket.on_throttle(retry_after)
+
+                        retryable = idempotent or response.status == 429
+                        if retryable and attempt < self.retry.max_retries:
+                            self.metrics.record_retry(method, url)
+                            await asyncio.sleep(self.retry.backoff(attempt, retry_after))
+                            attempt += 1
+                            continue
+                    else:
+                        bucket.on_success()
+
+                    response.raise_for_status()
+                    return body
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.metrics.record_request(method, url, 'error', time.perf_counter() - started)
+                if not idempotent or attempt >= self.retry.max_retries:
+                    raise
+                self.metrics.record_retry(method, url)
+                bucket.on_throttle()
+                await asyncio.sleep(self.retry.backoff(attempt))
+                attempt += 1
+
+    async def request_json(self, method: str, url: str, **kwargs: Any) -> Any:
+        """Send a request and decode the JSON body (see request())."""
+        body = await self.request(method, url, **kwargs)
+        return fastjson.loads(body) if body.strip() else None
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        """
+        Send a GET request and decode the JSON body.
+
+        Concurrent calls for the same URL and parameters share one request
+        and one decoded result, so the returned object must not be modified.
+        """
+        params = kwargs.get('params')
+        key = (url, tuple(sorted(params.items())) if params else ())
+        return await self.inflight.do(key, lambda: self.request_json('GET', url, **kwargs))
+
+    async def post_json(self, url: str, **kwargs: Any) -> Any:
+        """Send a POST request and decode the JSON body."""
+        return await self.request_json('POST', url, **kwargs)
+
+    async def close(self) -> None:
+        """Close the session and all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> 'AsyncGeoGuessrClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    # ===== Profiles =====
+
+    async def get_profile(self) -> Dict:
+        """Fetch the authenticated user's profile."""
+        return await self.get_json(endpoints.PROFILE)
+
+    async def get_profile_maps(self) -> List[Dict]:
+        """Fetch maps created by the authenticated user."""
+        return await self.get_json(endpoints.PROFILE_MAPS)
+
+    async def search_users(self, query: str) -> List[Dict]:
+        """Search for users by username."""
+        return await self.get_json(endpoints.SEARCH_USERS, params={'q': query})
+
+    # ===== Games =====
+
+    async def get_game(self, token: str) -> Dict:
+        """Fetch the state of a standard or streak game."""
+        return await self.get_json(endpoints.GAME.format(token=token), params={'client': 'web'})
+
+    async def create_streak_game(self, settings: Dict) -> Dict:
+        """Create a new streak game with the given settings."""
+        return await self.post_json(endpoints.STREAK_GAME, json=settings)
+
+    async def get_infinity_challenges(self) -> Any:
+        """Fetch infinity mode challenges (deprecated endpoint)."""
+        return await self.get_json(endpoints.INFINITY_CHALLENGES)
+
+    # ===== Challenges =====
+
+    async def get_challenge(self, token: str) -> Dict:
+        """Fetch challenge settings and map information."""
+        return await self.get_json(endpoints.CHALLENGE.format(token=token))
+
+    async def get_challenge_highscores(self, token: str) -> Dict:
+        """Fetch the full leaderboard response for a challenge."""
+        return await self.get_json(endpoints.HIGHSCORES.format(token=token))
+
+    # ===== Duels =====
+
+    async def get_duel(self, game_id: str) -> Dict:
+        """Fetch the complete state of a duel."""
+        return await self.get_json(endpoints.DUEL.format(game_id=game_id))
+
+    async def get_duel_replay(self, player_id: str, duel_id: str, round_number: int) -> List[Dict]:
+        """Fetch replay events for one player in one duel round."""
+        return await self.get_json(endpoints.REPLAY.format(
+            player_id=player_id, duel_id=duel_id, round_number=round_number
+        ))
+
+    # ===== Maps =====
+
+    async def browse_maps(self, category: str = 'popular/all') -> List[Dict]:
+        """
+        Browse maps by category.
+
+        Args:
+            category: 'featured', 'popular/all' or 'popular/official'
+        """
+        return await self.get_json(endpoints.BROWSE_MAPS.format(category=category))
+
+    async def browse_popular_maps(self) -> List[Dict]:
+        """Fetch popular maps."""
+        return await self.browse_maps('popular/all')
+
+    async def browse_featured_maps(self) -> List[Dict]:
+        """Fetch featured maps."""
+        return await self.browse_maps('featured')
+
+    async def search_maps(self, query: str) -> List[Dict]:
+        """Search for maps by name or keywords."""
+        return await self.get_json(endpoints.SEARCH_MAPS, params={'q': query})
+
+    # ===== Feed =====
+
+    async def get_friends_activity(self, pagination_token: Optional[str] = None) -> Dict:
+        """
+        Fetch one page of the friends activity feed.
+
+        Args:
+            pagination_token: Token from the previous page (optional)
+
+        Returns:
+            dict: Feed page with 'entries' and, if more exist, 'paginationToken'
+        """
+        params = {'paginationToken': pagination_token} if pagination_token else None
+        return await self.get_json(endpoints.FRIENDS_FEED, params=params)
+
+    async def get_private_feed(self) -> Dict:
+        """Fetch the authenticated user's private feed."""
+        return await self.get_json(endpoints.PRIVATE_FEED)
+
+    async def get_likes(self) -> Any:
+        """Fetch the authenticated user's likes."""
+        return await self.get_json(endpoints.LIKES)
+
+    # ===== Social =====
+
+    async def get_friends_list(self) -> List[Dict]:
+        """Fetch the friends list."""
+        return await self.get_json(endpoints.FRIENDS)
+
+    async def get_friend_requests_received(self) -> List[Dict]:
+        """Fetch pending friend requests sent to you."""
+        return await self.get_json(endpoints.FRIEND_REQUESTS_RECEIVED)
+
+    async def get_friend_requests_sent(self) -> List[Dict]:
+        """Fetch pending friend requests you have sent."""
+        return await self.get_json(endpoints.FRIEND_REQUESTS_SENT)
+
+    async def get_friend_suggestions(self) -> List[Dict]:
+        """Fetch suggested friends."""
+        return await self.get_json(endpoints.FRIEND_SUGGESTIONS)
+
+    async def get_unclaimed_badges(self) -> List[Dict]:
+        """Fetch badges that have not been claimed yet."""
+        return await self.get_json(endpoints.BADGES_UNCLAIMED)
+
+    async def get_claimed_badges(self) -> List[Dict]:
+        """Fetch claimed badges."""
+        return await self.get_json(endpoints.BADGES_CLAIMED)
+
+    async def claim_badge(self, badge_id: str) -> Any:
+        """Claim an unclaimed badge."""
+        return await self.post_json(endpoints.BADGES_CLAIM, json={'badgeId': badge_id})
+
+    async def get_unfinished_games(self, offset: int = 0) -> Dict:
+        """Fetch one page of unfinished games."""
+        return await self.get_json(endpoints.UNFINISHED_GAMES, params={'offset': offset})
+
+    # ===== Subscriptions =====
+
+    async def check_subscription(self) -> Dict:
+        """Fetch the authenticated user's subscription status."""
+        return await self.get_json(endpoints.SUBSCRIPTION)
+
+    async def get_subscription_plans(self) -> List[Dict]:
+        """Fetch all available subscription plans."""
+        return await self.get_json(endpoints.SUBSCRIPTION_PLANS)
+
+    async def get_subscription_invoices(self) -> List[Dict]:
+        """Fetch the authenticated user's invoices."""
+        return await self.get_json(endpoints.SUBSCRIPTION_INVOICES)
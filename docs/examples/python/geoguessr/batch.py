@@ -0,0 +1,257 @@
+"""
+Batch Fetching
+
+Fetch many resources concurrently with a bounded thread pool and yield each
+result as soon as it finishes. Nothing is printed: failures are reported per
+item on the yielded result so one bad ID never stops a batch.
+
+Usage:
+    for result in fetch_duels(read_ids(sys.stdin), max_workers=16):
+        if result.error:
+            log(result.key, result.error)
+        else:
+            archive(result.data)
+
+Requires: pip install requests
+"""
+
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, TextIO, Tuple, TypeVar,
+)
+from urllib.parse import urlsplit
+
+from . import endpoints
+from .client import GeoGuessrClient, get_client
+from .highscores import LEADERBOARD_FIELDS, fetch_highscores
+
+
+K = TypeVar('K')
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of one item in a batch.
+
+    Attributes:
+        key: The input item (e.g. the duel ID)
+        data: Parsed response, or None if the fetch failed
+        error: The exception raised while fetching, or None on success
+    """
+    key: Any
+    data: Any
+    error: Optional[BaseException]
+
+
+def iter_concurrent(fetch: Callable[[K], Any], keys: Iterable[K],
+                    max_workers: int = 16) -> Iterator[BatchResult]:
+    """
+    Run fetch(key) for every key on a thread pool, yielding in completion order.
+
+    Keys are pulled from the iterable lazily, so at most max_workers fetches
+    are queued at once and a stream such as stdin is never read ahead.
+
+    Args:
+        fetch: Function that fetches and returns data for one key
+        keys: Iterable of keys (list, generator, file lines, ...)
+        max_workers: Maximum number of concurrent fetches
+
+    Yields:
+        BatchResult: One result per key, as each fetch finishes
+    """
+    keys = iter(keys)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(fetch, key): key for key in islice(keys, max_workers)}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key = pending.pop(future)
+                error = future.exception()
+                yield BatchResult(key, None if error else future.result(), error)
+
+            for key in islice(keys, len(done)):
+                pending[executor.submit(fetch, key)] = key
+
+
+def fetch_duels(game_ids: Iterable[str], cookie: Optional[str] = None, max_workers: int = 16,
+                client: Optional[GeoGuessrClient] = None) -> Iterator[BatchResult]:
+    """
+    Fetch duel game states concurrently.
+
+    Args:
+        game_ids: Iterable of duel game IDs
+        cookie: Your _ncfa cookie value (defaults to GEOGUESSR_COOKIE)
+        max_workers: Maximum number of concurrent requests
+        client: Client to use instead of the shared one for the cookie
+
+    Yields:
+        BatchResult: key is the game ID, data is the DuelGame dict
+    """
+    client = client or get_client(cookie)
+
+    def fetch(game_id: str) -> Any:
+        return client.get_json(endpoints.DUEL.format(game_id=game_id))
+
+    return iter_concurrent(fetch, game_ids, max_workers)
+
+
+def iter_replays(keys: Iterable[Tuple[str, str, int]], cookie: Optional[str] = None,
+                 max_workers: int = 16, client: Optional[GeoGuessrClient] = None) -> Iterator[BatchResult]:
+    """
+    Fetch duel replays concurrently.
+
+    Args:
+        keys: Iterable of (player_id, duel_id, round_number) tuples
+        cookie: Your _ncfa cookie value (defaults to GEOGUESSR_COOKIE)
+        max_workers: Maximum number of concurrent requests
+        client: Client to use instead of the shared one for the cookie
+
+    Yields:
+        BatchResult: key is the input tuple, data is the list of replay events
+    """
+    client = client or get_client(cookie)
+
+    def fetch(key: Tuple[str, str, int]) -> Any:
+        player_id, duel_id, round_number = key
+        return client.get_json(endpoints.REPLAY.format(
+            player_id=player_id, duel_id=duel_id, round_number=round_number
+        ))
+
+    return iter_concurrent(fetch, keys, max_workers)
+
+
+def replay_keys(duel_id: str, game_data: Dict) -> List[Tuple[str, str, int]]:
+    """
+    Build the (player_id, duel_id, round_number) key for every player and played round.
+
+    Args:
+        duel_id: The duel game ID
+        game_data: Duel state from the duels endpoint
+
+    Returns:
+        list: Keys for iter_replays()
+    """
+    player_ids = [player['playerId'] for team in game_data['teams'] for player in team['players']]
+    rounds = range(1, game_data['currentRoundNumber'] + 1)
+    return [(player_id, duel_id, round_number) for player_id in player_ids for round_number in rounds]
+
+
+def fetch_duel_replays(duel_id: str, cookie: Optional[str] = None, max_workers: int = 16,
+                       client: Optional[GeoGuessrClient] = None,
+                       game_data: Optional[Dict] = None) -> Dict[str, Dict[int, Optional[List[Dict]]]]:
+    """
+    Download every player's replay for every played round of a duel.
+
+    Player IDs and the round count are read from the duel state, then all
+    (player, round) replays are fetched concurrently.
+
+    Args:
+        duel_id: The duel game ID
+        cookie: Your _ncfa cookie value (defaults to GEOGUESSR_COOKIE)
+        max_workers: Maximum number of concurrent requests
+        client: Client to use instead of the shared one for the cookie
+        game_data: Duel state if already fetched (skips one request)
+
+    Returns:
+        dict: {player_id: {round_number: events}}. Rounds whose replay could
+        not be fetched map to None.
+    """
+    client = client or get_client(cookie)
+
+    if game_data is None:
+        game_data = client.get_json(endpoints.DUEL.format(game_id=duel_id))
+
+    keys = replay_keys(duel_id, game_data)
+
+    replays: Dict[str, Dict[int, Optional[List[Dict]]]] = {}
+    for player_id, _, round_number in keys:
+        replays.setdefault(player_id, {})[round_number] = None
+
+    for result in iter_replays(keys, max_workers=max_workers, client=client):
+        player_id, _, round_number = result.key
+        replays[player_id][round_number] = result.data
+
+    return replays
+
+
+def fetch_challenges(tokens: Iterable[str], cookie: Optional[str] = None,
+                     fields: Optional[Mapping[str, str]] = LEADERBOARD_FIELDS, max_workers: int = 16,
+                     client: Optional[GeoGuessrClient] = None) -> Iterator[BatchResult]:
+    """
+    Fetch the settings and leaderboards of many challenges concurrently.
+
+    The challenge info and highscores requests of every challenge run in
+    parallel with each other and with those of other challenges. Highscores
+    are read with fetch_highscores(), which keeps only the requested fields
+    of each entry and shares the list with concurrent callers for the same
+    challenge, so treat the entries as read-only.
+
+    Args:
+        tokens: Iterable of challenge tokens or URLs
+        cookie: Your _ncfa cookie value (defaults to GEOGUESSR_COOKIE)
+        fields: {name: dotted path} to keep from each leaderboard item (see geoguessr.highscores)
+        max_workers: Maximum number of concurrent requests
+        client: Client to use instead of the shared one for the cookie
+
+    Yields:
+        BatchResult: One per distinct challenge. key is the token, data is (challenge info,
+        list of leaderboard entries). error is the first failure of the
+        two requests, if any.
+    """
+    client = client or get_client(cookie)
+
+    def fetch(key: Tuple[str, str]) -> Any:
+        token, kind = key
+        if kind == 'info':
+            return client.get_json(endpoints.CHALLENGE.format(token=token))
+        return fetch_highscores(token, fields=fields, client=client)
+
+    def unique(tokens: Iterable[str]) -> Iterator[str]:
+        seen = set()
+        for token in map(_last_segment, tokens):
+            if token and token not in seen:
+                seen.add(token)
+                yield token
+
+    keys = ((token, kind) for token in unique(tokens) for kind in ('info', 'highscores'))
+    halves: Dict[str, BatchResult] = {}
+
+    for result in iter_concurrent(fetch, keys, max_workers):
+        token, kind = result.key
+        other = halves.pop(token, None)
+        if other is None:
+            halves[token] = result
+            continue
+        info, highscores = (result, other) if kind == 'info' else (other, result)
+        error = info.error or highscores.error
+        yield BatchResult(token, None if error else (info.data, highscores.data), error)
+
+
+def read_ids(stream: TextIO = sys.stdin) -> Iterator[str]:
+    """
+    Yield IDs from a text stream, one per line.
+
+    Blank lines and lines starting with '#' are skipped, and full URLs are
+    reduced to their last path segment.
+
+    Args:
+        stream: Text stream to read (default: stdin)
+
+    Yields:
+        str: One ID per non-empty line
+    """
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        yield _last_segment(line)
+
+
+def _last_segment(value: str) -> str:
+    """An ID from itself or from a URL ending in it, ignoring any query string or fragment."""
+    return urlsplit(value.strip()).path.rstrip('/').split('/')[-1]
@@ -0,0 +1,256 @@
+"""
+Persistent Response Cache
+
+SQLite-backed cache for GET responses, keyed by URL and account. Each
+endpoint gets its own time-to-live: finished duels and replays never change
+and are kept until evicted, while feeds and leaderboards expire quickly.
+The cache is bounded by entry count and total size and evicts the least
+recently used entries first.
+
+Usage:
+    client = GeoGuessrClient(cookie, cache=ResponseCache('~/.cache/geoguessr.sqlite'))
+
+    # Or let get_client() attach one for every example:
+    export GEOGUESSR_CACHE=~/.cache/geoguessr.sqlite
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, List, NamedTuple, Optional, Pattern, Tuple
+
+
+# Cache forever (until evicted)
+FOREVER = None
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+def _duel_ttl(data: Any) -> Optional[float]:
+    """Finished duels are immutable; live ones change every few seconds."""
+    if isinstance(data, dict) and data.get('status') == 'Finished':
+        return FOREVER
+    return 0
+
+
+# (URL pattern, TTL in seconds or a function of the decoded response).
+# The first matching rule wins. A TTL of 0 means "do not cache".
+DEFAULT_TTL_RULES: List[Tuple[str, Any]] = [
+    (r'/api/replays/', FOREVER),
+    (r'/api/duels/', _duel_ttl),
+    (r'/v3/results/highscores/', 1 * MINUTE),
+    (r'/v3/challenges/', 1 * DAY),
+    (r'/v4/feed/', 30),
+    (r'/v3/games/', 10),
+    (r'/v3/(social/)?maps/', 1 * HOUR),
+    (r'/v4/search/map', 1 * HOUR),
+    (r'/v3/search/user', 10 * MINUTE),
+    (r'/v3/subscriptions/plans', 1 * DAY),
+    (r'/v3/profiles', 5 * MINUTE),
+    (r'/v3/social/', 1 * MINUTE),
+]
+
+
+class CachedResponse(NamedTuple):
+    """A response body read from the cache."""
+    body: bytes
+    content_type: str
+    stored_at: float
+
+
+class TtlPolicy:
+    """
+    Picks a TTL for a response from URL rules.
+
+    Args:
+        rules: (regex, ttl) pairs where ttl is seconds, FOREVER (None), or a
+            function of the decoded JSON that returns either
+        default: TTL for URLs that match no rule
+    """
+
+    def __init__(self, rules: Optional[List[Tuple[str, Any]]] = None, default: Optional[float] = 0):
+        self.rules: List[Tuple[Pattern, Any]] = [
+            (re.compile(pattern), ttl) for pattern, ttl in (rules if rules is not None else DEFAULT_TTL_RULES)
+        ]
+        self.default = default
+
+    def __call__(self, url: str, data: Callable[[], Any]) -> Optional[float]:
+        """
+        Return the TTL for a response.
+
+        Args:
+            url: Full request URL
+            data: Function returning the decoded JSON body (only called for
+                rules that need to inspect the response)
+
+        Returns:
+            Seconds to keep the response, None to keep it forever, 0 to skip
+        """
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl(data()) if callable(ttl) else ttl
+        return self.default
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of GET responses stored in SQLite.
+
+    Safe to share between threads. Hit and miss counts are kept on the
+    instance. Limits are enforced every EVICT_INTERVAL writes, so the cache
+    may briefly hold a few more entries than max_entries.
+
+    Args:
+        path: SQLite database file (':memory:' for a process-local cache)
+        max_entries: Maximum number of cached responses
+        max_bytes: Maximum total size of cached bodies
+        ttl_policy: Function (url, data) -> TTL, defaults to TtlPolicy()
+    """
+
+    EVICT_INTERVAL = 64
+
+    def __init__(self, path: str, max_entries: int = 100_000, max_bytes: int = 1 << 30,
+                 ttl_policy: Optional[Callable[[str, Callable[[], Any]], Optional[float]]] = None):
+        self.path = path if path == ':memory:' else os.path.expanduser(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_policy = ttl_policy or TtlPolicy()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                content_type TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires_at)')
+        self._evict(time.time())
+
+    @staticmethod
+    def make_key(url: str, account: Optional[str]) -> str:
+        """Cache key for a URL as seen by an account (the cookie is hashed, never stored)."""
+        return hashlib.sha256(f"{account or ''}\0{url}".encode('utf-8')).hexdigest()
+
+    def get(self, url: str, account: Optional[str] = None) -> Optional[CachedResponse]:
+        """
+        Look up a fresh cached response.
+
+        Args:
+            url: Full request URL
+            account: Account the response belongs to (e.g. the _ncfa cookie)
+
+        Returns:
+            CachedResponse, or None on a miss or an expired entry
+        """
+        key = self.make_key(url, account)
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT body, content_type, stored_at, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            body, content_type, stored_at, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+
+            self._db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+            return CachedResponse(body, content_type, stored_at)
+
+    def put(self, url: str, account: Optional[str], body: bytes, content_type: str,
+            data: Callable[[], Any]) -> bool:
+        """
+        Store a response if its TTL policy allows it.
+
+        Args:
+            url: Full request URL
+            account: Account the response belongs to
+            body: Raw response body
+            content_type: Response Content-Type header
+            data: Function returning the decoded JSON body
+
+        Returns:
+            bool: True if the response was stored
+        """
+        ttl = self.ttl_policy(url, data)
+        if ttl is not None and ttl <= 0:
+            return False
+
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.make_key(url, account), url, body, content_type, len(body), now, expires_at, now),
+            )
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.EVICT_INTERVAL:
+                self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until within bounds."""
+        self._puts_since_evict = 0
+        self._db.execute('DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+
+        count, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+
+        # Evict down to 90% of the limits so the scan is not repeated on every put
+        max_entries, max_bytes = int(self.max_entries * 0.9), int(self.max_bytes * 0.9)
+        rows = self._db.execute('SELECT key, size FROM responses ORDER BY accessed_at')
+        doomed = []
+        for key, entry_size in rows:
+            if count <= max_entries and size <= max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            size -= entry_size
+
+        self._db.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
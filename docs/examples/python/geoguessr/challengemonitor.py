@@ -0,0 +1,339 @@
+"""
+Live Challenge Leaderboard Monitor
+
+Watches many challenge leaderboards from one event loop and reports only
+what changed between polls: new results, replaced results, players who
+left the leaderboard, and rank changes in the top of the board or of
+followed players. Polls that return the same body as the last one are
+recognized by a hash and never parsed. Each challenge schedules its own
+next poll: the base interval after a change, growing while nothing
+changes.
+
+Between polls only a compact LeaderboardSnapshot is kept per challenge
+(player IDs, game tokens and scores in rank order, about 50 bytes per
+entry), so thousands of challenges fit in memory.
+
+Usage:
+    monitor = LeaderboardMonitor(interval=5.0, top=10, players=[my_id])
+    monitor.subscribe(print)                               # every change
+    monitor.subscribe(post_to_discord, kinds=('new', 'rank'))
+    asyncio.run(monitor.run(challenge_tokens))             # until every challenge is unwatched
+
+Requires: pip install aiohttp
+"""
+
+import asyncio
+import hashlib
+import inspect
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import endpoints
+from .async_client import AsyncGeoGuessrClient
+from .highscores import LEADERBOARD_FIELDS, iter_highscores
+
+# Kinds of LeaderboardChange, in the order they are reported for one poll
+CHANGE_KINDS = ('started', 'new', 'replaced', 'removed', 'rank', 'error')
+
+_SEPARATOR = '\n'
+
+
+def _join(values: Iterable[str]) -> str:
+    return _SEPARATOR.join(values)
+
+
+def _split(value: str) -> List[str]:
+    return value.split(_SEPARATOR) if value else []
+
+
+class LeaderboardSnapshot(NamedTuple):
+    """
+    Compact state of a leaderboard at one poll.
+
+    Player IDs and game tokens are stored as one newline-joined string each
+    rather than one object per entry.
+
+    Attributes:
+        digest: Hash of the response body
+        player_ids: Player IDs in rank order, newline-joined
+        game_tokens: Game tokens aligned with player_ids, newline-joined
+        scores: Total scores aligned with player_ids (array of int32)
+    """
+    digest: bytes
+    player_ids: str
+    game_tokens: str
+    scores: array
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict[str, Any]], digest: bytes = b'') -> 'LeaderboardSnapshot':
+        """Snapshot of leaderboard entries in rank order (as from geoguessr.highscores)."""
+        return cls(digest, _join(entry['player_id'] for entry in entries),
+                   _join(entry['game_token'] or '' for entry in entries),
+                   array('i', (int(entry['score'] or 0) for entry in entries)))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def ids(self) -> List[str]:
+        """Player IDs in rank order."""
+        return _split(self.player_ids)
+
+    def tokens(self) -> List[str]:
+        """Game tokens in rank order."""
+        return _split(self.game_tokens)
+
+
+class LeaderboardChange(NamedTuple):
+    """
+    One change between two polls of a challenge leaderboard.
+
+    Attributes:
+        challenge: Challenge token
+        kind: One of CHANGE_KINDS
+        entry: Current leaderboard entry of the player (for 'removed', only
+            player_id and the previous score)
+        rank: Current 1-based rank (None for 'removed')
+        previous_rank: Rank at the previous poll (None for 'new')
+        data: Number of entries for 'started', (old score, new score) for
+            'replaced', the exception for 'error'
+    """
+    challenge: str
+    kind: str
+    entry: Optional[Dict[str, Any]] = None
+    rank: Optional[int] = None
+    previous_rank: Optional[int] = None
+    data: Any = None
+
+    def __str__(self) -> str:
+        prefix = f'[{self.challenge}]'
+        if self.kind == 'started':
+            return f'{prefix} Watching: {self.data} players'
+        name = (self.entry.get('nick') or self.entry['player_id'][:8]) if self.entry else ''
+        if self.kind == 'new':
+            return f"{prefix} New: #{self.rank} {name} {self.entry['score']:,}"
+        if self.kind == 'replaced':
+            return f'{prefix} {name}: {self.data[0]:,} -> {self.data[1]:,} (#{self.previous_rank} -> #{self.rank})'
+        if self.kind == 'removed':
+            return f'{prefix} {name} left the leaderboard (was #{self.previous_rank})'
+        if self.kind == 'rank':
+            return f'{prefix} {name}: #{self.previous_rank} -> #{self.rank}'
+        return f'{prefix} Error: {self.data!r}'
+
+
+def diff_leaderboards(challenge: str, old: Optional[LeaderboardSnapshot], new: LeaderboardSnapshot,
+                      entries: List[Dict[str, Any]], top: int = 10,
+                      players: Iterable[str] = ()) -> List[LeaderboardChange]:
+    """
+    List the changes between two polls of the same leaderboard.
+
+    Results are matched by player ID and game token: a player who was not
+    on the board is 'new', and a player whose game token or score changed
+    is 'replaced'. Rank changes of everyone else are only reported within
+    the top of the board (at either poll) and for the given players, since
+    one new result shifts every rank below it. Matching is done with set
+    and dict operations, so per-entry Python work is limited to what is
+    reported.
+
+    Args:
+        challenge: Challenge token
+        old: Previous snapshot, or None for the first poll (which reports only 'started')
+        new: Current snapshot
+        entries: Current entries in rank order, aligned with new (integer scores)
+        top: Number of top ranks whose rank changes are reported
+        players: Player IDs whose rank changes are reported wherever they are
+
+    Returns:
+        list: LeaderboardChange objects in CHANGE_KINDS order
+    """
+    if old is None:
+        return [LeaderboardChange(challenge, 'started', data=len(new))]
+    if old.player_ids == new.player_ids and old.game_tokens == new.game_tokens and old.scores == new.scores:
+        return []
+
+    old_ids, new_ids = old.ids(), new.ids()
+    old_rank = dict(zip(old_ids, range(len(old_ids))))
+    new_rank = dict(zip(new_ids, range(len(new_ids))))
+    results = set(zip(new_ids, new.tokens(), new.scores)) - set(zip(old_ids, old.tokens(), old.scores))
+
+    added, replaced = [], []
+    for player_id, _, score in results:
+        index = new_rank[player_id]
+        previous = old_rank.get(player_id)
+        if previous is None:
+            added.append(LeaderboardChange(challenge, 'new', entries[index], index + 1))
+        else:
+            replaced.append(LeaderboardChange(challenge, 'replaced', entries[index], index + 1, previous + 1,
+                                              (old.scores[previous], score)))
+
+    removed = []
+    for player_id in old_rank.keys() - new_rank.keys():
+        previous = old_rank[player_id]
+        entry = {'player_id': player_id, 'score': old.scores[previous]}
+        removed.append(LeaderboardChange(challenge, 'removed', entry, None, previous + 1))
+
+    watched = set(new_ids[:top]) | set(old_ids[:top]) | set(players)
+    watched.difference_update(player_id for player_id, _, _ in results)
+    moved = []
+    for player_id in watched:
+        index, previous = new_rank.get(player_id), old_rank.get(player_id)
+        if index is not None and previous is not None and index != previous:
+            moved.append(LeaderboardChange(challenge, 'rank', entries[index], index + 1, previous + 1))
+
+    def by_rank(change: LeaderboardChange) -> int:
+        return change.rank or change.previous_rank
+
+    return sorted(added, key=by_rank) + sorted(replaced, key=by_rank) + sorted(removed, key=by_rank) + \
+        sorted(moved, key=by_rank)
+
+
+Callback = Callable[[LeaderboardChange], Any]
+
+
+class LeaderboardMonitor:
+    """
+    Poll many challenge leaderboards concurrently and report their changes to callbacks.
+
+    Each watched challenge runs as its own task on the event loop, and all
+    of them share one AsyncGeoGuessrClient, so its per-host limit and rate
+    limiter apply to all of them.
+
+    Args:
+        client: Client to poll with (a new one is created and closed by run()
+            when omitted)
+        interval: Seconds between polls while a leaderboard is changing
+        max_interval: Longest delay between polls of an idle leaderboard
+        backoff: Factor the delay grows by after each poll without changes
+        top: Number of top ranks whose rank changes are reported
+        players: Player IDs whose rank changes are reported wherever they are
+        fields: Fields kept in each reported entry (see geoguessr.highscores);
+            player_id, game_token and score are always kept
+        max_errors: Consecutive failed polls after which a challenge is dropped
+    """
+
+    def __init__(self, client: Optional[AsyncGeoGuessrClient] = None, interval: float = 5.0,
+                 max_interval: float = 120.0, backoff: float = 1.5, top: int = 10, players: Iterable[str] = (),
+                 fields: Dict[str, str] = LEADERBOARD_FIELDS, max_errors: int = 5):
+        self.client = client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.top = top
+        self.players = frozenset(players)
+        self.fields = {**fields, **{name: LEADERBOARD_FIELDS[name] for name in ('player_id', 'game_token', 'score')}}
+        self.max_errors = max_errors
+        self.snapshots: Dict[str, LeaderboardSnapshot] = {}
+        self.polls = 0
+        self.parses = 0
+        self._callbacks: List[Tuple[Callback, Optional[frozenset]]] = []
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._client: Optional[AsyncGeoGuessrClient] = None
+
+    def subscribe(self, callback: Callback, kinds: Optional[Iterable[str]] = None) -> None:
+        """
+        Call callback(change) for every change, or only for the given kinds.
+
+        Callbacks may be plain functions or coroutine functions.
+        """
+        self._callbacks.append((callback, frozenset(kinds) if kinds is not None else None))
+
+    def watch(self, challenge: str) -> None:
+        """Start polling a challenge (from inside the running event loop)."""
+        if challenge not in self._tasks or self._tasks[challenge].done():
+            self._tasks[challenge] = asyncio.ensure_future(self._watch(challenge))
+
+    def unwatch(self, challenge: str) -> None:
+        """Stop polling a challenge and drop its snapshot."""
+        task = self._tasks.pop(challenge, None)
+        if task is not None:
+            task.cancel()
+        self.snapshots.pop(challenge, None)
+
+    async def run(self, challenges: Iterable[str] = ()) -> Dict[str, LeaderboardSnapshot]:
+        """
+        Watch the given challenges until every watched challenge has been
+        unwatched or dropped after max_errors failed polls.
+
+        Challenges added with watch() while running are waited for too.
+
+        Returns:
+            dict: Last snapshot of every challenge still known, by token
+        """
+        self._client = self.client or AsyncGeoGuessrClient()
+        try:
+            for challenge in challenges:
+                self.watch(challenge)
+            while True:
+                pending = [task for task in self._tasks.values() if not task.done()]
+                if not pending:
+                    break
+                await asyncio.wait(pending)
+            for task in self._tasks.values():
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            if self.client is None:
+                await self._client.close()
+            self._client = None
+        return self.snapshots
+
+    async def _emit(self, changes: List[LeaderboardChange]) -> None:
+        for change in changes:
+            for callback, kinds in self._callbacks:
+                if kinds is None or change.kind in kinds:
+                    result = callback(change)
+                    if inspect.isawaitable(result):
+                        await result
+
+    async def poll(self, challenge: str) -> List[LeaderboardChange]:
+        """
+        Fetch a leaderboard once, store its snapshot and return its changes.
+
+        The body is only parsed if its hash differs from the last poll's.
+        """
+        self.polls += 1
+        body = await self._client.request('GET', endpoints.HIGHSCORES.format(token=challenge))
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        old = self.snapshots.get(challenge)
+        if old is not None and old.digest == digest:
+            return []
+
+        self.parses += 1
+        entries = list(iter_highscores(body, self.fields))
+        for entry in entries:
+            entry['score'] = int(entry['score'] or 0)
+        new = LeaderboardSnapshot.from_entries(entries, digest)
+        self.snapshots[challenge] = new
+        return diff_leaderboards(challenge, old, new, entries, self.top, self.players)
+
+    async def _watch(self, challenge: str) -> None:
+        delay = None
+        errors = 0
+
+        while True:
+            try:
+                changes = await self.poll(challenge)
+            except Exception as e:
+                errors += 1
+                await self._emit([LeaderboardChange(challenge, 'error', data=e)])
+                if errors >= self.max_errors:
+                    return
+                await asyncio.sleep(min(self.interval * self.backoff ** errors, self.max_interval))
+                continue
+
+            errors = 0
+            await self._emit(changes)
+            delay = self.next_delay(None if changes else delay)
+            await asyncio.sleep(delay)
+
+    def next_delay(self, idle_delay: Optional[float] = None) -> float:
+        """
+        Seconds until the next poll of a leaderboard.
+
+        Args:
+            idle_delay: Previous delay if the last poll found no changes, or
+                None if it did
+
+        Returns:
+            float: interval after a change, growing by backoff while idle, capped at max_interval
+        """
+        return self.interval if idle_delay is None else min(idle_delay * self.backoff, self.max_interval)
@@ -0,0 +1,449 @@
+"""
+Columnar Challenge Statistics
+
+Turns a challenge highscores response into players x rounds matrices of
+score, distance and time, then computes round winners, per-round
+statistics and every player's rank in every round with vectorized
+operations instead of nested loops over players and rounds.
+
+Rows follow the leaderboard order and columns are rounds. Rounds a player
+has no guess for are NaN.
+
+For comparing many challenges, ChallengeDataset holds the leaderboards of
+all of them as one table with a row per (challenge, player), plus the map
+and settings of each challenge.
+
+Usage:
+    matrix = to_challenge_matrix(stream_highscores(token, fields=MATRIX_FIELDS))
+    winners = round_winners(matrix, top=3)
+    stats = round_stats(matrix)
+    ranks = round_ranks(matrix)         # ranks[player, round], 1 = best
+
+    dataset, errors = fetch_challenge_dataset(tokens, max_workers=16)
+    player_ids, scores = dataset.pivot('score')     # [players, challenges]
+
+Requires: pip install numpy
+"""
+
+import warnings
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .batch import fetch_challenges
+from .client import GeoGuessrClient
+from .highscores import project_items
+
+NAN = float('nan')
+
+# Fields to stream from each highscores item (see geoguessr.highscores)
+MATRIX_FIELDS = {
+    'player_id': 'game.player.id',
+    'nick': 'game.player.nick',
+    'round_count': 'game.roundCount',
+    'guesses': 'game.player.guesses',
+}
+
+# Fields to stream from each highscores item for a ChallengeDataset
+DATASET_FIELDS = {
+    'player_id': 'game.player.id',
+    'nick': 'game.player.nick',
+    'country': 'game.player.countryCode',
+    'game_token': 'game.token',
+    'score': 'game.player.totalScore.amount',
+    'distance': 'game.player.totalDistanceInMeters',
+    'time': 'game.player.totalTime',
+    'guesses': 'game.player.guesses',
+}
+
+
+class ChallengeMatrix:
+    """
+    Challenge results as players x rounds arrays.
+
+    Attributes:
+        player_ids, nicks: Player of each row, in leaderboard order (object arrays)
+        score: roundScoreInPoints (float64, NaN where the player has no guess)
+        distance: distanceInMeters (float64)
+        time: Seconds taken (float64)
+        timed_out: Whether the round timed out (bool)
+    """
+
+    __slots__ = ('player_ids', 'nicks', 'score', 'distance', 'time', 'timed_out')
+
+    def __init__(self, **columns: np.ndarray):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+
+    @property
+    def player_count(self) -> int:
+        return self.score.shape[0]
+
+    @property
+    def round_count(self) -> int:
+        return self.score.shape[1]
+
+    @property
+    def total_score(self) -> np.ndarray:
+        """Total score of each player (missing rounds count as 0)."""
+        return np.nansum(self.score, axis=1)
+
+    def row(self, player_id: str) -> int:
+        """Row of a player, -1 if they are not in the matrix."""
+        matches = np.flatnonzero(self.player_ids == player_id)
+        return int(matches[0]) if len(matches) else -1
+
+
+def to_challenge_matrix(source: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> ChallengeMatrix:
+    """
+    Build the matrices from a highscores response.
+
+    Args:
+        source: A decoded highscores response, or entries streamed with
+            fields=MATRIX_FIELDS (see geoguessr.highscores)
+
+    Returns:
+        ChallengeMatrix
+    """
+    if isinstance(source, Mapping) and 'items' in source:
+        source = project_items(source, MATRIX_FIELDS)
+
+    player_ids: List[str] = []
+    nicks: List[str] = []
+    rows: List[List[tuple]] = []
+    round_count = 0
+
+    for entry in source:
+        guesses = entry.get('guesses') or ()
+        player_ids.append(entry.get('player_id'))
+        nicks.append(entry.get('nick'))
+        rows.append([(guess.get('roundScoreInPoints', NAN), guess.get('distanceInMeters', NAN),
+                      guess.get('time', NAN), guess.get('timedOut', False)) for guess in guesses])
+        round_count = max(round_count, entry.get('round_count') or 0, len(guesses))
+
+    count = len(rows)
+    values = np.full((count, round_count, 4), NAN)
+    for number, row in enumerate(rows):
+        if row:
+            values[number, :len(row)] = np.array(row, dtype=np.float64)
+
+    return ChallengeMatrix(
+        player_ids=np.array(player_ids, dtype=object),
+        nicks=np.array(nicks, dtype=object),
+        score=values[:, :, 0].copy(),
+        distance=values[:, :, 1].copy(),
+        time=values[:, :, 2].copy(),
+        timed_out=values[:, :, 3] == 1,
+    )
+
+
+def round_winners(matrix: ChallengeMatrix, top: int = 3) -> Dict[str, np.ndarray]:
+    """
+    Best players of every round.
+
+    Ties go to the player higher on the leaderboard, as in the sorted
+    loops of the challenges guide.
+
+    Args:
+        matrix: Matrix from to_challenge_matrix()
+        top: Players to list per round
+
+    Returns:
+        dict: Arrays with one row per round: top (row indices of the best
+            players, [rounds, top], -1 where fewer players guessed),
+            top_score, and winner (= top[:, 0])
+    """
+    top = min(top, matrix.player_count)
+    # Missing guesses sort last
+    score = np.where(np.isnan(matrix.score), -np.inf, matrix.score)
+    order = np.argsort(-score, axis=0, kind='stable')[:top].T
+    top_score = np.take_along_axis(matrix.score.T, order, axis=1)
+    order = np.where(np.isnan(top_score), -1, order)
+    return {'winner': order[:, 0] if top else np.empty(0, dtype=np.intp), 'top': order, 'top_score': top_score}
+
+
+def round_stats(matrix: ChallengeMatrix) -> Dict[str, np.ndarray]:
+    """
+    Score, distance and time statistics of every round.
+
+    Args:
+        matrix: Matrix from to_challenge_matrix()
+
+    Returns:
+        dict: Arrays with one entry per round: players (guesses made),
+            mean_score, median_score, stdev_score (sample standard
+            deviation, as statistics.stdev), max_score, perfect (5000s),
+            mean_distance, median_distance, mean_time and median_time
+    """
+    with warnings.catch_warnings():
+        # Rounds nobody guessed in give NaN statistics
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return {
+            'players': np.sum(~np.isnan(matrix.score), axis=0),
+            'mean_score': np.nanmean(matrix.score, axis=0),
+            'median_score': np.nanmedian(matrix.score, axis=0),
+            'stdev_score': np.nanstd(matrix.score, axis=0, ddof=1),
+            'max_score': np.nanmax(matrix.score, axis=0) if matrix.player_count else np.full(matrix.round_count, NAN),
+            'perfect': np.sum(matrix.score == 5000, axis=0),
+            'mean_distance': np.nanmean(matrix.distance, axis=0),
+            'median_distance': np.nanmedian(matrix.distance, axis=0),
+            'mean_time': np.nanmean(matrix.time, axis=0),
+            'median_time': np.nanmedian(matrix.time, axis=0),
+        }
+
+
+def round_ranks(matrix: ChallengeMatrix) -> np.ndarray:
+    """
+    Each player's rank in each round by score.
+
+    Equal scores share a rank (1 + the number of better scores).
+
+    Args:
+        matrix: Matrix from to_challenge_matrix()
+
+    Returns:
+        np.ndarray: [players, rounds] ranks, 1 = best, 0 where the player has no guess (int32)
+    """
+    score = matrix.score
+    missing = np.isnan(score)
+    ranked = np.where(missing, -np.inf, score)
+    # For each score, count the scores greater than it in the same column
+    ordered = np.sort(ranked, axis=0)
+    ranks = np.empty(score.shape, dtype=np.int32)
+    for column in range(matrix.round_count):
+        greater = matrix.player_count - np.searchsorted(ordered[:, column], ranked[:, column], side='right')
+        ranks[:, column] = greater + 1
+    ranks[missing] = 0
+    return ranks
+
+
+def summarize_players(matrix: ChallengeMatrix) -> Dict[str, np.ndarray]:
+    """
+    Per-player statistics over their rounds (Example 3 of the challenges guide, for every player at once).
+
+    Args:
+        matrix: Matrix from to_challenge_matrix()
+
+    Returns:
+        dict: Arrays with one entry per player: total_score, average_score,
+            best_round and worst_round scores, perfect_guesses,
+            total_distance, total_time and round_wins (rounds where the
+            player had the top score, ties included)
+    """
+    score = matrix.score
+    guessed = ~np.isnan(score)
+    rounds = guessed.sum(axis=1)
+    filled_low = np.where(guessed, score, np.inf)
+    filled_high = np.where(guessed, score, -np.inf)
+
+    average = np.full(matrix.player_count, NAN)
+    np.divide(np.nansum(score, axis=1), rounds, out=average, where=rounds > 0)
+
+    return {
+        'player_id': matrix.player_ids,
+        'total_score': matrix.total_score,
+        'average_score': average,
+        'best_round': np.where(rounds > 0, filled_high.max(axis=1, initial=-np.inf), NAN),
+        'worst_round': np.where(rounds > 0, filled_low.min(axis=1, initial=np.inf), NAN),
+        'perfect_guesses': np.sum(score == 5000, axis=1),
+        'total_distance': np.nansum(matrix.distance, axis=1),
+        'total_time': np.nansum(matrix.time, axis=1),
+        'round_wins': np.sum(round_ranks(matrix) == 1, axis=1),
+    }
+
+
+class ChallengeDataset:
+    """
+    Leaderboards of many challenges as one table, a row per (challenge, player).
+
+    Rows of a challenge are contiguous and in rank order: rows
+    offsets[c]:offsets[c + 1] belong to challenge c.
+
+    Attributes:
+        tokens, names, map_ids, map_names, modes, creators: One per challenge (object arrays)
+        time_limits, round_counts: One per challenge (int32, time limit 0 = none)
+        forbid_moving, forbid_zooming, forbid_rotating: One per challenge (bool)
+        offsets: First row of each challenge, plus the row count (int64)
+        challenge_index: Challenge of each row (int32)
+        player_ids, nicks, countries, game_tokens: One per row (object arrays)
+        rank: 1-based rank within the challenge (int32)
+        score: Total score (int32)
+        distance: Total distance in meters (float64)
+        time: Total time in seconds (float64)
+        round_score: [rows, rounds] roundScoreInPoints (float64, NaN past a
+            challenge's last round or where the player has no guess)
+    """
+
+    __slots__ = (
+        'tokens', 'names', 'map_ids', 'map_names', 'modes', 'creators', 'time_limits', 'round_counts',
+        'forbid_moving', 'forbid_zooming', 'forbid_rotating', 'offsets',
+        'challenge_index', 'player_ids', 'nicks', 'countries', 'game_tokens', 'rank', 'score', 'distance', 'time',
+        'round_score',
+    )
+
+    def __init__(self, **columns: np.ndarray):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+
+    @property
+    def challenge_count(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.player_ids)
+
+    @property
+    def challenge(self) -> np.ndarray:
+        """Challenge token of each row."""
+        return self.tokens[self.challenge_index]
+
+    def rows(self, token: str) -> slice:
+        """Rows of a challenge (empty if it is not in the dataset)."""
+        matches = np.flatnonzero(self.tokens == token)
+        if not len(matches):
+            return slice(0, 0)
+        index = matches[0]
+        return slice(int(self.offsets[index]), int(self.offsets[index + 1]))
+
+    def row(self, token: str, player_id: str) -> int:
+        """Row of a player in a challenge, -1 if they have not played it."""
+        rows = self.rows(token)
+        matches = np.flatnonzero(self.player_ids[rows] == player_id)
+        return rows.start + int(matches[0]) if len(matches) else -1
+
+    def pivot(self, column: str = 'score') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One row per player and one column per challenge.
+
+        Args:
+            column: Per-row column to spread out (score, rank, distance or time)
+
+        Returns:
+            tuple: (player_ids, [players, challenges] float64 array, NaN
+            where the player has not played the challenge)
+        """
+        player_ids, player_index = np.unique(self.player_ids.astype(str), return_inverse=True)
+        table = np.full((len(player_ids), self.challenge_count), NAN)
+        table[player_index, self.challenge_index] = getattr(self, column)
+        return player_ids.astype(object), table
+
+
+def to_challenge_dataset(challenges: Iterable[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> ChallengeDataset:
+    """
+    Build a dataset from challenge info responses and leaderboards.
+
+    Args:
+        challenges: (challenge info, leaderboard entries streamed with
+            fields=DATASET_FIELDS) pairs, as in fetch_challenges() results
+
+    Returns:
+        ChallengeDataset, with challenges in the given order
+    """
+    meta: Dict[str, List[Any]] = {name: [] for name in ('tokens', 'names', 'map_ids', 'map_names', 'modes',
+                                                        'creators', 'time_limits', 'round_counts', 'forbid_moving',
+                                                        'forbid_zooming', 'forbid_rotating')}
+    offsets = [0]
+    rows: Dict[str, List[Any]] = {name: [] for name in ('challenge_index', 'player_ids', 'nicks', 'countries',
+                                                        'game_tokens', 'rank', 'score', 'distance', 'time')}
+    round_scores: List[List[float]] = []
+
+    for index, (info, entries) in enumerate(challenges):
+        meta['tokens'].append(info.get('token'))
+        meta['names'].append(info.get('name'))
+        meta['map_ids'].append(info.get('map'))
+        meta['map_names'].append(info.get('mapName'))
+        meta['modes'].append(info.get('mode'))
+        meta['creators'].append((info.get('creator') or {}).get('nick'))
+        meta['time_limits'].append(info.get('timeLimit') or 0)
+        meta['round_counts'].append(info.get('rounds') or 0)
+        meta['forbid_moving'].append(bool(info.get('forbidMoving')))
+        meta['forbid_zooming'].append(bool(info.get('forbidZooming')))
+        meta['forbid_rotating'].append(bool(info.get('forbidRotating')))
+
+        for rank, entry in enumerate(entries, start=1):
+            rows['challenge_index'].append(index)
+            rows['player_ids'].append(entry.get('player_id'))
+            rows['nicks'].append(entry.get('nick'))
+            rows['countries'].append(entry.get('country'))
+            rows['game_tokens'].append(entry.get('game_token'))
+            rows['rank'].append(rank)
+            rows['score'].append(int(entry.get('score') or 0))
+            rows['distance'].append(entry.get('distance', NAN))
+            rows['time'].append(entry.get('time', NAN))
+            round_scores.append([guess.get('roundScoreInPoints', NAN) for guess in entry.get('guesses') or ()])
+        offsets.append(len(round_scores))
+
+    round_count = max([len(scores) for scores in round_scores] + meta['round_counts'] + [0])
+    round_score = np.full((len(round_scores), round_count), NAN)
+    for number, scores in enumerate(round_scores):
+        round_score[number, :len(scores)] = scores
+
+    return ChallengeDataset(
+        **{name: np.array(meta[name], dtype=object) for name in
+           ('tokens', 'names', 'map_ids', 'map_names', 'modes', 'creators')},
+        time_limits=np.array(meta['time_limits'], dtype=np.int32),
+        round_counts=np.array(meta['round_counts'], dtype=np.int32),
+        forbid_moving=np.array(meta['forbid_moving'], dtype=bool),
+        forbid_zooming=np.array(meta['forbid_zooming'], dtype=bool),
+        forbid_rotating=np.array(meta['forbid_rotating'], dtype=bool),
+        offsets=np.array(offsets, dtype=np.int64),
+        challenge_index=np.array(rows['challenge_index'], dtype=np.int32),
+        **{name: np.array(rows[name], dtype=object) for name in ('player_ids', 'nicks', 'countries', 'game_tokens')},
+        rank=np.array(rows['rank'], dtype=np.int32),
+        score=np.array(rows['score'], dtype=np.int32),
+        distance=np.array(rows['distance'], dtype=np.float64),
+        time=np.array(rows['time'], dtype=np.float64),
+        round_score=round_score,
+    )
+
+
+def fetch_challenge_dataset(tokens: Iterable[str], cookie: Optional[str] = None, max_workers: int = 16,
+                            client: Optional[GeoGuessrClient] = None
+                            ) -> Tuple[ChallengeDataset, Dict[str, BaseException]]:
+    """
+    Fetch many challenges concurrently and merge them into one dataset.
+
+    Args:
+        tokens: Iterable of challenge tokens or URLs
+        cookie: Your _ncfa cookie value (defaults to GEOGUESSR_COOKIE)
+        max_workers: Maximum number of concurrent requests
+        client: Client to use instead of the shared one for the cookie
+
+    Returns:
+        tuple: (ChallengeDataset of the challenges that could be fetched,
+        in completion order, {token: error} for the ones that could not)
+    """
+    errors: Dict[str, BaseException] = {}
+
+    def fetched() -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        for result in fetch_challenges(tokens, cookie, DATASET_FIELDS, max_workers, client):
+            if result.error:
+                errors[result.key] = result.error
+                continue
+            info, entries = result.data
+            yield dict(info, token=info.get('token') or result.key), entries
+
+    return to_challenge_dataset(fetched()), errors
+
+
+def challenge_summary(dataset: ChallengeDataset) -> Dict[str, np.ndarray]:
+    """
+    Score statistics of every challenge in a dataset.
+
+    Args:
+        dataset: Dataset from fetch_challenge_dataset() or to_challenge_dataset()
+
+    Returns:
+        dict: Arrays with one entry per challenge: players, top_score,
+            mean_score and median_score (NaN for empty leaderboards)
+    """
+    players = np.diff(dataset.offsets)
+    summary = {'players': players, 'top_score': np.full(len(players), NAN),
+               'mean_score': np.full(len(players), NAN), 'median_score': np.full(len(players), NAN)}
+    for index in np.flatnonzero(players):
+        scores = dataset.score[dataset.offsets[index]:dataset.offsets[index + 1]]
+        summary['top_score'][index] = scores.max()
+        summary['mean_score'][index] = scores.mean()
+        summary['median_score'][index] = np.median(scores)
+    return summary
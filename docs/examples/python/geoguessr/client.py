@@ -0,0 +1,302 @@
+"""
+Shared GeoGuessr Client
+
+A thin wrapper around requests.Session that keeps a keep-alive connection
+pool per host and holds the _ncfa cookie in its cookie jar. One client can be
+shared by every example and by worker threads. Requests go through the
+process-wide rate limiter and are retried with backoff on 429/5xx,
+identical GETs issued concurrently are coalesced into one request, and every
+attempt is recorded in the process-wide metrics registry. Response bodies
+are decoded with the fastest JSON library installed (see geoguessr.fastjson).
+
+Requires: pip install requests
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import fastjson
+from .cache import CachedResponse, ResponseCache
+from .metrics import Metrics, get_metrics
+from .ratelimit import RateLimiter, RetryPolicy, get_rate_limiter, parse_retry_after
+from .singleflight import SingleFlight
+
+
+COOKIE_DOMAIN = '.geoguessr.com'
+
+
+class Response(requests.Response):
+    """A requests.Response whose json() decodes with geoguessr.fastjson."""
+
+    def json(self, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().json(**kwargs)
+        try:
+            return fastjson.loads(self.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(str(e), self.text, 0) from e
+
+
+class _Adapter(HTTPAdapter):
+    """HTTPAdapter that builds geoguessr Response objects."""
+
+    def build_response(self, req: Any, resp: Any) -> Response:
+        response = super().build_response(req, resp)
+        response.__class__ = Response
+        return response
+
+
+class GeoGuessrClient:
+    """
+    Pooled HTTP client for the GeoGuessr APIs.
+
+    Connections are kept alive between calls, so repeated requests to the
+    same host skip the TCP and TLS handshakes.
+
+    Args:
+        cookie: Your _ncfa cookie value (optional for public endpoints)
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Maximum open connections per host
+        timeout: Default request timeout in seconds
+        cache: ResponseCache for GET responses (optional)
+        rate_limiter: Per-host rate limiter (defaults to the process-wide one)
+        retry: Retry policy for 429/5xx and connection errors
+        metrics: Metrics registry (defaults to the process-wide one)
+    """
+
+    def __init__(self, cookie: Optional[str] = None, pool_connections: int = 4,
+                 pool_maxsize: int = 32, timeout: float = 30.0, cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None, retry: Optional[RetryPolicy] = None,
+                 metrics: Optional[Metrics] = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics or get_metrics()
+        self.inflight = SingleFlight()
+        self.session = requests.Session()
+
+        adapter = _Adapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if cookie:
+            self.set_cookie(cookie)
+
+    @property
+    def cookie(self) -> Optional[str]:
+        """The _ncfa cookie currently held in the cookie jar."""
+        return self.session.cookies.get('_ncfa', domain=COOKIE_DOMAIN)
+
+    def set_cookie(self, cookie: str) -> None:
+        """
+        Store the _ncfa cookie for both www and game-server hosts.
+
+        Args:
+            cookie: Your _ncfa cookie value
+        """
+        self.session.cookies.set('_ncfa', cookie, domain=COOKIE_DOMAIN)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request over the pooled session.
+
+        Args:
+            method: HTTP method
+            url: Absolute endpoint URL
+            **kwargs: Extra arguments passed to requests.Session.request
+
+        Returns:
+            requests.Response: The raw response (status is not checked).
+            Responses served from the cache have from_cache set to True.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+
+        # Streamed bodies are read by the caller, so they cannot be cached or shared
+        if method != 'GET' or kwargs.get('stream'):
+            return self._send(method, url, **kwargs)
+
+        # Identical GETs already in flight share one upstream request
+        full_url = _full_url(url, kwargs.pop('params', None))
+        return self.inflight.do(('response', full_url), lambda: self._get(full_url, **kwargs))
+
+    def _get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Serve a GET from the cache, or send it and store the response."""
+        if self.cache is None:
+            return self._send('GET', url, **kwargs)
+
+        cached = self.cache.get(url, self.cookie)
+        self.metrics.record_cache(url, cached is not None)
+        if cached is not None:
+            return _cached_response(url, cached)
+
+        response = self._send('GET', url, **kwargs)
+        response.from_cache = False
+        if response.status_code == 200:
+            self.cache.put(url, self.cookie, response.content,
+                           response.headers.get('Content-Type', 'application/json'), response.json)
+        return response
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request through the host's token bucket, retrying 429/5xx.
+
+        Only 429 is retried for non-GET requests, since the server may have
+        acted on a request that failed with a 5xx or a dropped connection.
+        """
+        bucket = self.rate_limiter.bucket(url)
+        idempotent = method in ('GET', 'HEAD')
+        attempt = 0
+
+        while True:
+            delay = bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.metrics.record_request(method, url, 'error', time.perf_counter() - started)
+                if not idempotent or attempt >= self.retry.max_retries:
+                    raise
+                self.metrics.record_retry(method, url)
+                bucket.on_throttle()
+                time.sleep(self.retry.backoff(attempt))
+                attempt += 1
+                continue
+
+            size = int(response.headers.get('Content-Length', 0)) if kwargs.get('stream') else len(response.content)
+            self.metrics.record_request(method, url, response.status_code, time.perf_counter() - started, size)
+
+            if response.status_code not in self.retry.statuses:
+                bucket.on_success()
+                return response
+
+            retry_after = parse_retry_after(response.headers)
+            bucket.on_throttle(retry_after)
+
+            retryable = idempotent or response.status_code == 429
+            if not retryable or attempt >= self.retry.max_retries:
+                return response
+
+            self.metrics.record_retry(method, url)
+            response.close()
+            time.sleep(self.retry.backoff(attempt, retry_after))
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request."""
+        return self.request('POST', url, **kwargs)
+
+    def get_json(self, url: str, **kwargs: Any) -> Any:
+        """
+        Send a GET request and decode the JSON body.
+
+        Concurrent calls for the same URL share one request and one decoded
+        result, so the returned object must not be modified.
+
+        Raises:
+            requests.exceptions.HTTPError: On a non-2xx response
+        """
+        full_url = _full_url(url, kwargs.pop('params', None))
+
+        def fetch() -> Any:
+            response = self.get(full_url, **kwargs)
+            response.raise_for_status()
+            return response.json()
+
+        return self.inflight.do(('json', full_url), fetch)
+
+    def stream(self, url: str, chunk_size: int = 1 << 16, **kwargs: Any) -> Iterator[bytes]:
+        """
+        Send a GET request and yield the body in chunks as it arrives.
+
+        The body is never held in memory as a whole. Streamed requests
+        bypass the response cache and request coalescing.
+
+        Args:
+            url: Absolute endpoint URL
+            chunk_size: Bytes per chunk (after decompression)
+            **kwargs: Extra arguments passed to requests.Session.request
+
+        Raises:
+            requests.exceptions.HTTPError: On a non-2xx response
+        """
+        with self.get(url, stream=True, **kwargs) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> 'GeoGuessrClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _full_url(url: str, params: Any = None) -> str:
+    """Merge query parameters into a URL."""
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+def _cached_response(url: str, cached: CachedResponse) -> requests.Response:
+    """Build a requests.Response from a cached body."""
+    response = Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.url = url
+    response.headers['Content-Type'] = cached.content_type
+    response.encoding = 'utf-8'
+    response._content = cached.body
+    response.from_cache = True
+    return response
+
+
+_clients: Dict[Optional[str], GeoGuessrClient] = {}
+_clients_lock = threading.Lock()
+_shared_cache: Optional[ResponseCache] = None
+
+
+def get_client(cookie: Optional[str] = None) -> GeoGuessrClient:
+    """
+    Return the process-wide client for a cookie, creating it on first use.
+
+    If the GEOGUESSR_CACHE environment variable names a file, all shared
+    clients store GET responses in a ResponseCache at that path.
+
+    Args:
+        cookie: Your _ncfa cookie value. Falls back to the GEOGUESSR_COOKIE
+            environment variable when omitted.
+
+    Returns:
+        GeoGuessrClient: A shared client whose connections stay open
+    """
+    global _shared_cache
+
+    if cookie is None:
+        cookie = os.getenv('GEOGUESSR_COOKIE')
+
+    with _clients_lock:
+        client = _clients.get(cookie)
+        if client is None:
+            cache_path = os.getenv('GEOGUESSR_CACHE')
+            if cache_path and _shared_cache is None:
+                _shared_cache = ResponseCache(cache_path)
+            client = GeoGuessrClient(cookie, cache=_shared_cache if cache_path else None)
+            _clients[cookie] = client
+        return client
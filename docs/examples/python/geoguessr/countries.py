@@ -0,0 +1,405 @@
+"""
+Offline Country Lookup
+
+Resolves batches of coordinates to country codes with no network calls,
+using country polygons from a GeoJSON file such as Natural Earth's
+admin-0 countries (ne_10m/ne_50m/ne_110m_admin_0_countries.geojson).
+
+The polygons are compiled once into a grid of 1° cells. Cells that no
+border passes through resolve to one country (or none) directly. For
+points in border cells, only the edges in that cell are tested: the
+country of the cell's reference point is known, and each edge crossed on
+the way from the reference point to the lookup point toggles membership
+of that edge's country. A compiled index can be saved as .npz and loads in
+milliseconds.
+
+Usage:
+    index = CountryIndex.from_geojson('ne_50m_admin_0_countries.geojson')
+    index.save('countries.npz')
+
+    index = CountryIndex.load('countries.npz')
+    codes = index.lookup(guess_lats, guess_lngs)     # e.g. array(['fr', 'de', ''])
+
+    # Or let load_countries() find it for every example:
+    export GEOGUESSR_COUNTRIES=~/geoguessr/countries.npz
+
+Requires: pip install numpy
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Feature properties tried in order for the ISO 3166-1 alpha-2 code.
+# Natural Earth sets ISO_A2 to -99 for a few countries (e.g. France), and
+# ISO_A2_EH has the code for those.
+CODE_PROPERTIES = ('ISO_A2_EH', 'ISO_A2', 'iso_a2', 'ISO3166-1-Alpha-2', 'code')
+
+# Offset of each cell's reference point from its center, so reference
+# points do not sit exactly on the straight borders common in the data
+_REFERENCE_OFFSET = (0.0123456789, 0.0098765432)
+
+# Points resolved per chunk in border cells, to bound temporary memory
+CHUNK_SIZE = 100_000
+
+
+class CountryIndex:
+    """
+    Grid index over country polygons for vectorized point lookup.
+
+    Attributes:
+        codes: Country code of each country number (lowercase, as in the API's countryCode)
+        cell_size: Grid cell size in degrees
+        cell_country: Country number of each cell's reference point, -1 for
+            none (int16, rows by latitude, columns by longitude)
+        cell_edges: Start of each cell's edges in edge_cell_index, plus the
+            total (CSR offsets, one entry per cell plus one)
+        edge_cell_index: Edge numbers of every border cell, grouped by cell
+        edges: Edge coordinates as (lng1, lat1, lng2, lat2) rows (float64)
+        edge_country: Country number of each edge (int16)
+    """
+
+    __slots__ = ('codes', 'cell_size', 'cell_country', 'cell_edges', 'edge_cell_index', 'edges', 'edge_country')
+
+    def __init__(self, codes: Sequence[str], cell_size: float, cell_country: np.ndarray, cell_edges: np.ndarray,
+                 edge_cell_index: np.ndarray, edges: np.ndarray, edge_country: np.ndarray):
+        self.codes = np.asarray(codes, dtype='<U8')
+        self.cell_size = float(cell_size)
+        self.cell_country = cell_country
+        self.cell_edges = cell_edges
+        self.edge_cell_index = edge_cell_index
+        self.edges = edges
+        self.edge_country = edge_country
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Grid shape as (rows, columns)."""
+        return self.cell_country.shape
+
+    # ===== Building =====
+
+    @classmethod
+    def from_geojson(cls, path: str, cell_size: float = 1.0,
+                     code_properties: Sequence[str] = CODE_PROPERTIES) -> 'CountryIndex':
+        """
+        Compile an index from a GeoJSON FeatureCollection of country polygons.
+
+        Args:
+            path: GeoJSON file with Polygon or MultiPolygon features
+            cell_size: Grid cell size in degrees (must divide 180)
+            code_properties: Feature properties tried in order for the
+                country code; features with none of them are skipped
+
+        Returns:
+            CountryIndex
+        """
+        with open(os.path.expanduser(path), 'rb') as f:
+            collection = json.load(f)
+        return cls.from_features(collection['features'], cell_size, code_properties)
+
+    @classmethod
+    def from_features(cls, features: Iterable[Dict[str, Any]], cell_size: float = 1.0,
+                      code_properties: Sequence[str] = CODE_PROPERTIES) -> 'CountryIndex':
+        """Compile an index from GeoJSON features (see from_geojson)."""
+        codes: List[str] = []
+        numbers: Dict[str, int] = {}
+        edge_parts: List[np.ndarray] = []
+        country_parts: List[np.ndarray] = []
+
+        for feature in features:
+            code = _feature_code(feature.get('properties') or {}, code_properties)
+            geometry = feature.get('geometry') or {}
+            if code is None or geometry.get('type') not in ('Polygon', 'MultiPolygon'):
+                continue
+
+            number = numbers.setdefault(code, len(numbers))
+            if number == len(codes):
+                codes.append(code)
+
+            polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+            for polygon in polygons:
+                for ring in polygon:
+                    points = np.asarray(ring, dtype=np.float64)[:, :2]
+                    if len(points) < 3:
+                        continue
+                    if not np.array_equal(points[0], points[-1]):
+                        points = np.vstack([points, points[:1]])
+                    ring_edges = np.hstack([points[:-1], points[1:]])
+                    edge_parts.append(ring_edges)
+                    country_parts.append(np.full(len(ring_edges), number, dtype=np.int16))
+
+        edges = np.vstack(edge_parts) if edge_parts else np.empty((0, 4))
+        edge_country = np.concatenate(country_parts) if country_parts else np.empty(0, dtype=np.int16)
+        # Horizontal edges never cross a horizontal ray and only add noise
+        keep = edges[:, 1] != edges[:, 3]
+        return cls._build(codes, cell_size, edges[keep], edge_country[keep])
+
+    @classmethod
+    def _build(cls, codes: List[str], cell_size: float, edges: np.ndarray, edge_country: np.ndarray) -> 'CountryIndex':
+        rows, columns = int(round(180 / cell_size)), int(round(360 / cell_size))
+
+        # Cells overlapped by each edge's bounding box (a superset of the
+        # cells it passes through, which is enough for exact results)
+        lng_min = np.minimum(edges[:, 0], edges[:, 2])
+        lng_max = np.maximum(edges[:, 0], edges[:, 2])
+        lat_min = np.minimum(edges[:, 1], edges[:, 3])
+        lat_max = np.maximum(edges[:, 1], edges[:, 3])
+        col0, col1 = _column(lng_min, cell_size, columns), _column(lng_max, cell_size, columns)
+        row0, row1 = _row(lat_min, cell_size, rows), _row(lat_max, cell_size, rows)
+
+        widths, heights = col1 - col0 + 1, row1 - row0 + 1
+        spans = widths * heights
+        edge_numbers = np.repeat(np.arange(len(edges)), spans)
+        within = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+        cell_rows = row0[edge_numbers] + within // widths[edge_numbers]
+        cell_columns = col0[edge_numbers] + within % widths[edge_numbers]
+        cells = cell_rows * columns + cell_columns
+
+        order = np.argsort(cells, kind='stable')
+        edge_cell_index = edge_numbers[order].astype(np.int32)
+        cell_edges = np.zeros(rows * columns + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=rows * columns), out=cell_edges[1:])
+
+        # Country of every cell's reference point, by casting a ray east
+        # along each row's reference latitude
+        ref_lng, ref_lat = _reference_points(cell_size, rows, columns)
+        cell_country = np.full((rows, columns), -1, dtype=np.int16)
+        for row in range(rows):
+            lat = ref_lat[row]
+            spanning = np.flatnonzero((lat_min <= lat) & (lat < lat_max))
+            if len(spanning) == 0:
+                continue
+            x1, y1, x2, y2 = edges[spanning].T
+            crossing_lng = x1 + (lat - y1) * (x2 - x1) / (y2 - y1)
+            east = crossing_lng[None, :] > ref_lng[:, None]
+            _resolve(cell_country[row], np.nonzero(east), edge_country[spanning], np.full(columns, -1))
+
+        return cls(codes, cell_size, cell_country, cell_edges, edge_cell_index, edges, edge_country)
+
+    # ===== Persistence =====
+
+    def save(self, path: str) -> None:
+        """Save the compiled index as a compressed .npz file."""
+        np.savez_compressed(
+            os.path.expanduser(path), codes=self.codes, cell_size=self.cell_size, cell_country=self.cell_country,
+            cell_edges=self.cell_edges, edge_cell_index=self.edge_cell_index, edges=self.edges,
+            edge_country=self.edge_country,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'CountryIndex':
+        """Load an index saved with save()."""
+        with np.load(os.path.expanduser(path)) as data:
+            return cls(data['codes'].tolist(), float(data['cell_size']), data['cell_country'], data['cell_edges'],
+                       data['edge_cell_index'], data['edges'], data['edge_country'])
+
+    # ===== Lookup =====
+
+    def lookup_numbers(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """
+        Resolve coordinates to country numbers.
+
+        Args:
+            lat, lng: Coordinates in degrees (arrays of the same shape)
+
+        Returns:
+            np.ndarray: Index into codes for each point, -1 where the point
+            is in no country or is NaN (int16)
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        shape = np.broadcast(lat, lng).shape
+        lat, lng = np.broadcast_to(lat, shape).ravel(), np.broadcast_to(lng, shape).ravel()
+
+        rows, columns = self.shape
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        row = _row(np.where(valid, lat, 0.0), self.cell_size, rows)
+        column = _column(np.where(valid, _wrap(lng), 0.0), self.cell_size, columns)
+        cell = row * columns + column
+
+        result = self.cell_country.ravel()[cell].copy()
+        result[~valid] = -1
+
+        border = np.flatnonzero(valid & (self.cell_edges[cell + 1] > self.cell_edges[cell]))
+        for start in range(0, len(border), CHUNK_SIZE):
+            points = border[start:start + CHUNK_SIZE]
+            result[points] = self._resolve_border(lat[points], _wrap(lng[points]), cell[points], result[points])
+
+        return result.reshape(shape)
+
+    def lookup(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """
+        Resolve coordinates to country codes.
+
+        Args:
+            lat, lng: Coordinates in degrees
+
+        Returns:
+            np.ndarray: Lowercase country code of each point, '' where the
+            point is in no country
+        """
+        numbers = self.lookup_numbers(lat, lng)
+        codes = np.append(self.codes, '')
+        return codes[numbers]
+
+    def lookup_one(self, lat: float, lng: float) -> Optional[str]:
+        """Country code of a single point, or None."""
+        return self.lookup(lat, lng).item() or None
+
+    def _resolve_border(self, lat: np.ndarray, lng: np.ndarray, cell: np.ndarray,
+                        reference_country: np.ndarray) -> np.ndarray:
+        rows, columns = self.shape
+        ref_lng, ref_lat = _reference_points(self.cell_size, rows, columns)
+
+        # Every (point, edge in the point's cell) pair, flattened
+        starts, ends = self.cell_edges[cell], self.cell_edges[cell + 1]
+        counts = ends - starts
+        point = np.repeat(np.arange(len(cell)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        edge = self.edge_cell_index[starts[point] + offset]
+
+        x1, y1, x2, y2 = self.edges[edge].T
+        # Segment from the cell's reference point to the lookup point
+        cx = ref_lng[cell[point] % columns]
+        cy = ref_lat[cell[point] // columns]
+        px, py = lng[point], lat[point]
+
+        side_a = _orientation(cx, cy, px, py, x1, y1) > 0
+        side_b = _orientation(cx, cy, px, py, x2, y2) > 0
+        side_c = _orientation(x1, y1, x2, y2, cx, cy) > 0
+        side_p = _orientation(x1, y1, x2, y2, px, py) > 0
+        crossed = (side_a != side_b) & (side_c != side_p)
+
+        result = reference_country.copy()
+        _resolve(result, (point[crossed], edge[crossed]), self.edge_country, reference_country)
+        return result
+
+
+def _feature_code(properties: Dict[str, Any], code_properties: Sequence[str]) -> Optional[str]:
+    for name in code_properties:
+        value = properties.get(name)
+        if isinstance(value, str) and value and value != '-99':
+            return value.lower()
+    return None
+
+
+def _wrap(lng: np.ndarray) -> np.ndarray:
+    """Wrap longitudes into [-180, 180)."""
+    return (lng + 180.0) % 360.0 - 180.0
+
+
+def _row(lat: np.ndarray, cell_size: float, rows: int) -> np.ndarray:
+    return np.clip(((lat + 90.0) // cell_size).astype(np.int64), 0, rows - 1)
+
+
+def _column(lng: np.ndarray, cell_size: float, columns: int) -> np.ndarray:
+    return np.clip(((lng + 180.0) // cell_size).astype(np.int64), 0, columns - 1)
+
+
+def _reference_points(cell_size: float, rows: int, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reference longitude of each column and latitude of each row."""
+    ref_lng = -180.0 + (np.arange(columns) + 0.5) * cell_size + _REFERENCE_OFFSET[0] * cell_size
+    ref_lat = -90.0 + (np.arange(rows) + 0.5) * cell_size + _REFERENCE_OFFSET[1] * cell_size
+    return ref_lng, ref_lat
+
+
+def _orientation(ax: np.ndarray, ay: np.ndarray, bx: np.ndarray, by: np.ndarray,
+                 cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+    """Cross product of (b - a) and (c - a): positive if c is left of a->b."""
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _resolve(result: np.ndarray, crossings: Tuple[np.ndarray, np.ndarray], edge_country: np.ndarray,
+             start_country: np.ndarray) -> None:
+    """
+    Apply edge crossings to starting countries.
+
+    Crossing an edge of a country toggles membership of that country, so a
+    point ends up in every country crossed an odd number of times, except
+    its starting country, which it leaves when that is crossed an odd
+    number of times.
+
+    Args:
+        result: Country number per point, updated in place
+        crossings: (point numbers, edge numbers) of every crossing
+        edge_country: Country number of each edge
+        start_country: Country number each point starts in (-1 for none)
+    """
+    points, edges = crossings
+    if len(points) == 0:
+        return
+
+    countries = edge_country[edges].astype(np.int64)
+    keys, counts = np.unique(points.astype(np.int64) * (1 << 16) + countries, return_counts=True)
+    odd = keys[counts % 2 == 1]
+    odd_point, odd_country = odd >> 16, odd & 0xFFFF
+
+    left = odd_country == start_country[odd_point]
+    result[odd_point[left]] = -1
+    entered = ~left
+    result[odd_point[entered]] = odd_country[entered]
+
+
+def country_confusion(actual: np.ndarray, guessed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count how often each actual country was guessed as each other country.
+
+    Args:
+        actual: Country code of each round location
+        guessed: Country code of each guess ('' where unknown)
+
+    Returns:
+        tuple: (codes, counts) where counts[i, j] is the number of guesses
+        in codes[j] for locations in codes[i]
+    """
+    actual = np.asarray(actual, dtype=str)
+    guessed = np.asarray(guessed, dtype=str)
+    codes, inverse = np.unique(np.concatenate([actual, guessed]), return_inverse=True)
+    actual_index, guessed_index = inverse[:len(actual)], inverse[len(actual):]
+    counts = np.bincount(actual_index * len(codes) + guessed_index, minlength=len(codes) ** 2)
+    return codes, counts.reshape(len(codes), len(codes))
+
+
+_countries: Optional[CountryIndex] = None
+
+
+def load_countries(path: Optional[str] = None) -> CountryIndex:
+    """
+    Load the country index once per process.
+
+    Args:
+        path: Compiled .npz index or GeoJSON file (defaults to the
+            GEOGUESSR_COUNTRIES environment variable). A GeoJSON file is
+            compiled and saved next to it as .npz for the next run.
+
+    Returns:
+        CountryIndex
+
+    Raises:
+        ValueError: If no path is given and GEOGUESSR_COUNTRIES is not set
+    """
+    global _countries
+
+    if _countries is not None and path is None:
+        return _countries
+
+    path = path or os.getenv('GEOGUESSR_COUNTRIES')
+    if not path:
+        raise ValueError('No country boundaries: pass a path or set GEOGUESSR_COUNTRIES to a GeoJSON '
+                         'or .npz file (e.g. Natural Earth ne_50m_admin_0_countries.geojson)')
+
+    path = os.path.expanduser(path)
+    if path.endswith('.npz'):
+        index = CountryIndex.load(path)
+    else:
+        compiled = os.path.splitext(path)[0] + '.npz'
+        if os.path.exists(compiled) and os.path.getmtime(compiled) >= os.path.getmtime(path):
+            index = CountryIndex.load(compiled)
+        else:
+            index = CountryIndex.from_geojson(path)
+            index.save(compiled)
+
+    _countries = index
+    return index
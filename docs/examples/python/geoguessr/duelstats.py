@@ -0,0 +1,316 @@
+"""
+Columnar Duel Statistics
+
+Loads many duels into typed NumPy columns in one pass, then computes
+corpus-wide statistics (per-player scores and rating changes, damage by
+multiplier) with vectorized operations instead of looping over roundResults
+and guesses game by game.
+
+Three tables are built, each as parallel arrays:
+    rounds     One row per team per round: score, damage, multiplier, health
+    guesses    One row per player per round: position, distance and score
+    players    One row per player per game: rating before/after, win
+
+Usage:
+    columns = to_duel_columns(archive.iter_games(status='Finished'))
+    players = summarize_players(columns)        # one entry per distinct player
+    damage = damage_by_multiplier(columns)
+
+Requires: pip install numpy
+"""
+
+from typing import Any, Dict, Iterable, List, Union
+
+import numpy as np
+
+from .models import DuelGame, as_game
+
+NAN = float('nan')
+
+TEAM_CODES = {'blue': 0, 'red': 1}
+
+# Code used for team names not listed in TEAM_CODES
+UNKNOWN_TEAM = len(TEAM_CODES)
+
+
+class DuelColumns:
+    """
+    Duels stored as three tables of parallel NumPy arrays.
+
+    game columns index game_ids, player columns index player_ids, and team
+    columns hold TEAM_CODES. Missing values are NaN.
+
+    Attributes:
+        game_ids: Duel game ID of each game (object array)
+        player_ids: Distinct player IDs (object array)
+        round_game, round_team, round_number: Keys of each team round
+        round_score: Score of the team's best guess (int32)
+        round_damage: Damage the team dealt (int32)
+        round_multiplier: Damage multiplier of the round (float32)
+        round_health_after: Team health after the round (int32)
+        round_distance: Distance of the team's best guess in meters (float64)
+        guess_game, guess_player, guess_team, guess_round: Keys of each guess
+        guess_lat, guess_lng: Guess coordinates (float64)
+        guess_target_country: Country code of the round location, '' if unknown
+        guess_distance: Distance from the location in meters (float64)
+        guess_score: Score if this was the team's best guess, else NaN (float64)
+        player_game, player_player, player_team: Keys of each player in a game
+        rating_before, rating_after: Game mode rating around the game, NaN
+            for unranked games (float64)
+        won: 1 if the player's team won, 0 if it lost, -1 if there was no
+            winner (int8)
+    """
+
+    __slots__ = ('game_ids', 'player_ids',
+                 'round_game', 'round_team', 'round_number', 'round_score', 'round_damage', 'round_multiplier',
+                 'round_health_after', 'round_distance',
+                 'guess_game', 'guess_player', 'guess_team', 'guess_round', 'guess_lat', 'guess_lng',
+                 'guess_target_country', 'guess_distance', 'guess_score',
+                 'player_game', 'player_player', 'player_team', 'rating_before', 'rating_after', 'won')
+
+    def __init__(self, **columns: np.ndarray):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+
+    @property
+    def game_count(self) -> int:
+        return len(self.game_ids)
+
+    @property
+    def player_count(self) -> int:
+        """Number of distinct players."""
+        return len(self.player_ids)
+
+    @property
+    def rating_delta(self) -> np.ndarray:
+        """Rating change of each player in each game (NaN for unranked games)."""
+        return self.rating_after - self.rating_before
+
+
+_DTYPES = {
+    'round_game': np.int32,
+    'round_team': np.int8,
+    'round_number': np.int16,
+    'round_score': np.int32,
+    'round_damage': np.int32,
+    'round_multiplier': np.float32,
+    'round_health_after': np.int32,
+    'round_distance': np.float64,
+    'guess_game': np.int32,
+    'guess_player': np.int32,
+    'guess_team': np.int8,
+    'guess_round': np.int16,
+    'guess_lat': np.float64,
+    'guess_lng': np.float64,
+    'guess_target_country': '<U8',
+    'guess_distance': np.float64,
+    'guess_score': np.float64,
+    'player_game': np.int32,
+    'player_player': np.int32,
+    'player_team': np.int8,
+    'rating_before': np.float64,
+    'rating_after': np.float64,
+    'won': np.int8,
+}
+
+
+def to_duel_columns(games: Iterable[Union[DuelGame, Dict[str, Any]]]) -> DuelColumns:
+    """
+    Convert duels to columns in a single pass.
+
+    Args:
+        games: DuelGame models or decoded duel responses (e.g. from
+            DuelArchive.iter_games() or fetch_duels())
+
+    Returns:
+        DuelColumns: Typed tables for every game
+    """
+    columns: Dict[str, List] = {name: [] for name in _DTYPES}
+    game_ids: List[str] = []
+    player_index: Dict[str, int] = {}
+
+    round_game, round_team, round_number = columns['round_game'], columns['round_team'], columns['round_number']
+    round_score, round_damage = columns['round_score'], columns['round_damage']
+    round_multiplier, round_health_after = columns['round_multiplier'], columns['round_health_after']
+    round_distance = columns['round_distance']
+    guess_game, guess_player, guess_team = columns['guess_game'], columns['guess_player'], columns['guess_team']
+    guess_round, guess_distance, guess_score = columns['guess_round'], columns['guess_distance'], columns['guess_score']
+    guess_lat, guess_lng = columns['guess_lat'], columns['guess_lng']
+    guess_target_country = columns['guess_target_country']
+
+    for game_number, game in enumerate(games):
+        game = as_game(game)
+        game_ids.append(game.game_id)
+        winner = game.winning_team_id
+        round_countries = {r.round_number: r.country_code or '' for r in game.rounds}
+
+        for team in game.teams:
+            team_code = TEAM_CODES.get(team.name, UNKNOWN_TEAM)
+
+            for result in team.round_results:
+                round_game.append(game_number)
+                round_team.append(team_code)
+                round_number.append(result.round_number)
+                round_score.append(result.score)
+                round_damage.append(result.damage_dealt)
+                round_multiplier.append(result.multiplier)
+                round_health_after.append(result.health_after)
+                round_distance.append(result.best_guess.distance if result.best_guess else NAN)
+
+            for player in team.players:
+                number = player_index.setdefault(player.player_id, len(player_index))
+
+                for guess in player.guesses:
+                    guess_game.append(game_number)
+                    guess_player.append(number)
+                    guess_team.append(team_code)
+                    guess_round.append(guess.round_number)
+                    guess_lat.append(guess.lat)
+                    guess_lng.append(guess.lng)
+                    guess_target_country.append(round_countries.get(guess.round_number, ''))
+                    guess_distance.append(guess.distance)
+                    guess_score.append(NAN if guess.score is None else guess.score)
+
+                columns['player_game'].append(game_number)
+                columns['player_player'].append(number)
+                columns['player_team'].append(team_code)
+                columns['rating_before'].append(NAN if player.rating_before is None else player.rating_before)
+                columns['rating_after'].append(NAN if player.rating_after is None else player.rating_after)
+                columns['won'].append(-1 if winner is None else int(team.id == winner))
+
+    arrays = {name: np.array(values, dtype=_DTYPES[name]) for name, values in columns.items()}
+    return DuelColumns(
+        game_ids=np.array(game_ids, dtype=object),
+        player_ids=np.array(list(player_index), dtype=object),
+        **arrays,
+    )
+
+
+def _mean(total: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """total / count, NaN where count is 0."""
+    result = np.full(len(total), NAN)
+    np.divide(total, count, out=result, where=count > 0)
+    return result
+
+
+def summarize_players(columns: DuelColumns) -> Dict[str, np.ndarray]:
+    """
+    Compute per-player statistics over every game in one vectorized pass.
+
+    Args:
+        columns: Columns from to_duel_columns()
+
+    Returns:
+        dict: Arrays with one entry per distinct player (aligned with
+            player_ids): games, wins, win_rate, guesses, scored_rounds (rounds
+            where the player made the team's best guess), avg_score and
+            avg_distance over scored rounds (as display_player_stats
+            reports them), avg_guess_distance over every guess,
+            rating_change (summed over ranked games), avg_rating_change,
+            ranked_games and last_rating (rating after the player's last
+            ranked game in input order).
+    """
+    count = columns.player_count
+    player = columns.player_player
+
+    games = np.bincount(player, minlength=count)
+    wins = np.bincount(player, weights=columns.won == 1, minlength=count).astype(np.int64)
+    decided = np.bincount(player, weights=columns.won >= 0, minlength=count)
+
+    guess_player = columns.guess_player
+    scored = ~np.isnan(columns.guess_score)
+    guesses = np.bincount(guess_player, minlength=count)
+    scored_rounds = np.bincount(guess_player[scored], minlength=count)
+    score_total = np.bincount(guess_player[scored], weights=columns.guess_score[scored], minlength=count)
+    scored_distance = np.bincount(guess_player[scored], weights=columns.guess_distance[scored], minlength=count)
+    all_distance = np.bincount(guess_player, weights=columns.guess_distance, minlength=count)
+
+    delta = columns.rating_delta
+    ranked = ~np.isnan(delta)
+    ranked_games = np.bincount(player[ranked], minlength=count)
+    rating_change = np.bincount(player[ranked], weights=delta[ranked], minlength=count)
+
+    # Later rows overwrite earlier ones, leaving each player's last ranked game
+    last_rating = np.full(count, NAN)
+    last_rating[player[ranked]] = columns.rating_after[ranked]
+
+    return {
+        'player_id': columns.player_ids,
+        'games': games,
+        'wins': wins,
+        'win_rate': _mean(wins, decided),
+        'guesses': guesses,
+        'scored_rounds': scored_rounds,
+        'avg_score': _mean(score_total, scored_rounds),
+        'avg_distance': _mean(scored_distance, scored_rounds),
+        'avg_guess_distance': _mean(all_distance, guesses),
+        'ranked_games': ranked_games,
+        'rating_change': rating_change,
+        'avg_rating_change': _mean(rating_change, ranked_games),
+        'last_rating': last_rating,
+    }
+
+
+def damage_by_multiplier(columns: DuelColumns) -> Dict[str, np.ndarray]:
+    """
+    Aggregate round damage by damage multiplier.
+
+    Args:
+        columns: Columns from to_duel_columns()
+
+    Returns:
+        dict: Arrays with one entry per distinct multiplier (ascending):
+            multiplier, rounds (team rounds played), damaging_rounds (team
+            rounds that dealt damage), total_damage, avg_damage (per
+            damaging round) and max_damage.
+    """
+    multipliers, index = np.unique(columns.round_multiplier, return_inverse=True)
+    count = len(multipliers)
+    damage = columns.round_damage
+    dealt = damage > 0
+
+    damaging_rounds = np.bincount(index[dealt], minlength=count)
+    total_damage = np.bincount(index, weights=damage, minlength=count).astype(np.int64)
+    max_damage = np.zeros(count, dtype=np.int64)
+    np.maximum.at(max_damage, index, damage)
+
+    return {
+        'multiplier': multipliers,
+        'rounds': np.bincount(index, minlength=count),
+        'damaging_rounds': damaging_rounds,
+        'total_damage': total_damage,
+        'avg_damage': _mean(total_damage, damaging_rounds),
+        'max_damage': max_damage,
+    }
+
+
+def summarize_teams(columns: DuelColumns) -> Dict[str, np.ndarray]:
+    """
+    Compute damage statistics per team per game, as analyze_damage reports them.
+
+    Args:
+        columns: Columns from to_duel_columns()
+
+    Returns:
+        dict: Arrays with one entry per (game, team) pair that played a
+            round: game (index into game_ids), team (TEAM_CODES), rounds,
+            total_damage, avg_damage (per round) and max_damage.
+    """
+    key = columns.round_game.astype(np.int64) * (UNKNOWN_TEAM + 1) + columns.round_team
+    keys, index = np.unique(key, return_inverse=True)
+    count = len(keys)
+    damage = columns.round_damage
+
+    rounds = np.bincount(index, minlength=count)
+    total_damage = np.bincount(index, weights=damage, minlength=count).astype(np.int64)
+    max_damage = np.zeros(count, dtype=np.int64)
+    np.maximum.at(max_damage, index, damage)
+
+    return {
+        'game': keys // (UNKNOWN_TEAM + 1),
+        'team': keys % (UNKNOWN_TEAM + 1),
+        'rounds': rounds,
+        'total_damage': total_damage,
+        'avg_damage': _mean(total_damage, rounds),
+        'max_damage': max_damage,
+    }
@@ -0,0 +1,57 @@
+"""
+GeoGuessr Endpoint URLs
+
+URL templates for every endpoint documented in this guide. Fill the
+placeholders with str.format(), e.g. DUEL.format(game_id='...').
+
+The base URLs can be pointed elsewhere (e.g. at the local fake server in
+geoguessr.fakeserver) with the GEOGUESSR_WWW_API and
+GEOGUESSR_GAME_SERVER_API environment variables.
+"""
+
+import os
+
+WWW_API = os.getenv('GEOGUESSR_WWW_API', 'https://www.geoguessr.com/api')
+GAME_SERVER_API = os.getenv('GEOGUESSR_GAME_SERVER_API', 'https://game-server.geoguessr.com/api')
+
+# Profiles
+PROFILE = WWW_API + '/v3/profiles'
+PROFILE_MAPS = WWW_API + '/v3/profiles/maps'
+SEARCH_USERS = WWW_API + '/v3/search/user'
+
+# Games
+GAME = WWW_API + '/v3/games/{token}'
+STREAK_GAME = WWW_API + '/v3/games/streak'
+INFINITY_CHALLENGES = WWW_API + '/v4/games/infinity/challenges'
+
+# Challenges
+CHALLENGE = WWW_API + '/v3/challenges/{token}'
+HIGHSCORES = WWW_API + '/v3/results/highscores/{token}'
+
+# Duels (game-server)
+DUEL = GAME_SERVER_API + '/duels/{game_id}'
+REPLAY = GAME_SERVER_API + '/replays/{player_id}/{duel_id}/{round_number}'
+
+# Maps
+BROWSE_MAPS = WWW_API + '/v3/social/maps/browse/{category}'
+SEARCH_MAPS = WWW_API + '/v4/search/map'
+
+# Feed
+FRIENDS_FEED = WWW_API + '/v4/feed/friends'
+PRIVATE_FEED = WWW_API + '/v4/feed/private'
+LIKES = WWW_API + '/v3/likes'
+
+# Social
+FRIENDS = WWW_API + '/v3/social/friends'
+FRIEND_REQUESTS_RECEIVED = WWW_API + '/v3/social/friends/received'
+FRIEND_REQUESTS_SENT = WWW_API + '/v3/social/friends/sent'
+FRIEND_SUGGESTIONS = WWW_API + '/v3/social/friends/suggestions'
+BADGES_UNCLAIMED = WWW_API + '/v3/social/badges/unclaimed'
+BADGES_CLAIMED = WWW_API + '/v3/social/badges/claimed'
+BADGES_CLAIM = WWW_API + '/v3/social/badges/claim'
+UNFINISHED_GAMES = WWW_API + '/v3/social/events/unfinishedgames'
+
+# Subscriptions
+SUBSCRIPTION = WWW_API + '/v3/subscriptions'
+SUBSCRIPTION_PLANS = WWW_API + '/v3/subscriptions/plans'
+SUBSCRIPTION_INVOICES = WWW_API + '/v3/subscriptions/invoices'
@@ -0,0 +1,237 @@
+"""
+Streaming Replay Exporters
+
+Write replay events to disk as they arrive instead of collecting them in
+memory first. Every writer appends, so many duels can be exported into one
+dataset across several runs.
+
+Formats:
+    .ndjson / .jsonl      One compact JSON event per line
+    .ndjson.gz            Same, gzip-compressed
+    .ndjson.zst           Same, zstd-compressed (pip install zstandard)
+    Parquet directory     Typed payload columns (pip install pyarrow)
+
+Usage:
+    with NdjsonReplayWriter('replays.ndjson.gz') as writer:
+        export_replays(iter_replays(keys), writer)
+
+Requires: pip install requests (zstandard for .zst files, pyarrow for ParquetReplayWriter)
+"""
+
+import gzip
+import io
+import json
+import os
+import uuid
+from typing import IO, Any, Dict, Iterable, List
+
+from .batch import BatchResult
+
+
+def open_text(path: str, mode: str = 'a') -> IO[str]:
+    """
+    Open a text file, compressing by extension (.gz or .zst).
+
+    Compressed files are opened in append mode by adding a new gzip member
+    or zstd frame, which standard readers decode as one stream.
+
+    Args:
+        path: Output path
+        mode: 'a' to append or 'w' to overwrite
+
+    Returns:
+        A text file object
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+
+    if path.endswith('.zst'):
+        import zstandard
+
+        raw = open(path, mode + 'b')
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+
+    return open(path, mode, encoding='utf-8')
+
+
+class NdjsonReplayWriter:
+    """
+    Append replay events to a newline-delimited JSON file.
+
+    Each line is one event tagged with the duel, player and round it came
+    from: {"duelId", "playerId", "roundNumber", "time", "type", "payload"}.
+
+    Args:
+        path: Output path (.gz or .zst for compression)
+        append: Append to an existing file instead of overwriting it
+    """
+
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        self.events_written = 0
+        self._file = open_text(path, 'a' if append else 'w')
+        self._encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+    def write_replay(self, events: List[Dict], duel_id: str, player_id: str, round_number: int) -> None:
+        """
+        Write every event of one replay.
+
+        Args:
+            events: Replay events from the replays endpoint
+            duel_id: The duel game ID
+            player_id: The player's user ID
+            round_number: The round number (1-indexed)
+        """
+        encode = self._encoder.encode
+        self._file.writelines(
+            encode({
+                'duelId': duel_id,
+                'playerId': player_id,
+                'roundNumber': round_number,
+                'time': event['time'],
+                'type': event['type'],
+                'payload': event.get('payload'),
+            }) + '\n'
+            for event in events
+        )
+        self.events_written += len(events)
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._file.close()
+
+    def __enter__(self) -> 'NdjsonReplayWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ParquetReplayWriter:
+    """
+    Append replay events to a Parquet dataset directory.
+
+    Payload fields become typed columns. Rows are buffered and written as
+    row groups of row_group_size; each writer adds one new part file, so
+    the directory can be read as a single dataset with
+    pyarrow.dataset.dataset(directory).
+
+    Args:
+        directory: Dataset directory (created if missing)
+        row_group_size: Events buffered before a row group is written
+        compression: Parquet codec ('zstd', 'snappy', 'gzip', ...)
+    """
+
+    def __init__(self, directory: str, row_group_size: int = 100_000, compression: str = 'zstd'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ('duel_id', pa.dictionary(pa.int32(), pa.string())),
+            ('player_id', pa.dictionary(pa.int32(), pa.string())),
+            ('round_number', pa.int16()),
+            ('time', pa.timestamp('ms', tz='UTC')),
+            ('type', pa.dictionary(pa.int8(), pa.string())),
+            ('lat', pa.float64()),
+            ('lng', pa.float64()),
+            ('heading', pa.float32()),
+            ('pitch', pa.float32()),
+            ('zoom', pa.float32()),
+            ('is_active', pa.bool_()),
+            ('is_sticky', pa.bool_()),
+            ('size', pa.int8()),
+            ('pano_id', pa.string()),
+            ('country_code', pa.string()),
+        ])
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'part-{uuid.uuid4().hex}.parquet')
+        self.row_group_size = row_group_size
+        self.events_written = 0
+        self._writer = pq.ParquetWriter(self.path, self.schema, compression=compression)
+        self._columns: Dict[str, list] = {name: [] for name in self.schema.names}
+
+    def write_replay(self, events: List[Dict], duel_id: str, player_id: str, round_number: int) -> None:
+        """
+        Buffer every event of one replay, flushing full row groups.
+
+        Args:
+            events: Replay events from the replays endpoint
+            duel_id: The duel game ID
+            player_id: The player's user ID
+            round_number: The round number (1-indexed)
+        """
+        columns = self._columns
+        count = len(events)
+
+        columns['duel_id'].extend([duel_id] * count)
+        columns['player_id'].extend([player_id] * count)
+        columns['round_number'].extend([round_number] * count)
+
+        for event in events:
+            payload = event.get('payload') or {}
+            columns['time'].append(event['time'])
+            columns['type'].append(event['type'])
+            columns['lat'].append(payload.get('lat'))
+            columns['lng'].append(payload.get('lng'))
+            columns['heading'].append(payload.get('heading'))
+            columns['pitch'].append(payload.get('pitch'))
+            columns['zoom'].append(payload.get('zoom'))
+            columns['is_active'].append(payload.get('isActive'))
+            columns['is_sticky'].append(payload.get('isSticky'))
+            columns['size'].append(payload.get('size'))
+            columns['pano_id'].append(payload.get('panoId'))
+            columns['country_code'].append(payload.get('countryCode'))
+
+        self.events_written += count
+        if len(columns['time']) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered events as a row group."""
+        if not self._columns['time']:
+            return
+
+        table = self._pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table)
+        self._columns = {name: [] for name in self.schema.names}
+
+    def close(self) -> None:
+        """Flush remaining events and finalize the part file."""
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> 'ParquetReplayWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def export_replays(results: Iterable[BatchResult], writer: Any) -> Dict[str, int]:
+    """
+    Stream replays from iter_replays() into a writer as each one arrives.
+
+    Args:
+        results: BatchResults keyed by (player_id, duel_id, round_number)
+        writer: NdjsonReplayWriter or ParquetReplayWriter
+
+    Returns:
+        dict: Counts of 'replays' written, 'events' written and 'errors'
+    """
+    counts = {'replays': 0, 'events': 0, 'errors': 0}
+
+    for result in results:
+        if result.error:
+            counts['errors'] += 1
+            continue
+
+        player_id, duel_id, round_number = result.key
+        writer.write_replay(result.data, duel_id, player_id, round_number)
+        counts['replays'] += 1
+        counts['events'] += len(result.data)
+
+    return counts
+
@@ -0,0 +1,978 @@
+"""
+Fake GeoGuessr Server
+
+A local stand-in for www.geoguessr.com and game-server.geoguessr.com that
+serves the response shapes documented in duels.md, challenges.md, feed.md,
+maps.md and social.md. Responses are generated from the request path, so
+the same duel ID always returns the same game and its replays match the
+guesses in that game. Latency, payload sizes, 429s and 5xx errors are
+configurable, which makes the server suitable for offline benchmarks.
+
+Duel IDs starting with 'live-' are played out in real time from their first
+request, for testing live monitors.
+
+Both APIs are served from one port, since their paths do not overlap.
+
+Usage:
+    python -m geoguessr.fakeserver --port 8080 --latency 0.05 --throttle-rate 0.02
+
+    export GEOGUESSR_WWW_API=http://127.0.0.1:8080/api
+    export GEOGUESSR_GAME_SERVER_API=http://127.0.0.1:8080/api
+
+Requires: pip install aiohttp numpy
+"""
+
+import argparse
+import asyncio
+import base64
+import functools
+import json
+import math
+import random
+import string
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from . import geo
+from .models import parse_timestamp
+
+# Maximum error distance of the World map, as the API reports it (whole meters)
+WORLD_MAX_ERROR_DISTANCE = int(geo.WORLD_MAX_ERROR_DISTANCE)
+
+COUNTRY_CODES = ('us', 'br', 'ru', 'ca', 'au', 'fr', 'de', 'jp', 'za', 'ar', 'id', 'mx', 'se', 'gb', 'in', 'th')
+
+# Epoch of the generated games (2026-01-01)
+BASE_TIME = 1767225600
+
+# Duel IDs with this prefix are played out in real time
+LIVE_PREFIX = 'live-'
+
+REPLAY_MOVE_TYPES = ('PanoPov', 'PanoPov', 'PanoPov', 'PanoZoom', 'MapPosition', 'MapZoom', 'PinPosition')
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Random generator seeded from parts, stable across processes."""
+    return random.Random(zlib.crc32('\0'.join(map(str, parts)).encode('utf-8')))
+
+
+def _hex_id(rng: random.Random, length: int = 24) -> str:
+    return f'{rng.getrandbits(4 * length):0{length}x}'
+
+
+def _token(rng: random.Random, length: int = 16) -> str:
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _iso(timestamp: float) -> str:
+    """Format a Unix timestamp the way the API does (7 fractional digits)."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f0Z')
+
+
+def _location(rng: random.Random) -> Tuple[float, float]:
+    return rng.uniform(-50.0, 65.0), rng.uniform(-180.0, 180.0)
+
+
+def _guess_near(rng: random.Random, lat: float, lng: float, skill: float) -> Tuple[float, float, float]:
+    """Place a guess around a location; returns (lat, lng, distance in meters)."""
+    distance = rng.lognormvariate(math.log(200_000 * skill), 1.2)
+    bearing = rng.uniform(0, 2 * math.pi)
+    guess_lat = max(-85.0, min(85.0, lat + distance / 111_320 * math.cos(bearing)))
+    scale = 111_320 * max(0.05, math.cos(math.radians(guess_lat)))
+    guess_lng = (lng + distance / scale * math.sin(bearing) + 180) % 360 - 180
+    return guess_lat, guess_lng, float(geo.haversine(lat, lng, guess_lat, guess_lng))
+
+
+def _encode(data: Any) -> bytes:
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _points(amount: int, max_points: int) -> Dict[str, Any]:
+    return {'amount': str(amount), 'unit': 'points', 'percentage': round(100 * amount / max_points, 2)}
+
+
+def _distance(meters: float) -> Dict[str, Any]:
+    return {'meters': {'amount': f'{meters / 1000:.1f}', 'unit': 'km'}}
+
+
+def _pin(rng: random.Random) -> Dict[str, Any]:
+    return {'url': f'pin/{_hex_id(rng, 32)}.png', 'anchor': 'center-center', 'isDefault': False}
+
+
+def _user(rng: random.Random) -> Dict[str, Any]:
+    """Friend object as returned by the social endpoints."""
+    user_id = _hex_id(rng)
+    level = rng.randint(1, 200)
+    return {
+        'userId': user_id,
+        'url': f'/user/{user_id}',
+        'nick': f'player_{_token(rng, 6).lower()}',
+        'pin': _pin(rng),
+        'isProUser': rng.random() < 0.7,
+        'isVerified': rng.random() < 0.02,
+        'progress': {
+            'xp': level * 1000 + rng.randrange(1000),
+            'level': level,
+            'levelXp': level * 1000,
+            'nextLevel': level + 1,
+            'nextLevelXp': (level + 1) * 1000,
+        },
+        'isOnline': rng.random() < 0.2,
+        'activity': None,
+        'avatar': {'fullBodyPath': f'pin/{_hex_id(rng, 32)}.png'},
+        'countryCode': rng.choice(COUNTRY_CODES),
+        'flair': rng.randint(0, 3),
+    }
+
+
+class FakeGeoGuessrServer:
+    """
+    aiohttp application imitating the documented GeoGuessr endpoints.
+
+    Args:
+        latency: Mean added response latency in seconds
+        jitter: Standard deviation of the added latency in seconds
+        throttle_rate: Fraction of requests answered with 429
+        retry_after: Retry-After value sent with 429 responses, in seconds
+        error_rate: Fraction of requests answered with 503
+        duel_rounds: Maximum rounds per duel (games end early when a team
+            runs out of health)
+        team_size: Players per duel team (more than 1 for team duels)
+        replay_events: Events per replay
+        leaderboard_size: Players per challenge leaderboard
+        feed_page_size: Entries per friends feed page
+        feed_pages: Number of friends feed pages
+        friend_count: Size of the friends list
+        variants: Number of distinct duels and leaderboards to generate.
+            Other IDs reuse one of them under their own ID, so generating
+            responses does not become the bottleneck of a benchmark.
+        live_speed: How many times faster than real time live duels play
+        seed: Changes every generated response
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: float = 1.0, error_rate: float = 0.0, duel_rounds: int = 8,
+                 team_size: int = 1, replay_events: int = 120, leaderboard_size: int = 50,
+                 feed_page_size: int = 31, feed_pages: int = 10, friend_count: int = 50,
+                 variants: int = 256, live_speed: float = 1.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.duel_rounds = duel_rounds
+        self.team_size = team_size
+        self.replay_events = replay_events
+        self.leaderboard_size = leaderboard_size
+        self.feed_page_size = feed_page_size
+        self.feed_pages = feed_pages
+        self.friend_count = friend_count
+        self.variants = variants
+        self.live_speed = live_speed
+        self.seed = seed
+        self.stats: Dict[str, Any] = {'requests': 0, 'bytes': 0, 'statuses': {}}
+
+        self._random = random.Random(seed)
+        self._live_started: Dict[str, float] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._render = functools.lru_cache(maxsize=512)(self._render_uncached)
+        # Generated once per variant; responses splice in the requested ID
+        self._duel = functools.lru_cache(maxsize=None)(self._build_duel)
+        self._duel_body = functools.lru_cache(maxsize=None)(lambda variant: _encode(self._duel(variant)))
+        self._leaderboard = functools.lru_cache(maxsize=None)(
+            lambda variant: _encode(self._build_leaderboard(variant))
+        )
+
+        self.app = web.Application(middlewares=[self._middleware])
+        routes = [
+            ('/api/duels/{game_id}', 'duel'),
+            ('/api/replays/{player_id}/{duel_id}/{round_number}', 'replay'),
+            ('/api/v3/results/highscores/{token}', 'highscores'),
+            ('/api/v3/challenges/{token}', 'challenge'),
+            ('/api/v4/feed/friends', 'friends_feed'),
+            ('/api/v4/feed/private', 'private_feed'),
+            ('/api/v3/social/maps/browse/{category:.+}', 'browse_maps'),
+            ('/api/v4/search/map', 'search_maps'),
+            ('/api/v3/social/friends', 'friends'),
+            ('/api/v3/social/friends/received', 'friend_requests_received'),
+            ('/api/v3/social/friends/sent', 'friend_requests_sent'),
+            ('/api/v3/social/friends/suggestions', 'friend_suggestions'),
+            ('/api/v3/social/badges/unclaimed', 'badges_unclaimed'),
+            ('/api/v3/social/badges/claimed', 'badges_claimed'),
+            ('/api/v3/social/events/unfinishedgames', 'unfinished_games'),
+        ]
+        for path, name in routes:
+            self.app.router.add_get(path, self._handle, name=name)
+        self.app.router.add_post('/api/v3/social/badges/claim', self._claim_badge)
+        self.app.router.add_get('/_fake/stats', self._stats)
+
+    # ===== Server =====
+
+    def prepare(self) -> None:
+        """Generate every duel and leaderboard variant up front, so first requests are not slower."""
+        for variant in range(self.variants):
+            self._duel_body(variant)
+            self._leaderboard(variant)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Start serving.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+
+        Returns:
+            str: Base URL to use for both GEOGUESSR_WWW_API and
+            GEOGUESSR_GAME_SERVER_API, e.g. 'http://127.0.0.1:8080/api'
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        return f'http://{bound_host}:{bound_port}/api'
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        if request.path.startswith('/_fake/'):
+            return await handler(request)
+
+        delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.throttle_rate:
+            response = web.json_response({'message': 'Too many requests'}, status=429,
+                                         headers={'Retry-After': f'{self.retry_after:g}'})
+        elif roll < self.throttle_rate + self.error_rate:
+            response = web.json_response({'message': 'Service unavailable'}, status=503)
+        else:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                self._count(e.status, 0)
+                raise
+
+        self._count(response.status, len(response.body) if isinstance(response.body, bytes) else 0)
+        return response
+
+    def _count(self, status: int, size: int) -> None:
+        self.stats['requests'] += 1
+        self.stats['bytes'] += size
+        statuses = self.stats['statuses']
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        name = request.match_info.route.name
+        if name == 'duel' and request.match_info['game_id'].startswith(LIVE_PREFIX):
+            body = _encode(self.live_duel(request.match_info['game_id']))
+            return web.Response(body=body, content_type='application/json')
+        body = self._render(name, tuple(request.match_info.items()), tuple(sorted(request.query.items())))
+        if body is None:
+            return web.json_response({'message': 'Not found'}, status=404)
+        return web.Response(body=body, content_type='application/json')
+
+    def _render_uncached(self, name: str, path_args: Tuple, query: Tuple) -> Optional[bytes]:
+        data = getattr(self, name)(**dict(path_args), **dict(query))
+        if data is None or isinstance(data, bytes):
+            return data
+        return _encode(data)
+
+    def _variant(self, key: str) -> int:
+        return zlib.crc32(key.encode('utf-8')) % self.variants
+
+    async def _claim_badge(self, request: web.Request) -> web.Response:
+        await request.read()
+        return web.json_response({})
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    # ===== Duels =====
+
+    def duel(self, game_id: str, **query: str) -> bytes:
+        """Duel state (duels.md, DuelGame)."""
+        body = self._duel_body(self._variant(game_id))
+        return b'{"gameId":' + _encode(game_id) + body[len(b'{"gameId":null'):]
+
+    def live_duel(self, game_id: str) -> Dict:
+        """
+        Duel state of a live game.
+
+        The game is the duel generated for game_id, played out from the first
+        request at live_speed times real time. Timestamps are shifted to the
+        wall clock so round timers can be used for scheduling.
+        """
+        game = json.loads(self._duel_body(self._variant(game_id)))
+        game['gameId'] = game_id
+        started = self._live_started.setdefault(game_id, time.time())
+        base = parse_timestamp(game['rounds'][0]['startTime'])
+        now = base + (time.time() - started) * self.live_speed
+
+        def wall(value: Optional[str]) -> Optional[str]:
+            return _iso(started + (parse_timestamp(value) - base) / self.live_speed) if value else value
+
+        events_per_round = 2 * self.team_size + 2
+        rounds = [r for r in game['rounds'] if parse_timestamp(r['startTime']) <= now]
+        current = rounds[-1]
+        processed = parse_timestamp(current['endTime']) <= now
+        finished = processed and current is game['rounds'][-1]
+        completed = current['roundNumber'] if processed else current['roundNumber'] - 1
+        version = events_per_round * completed + len(rounds)
+
+        if not processed:
+            current['hasProcessedRoundTimeout'] = False
+            current['endTime'] = None
+            if parse_timestamp(current['timerStartTime']) > now:
+                current['timerStartTime'] = None
+
+        for team in game['teams']:
+            team['roundResults'] = team['roundResults'][:completed]
+            team['health'] = team['roundResults'][-1]['healthAfter'] if completed else game['initialHealth']
+            team['currentMultiplier'] = current['multiplier']
+            team['isMultiplierActive'] = current['multiplier'] > 1
+            for result in team['roundResults']:
+                result['bestGuess']['created'] = wall(result['bestGuess']['created'])
+
+            for player in team['players']:
+                guesses = []
+                for guess in player['guesses']:
+                    if guess['roundNumber'] > current['roundNumber'] or parse_timestamp(guess['created']) > now:
+                        continue
+                    if guess['roundNumber'] > completed:
+                        guess['score'] = None
+                        guess['isTeamsBestGuessOnRound'] = False
+                        version += 1
+                    guess['created'] = wall(guess['created'])
+                    guesses.append(guess)
+                player['guesses'] = guesses
+                if not finished:
+                    player['progressChange'] = None
+
+        for game_round in rounds:
+            for key in ('startTime', 'endTime', 'timerStartTime'):
+                game_round[key] = wall(game_round[key])
+
+        game['rounds'] = rounds
+        game['options']['roundTime'] /= self.live_speed
+        game['currentRoundNumber'] = current['roundNumber']
+        game['version'] = version
+        if not finished:
+            game['status'] = 'InProgress'
+            game['result'] = {'isDraw': False, 'winningTeamId': None, 'winnerStyle': None}
+        return game
+
+    def _build_duel(self, variant: int) -> Dict:
+        rng = _rng(self.seed, 'duel', variant)
+        start = BASE_TIME + rng.randrange(30 * 86400)
+        initial_health = 6000
+        game_mode = rng.choice(('NoMoveDuels', 'MoveDuels', 'NmpzDuels'))
+
+        teams = []
+        for name in ('blue', 'red'):
+            players = []
+            for _ in range(self.team_size):
+                rating = rng.randint(600, 1800)
+                players.append({
+                    'playerId': _hex_id(rng),
+                    'guesses': [],
+                    'rating': rating,
+                    'countryCode': rng.choice(COUNTRY_CODES),
+                    'progressChange': None,
+                    'pin': dict(zip(('lat', 'lng'), _location(rng))),
+                    'helpRequested': False,
+                    'isSteam': rng.random() < 0.1,
+                    '_skill': rng.uniform(0.2, 3.0),
+                })
+            teams.append({
+                'id': _uuid(rng),
+                'name': name,
+                'health': initial_health,
+                'players': players,
+                'roundResults': [],
+                'isMultiplierActive': False,
+                'currentMultiplier': 1,
+            })
+
+        rounds = []
+        for number in range(1, self.duel_rounds + 1):
+            lat, lng = _location(rng)
+            multiplier = 1 + 0.5 * max(0, number - 4)
+            round_start = start + (number - 1) * 75
+            rounds.append({
+                'roundNumber': number,
+                'panorama': {
+                    'panoId': _hex_id(rng, 44).upper(),
+                    'lat': lat,
+                    'lng': lng,
+                    'countryCode': rng.choice(COUNTRY_CODES),
+                    'heading': rng.uniform(0, 360),
+                    'pitch': rng.uniform(-5, 5),
+                    'zoom': 0,
+                },
+                'hasProcessedRoundTimeout': True,
+                'isHealingRound': False,
+                'multiplier': multiplier,
+                'damageMultiplier': multiplier,
+                'startTime': _iso(round_start),
+                'endTime': _iso(round_start + 60),
+                'timerStartTime': _iso(round_start + rng.uniform(5, 40)),
+            })
+
+            best_guesses = []
+            for team in teams:
+                team_guesses = []
+                for player in team['players']:
+                    guess_lat, guess_lng, distance = _guess_near(rng, lat, lng, player['_skill'])
+                    guess = {
+                        'roundNumber': number,
+                        'lat': guess_lat,
+                        'lng': guess_lng,
+                        'distance': distance,
+                        'created': _iso(round_start + rng.uniform(5, 60)),
+                        'isTeamsBestGuessOnRound': False,
+                        'score': None,
+                    }
+                    player['guesses'].append(guess)
+                    team_guesses.append(guess)
+
+                best = min(team_guesses, key=lambda g: g['distance'])
+                best['isTeamsBestGuessOnRound'] = True
+                best['score'] = int(geo.score(best['distance']))
+                best_guesses.append(best)
+
+            scores = [guess['score'] for guess in best_guesses]
+            damage = round(abs(scores[0] - scores[1]) * multiplier)
+            loser = 0 if scores[0] < scores[1] else 1
+
+            for index, team in enumerate(teams):
+                health_before = team['health']
+                if index == loser:
+                    team['health'] = max(0, health_before - damage)
+                team['roundResults'].append({
+                    'roundNumber': number,
+                    'score': scores[index],
+                    'healthBefore': health_before,
+                    'healthAfter': team['health'],
+                    'bestGuess': best_guesses[index],
+                    'activeMultiplier': multiplier > 1,
+                    'damageDealt': damage if index != loser else 0,
+                    'multiplier': multiplier,
+                })
+                team['isMultiplierActive'] = multiplier > 1
+                team['currentMultiplier'] = multiplier
+
+            if any(team['health'] == 0 for team in teams):
+                break
+
+        winner = max(teams, key=lambda t: t['health'])
+        for team in teams:
+            won = team is winner
+            for player in team['players']:
+                del player['_skill']
+                change = rng.randint(5, 40) * (1 if won else -1)
+                player['progressChange'] = {
+                    'xpProgressions': [],
+                    'awardedXp': {
+                        'totalAwardedXp': 100 if won else 50,
+                        'xpAwards': [{'xp': 100 if won else 50, 'reason': 'DuelCompleted', 'count': 1}],
+                    },
+                    'medal': 'None',
+                    'competitiveProgress': None,
+                    'rankedSystemProgress': {
+                        'points': {},
+                        'totalWeeklyPoints': rng.randint(0, 500),
+                        'weeklyCap': 500,
+                        'gamesPlayedWithinWeeklyCap': rng.randint(0, 50),
+                        'positionBefore': rng.randint(1, 100_000),
+                        'positionAfter': rng.randint(1, 100_000),
+                        'ratingBefore': player['rating'],
+                        'ratingAfter': player['rating'] + change,
+                        'winStreak': rng.randint(0, 5) if won else 0,
+                        'bucketSortedBy': 'Rating',
+                        'gameMode': game_mode,
+                        'gameModeRatingBefore': player['rating'],
+                        'gameModeRatingAfter': player['rating'] + change,
+                        'gameModeGamesPlayed': rng.randint(10, 2000),
+                        'gameModeGamesRequired': 10,
+                        'placementGamesPlayed': 10,
+                        'placementGamesRequired': 10,
+                    },
+                    'rankedTeamDuelsProgress': None,
+                    'quickplayDuelsProgress': None,
+                }
+
+        movement = {
+            'forbidMoving': game_mode != 'MoveDuels',
+            'forbidZooming': game_mode == 'NmpzDuels',
+            'forbidRotating': game_mode == 'NmpzDuels',
+        }
+        bounds = {'min': {'lat': -65.0, 'lng': -180.0}, 'max': {'lat': 80.0, 'lng': 180.0}}
+
+        return {
+            'gameId': None,
+            'teams': teams,
+            'rounds': rounds,
+            'currentRoundNumber': len(teams[0]['roundResults']),
+            'status': 'Finished',
+            'version': 10 * len(teams[0]['roundResults']) + rng.randint(0, 9),
+            'options': {
+                'initialHealth': initial_health,
+                'individualInitialHealth': False,
+                'initialHealthTeamOne': initial_health,
+                'initialHealthTeamTwo': initial_health,
+                'roundTime': 15,
+                'maxRoundTime': 60,
+                'gracePeriodTime': 0,
+                'gameTimeOut': 7200,
+                'maxNumberOfRounds': 0,
+                'healingRounds': [],
+                'movementOptions': movement,
+                'mapSlug': 'world',
+                'isRated': True,
+                'map': {'name': 'World', 'slug': 'world', 'bounds': bounds,
+                        'maxErrorDistance': WORLD_MAX_ERROR_DISTANCE},
+                'duelRoundOptions': [],
+                'roundsWithoutDamageMultiplier': 4,
+                'disableMultipliers': False,
+                'multiplierIncrement': 5,
+                'disableHealing': False,
+                'isTeamDuels': self.team_size > 1,
+                'gameContext': None,
+                'roundStartingBehavior': 'Default',
+                'flashbackRounds': [],
+                'competitiveGameMode': game_mode,
+                'countAllGuesses': False,
+                'masterControlAutoStartRounds': False,
+                'consumedLocationsIdentifier': _uuid(rng),
+                'useCuratedLocations': False,
+                'extraWaitTimeBetweenRounds': 0,
+                'roundCountdownDelay': 0,
+                'guessMapType': 'Default',
+                'botBehaviors': None,
+                'activeMultiplier': True,
+            },
+            'movementOptions': movement,
+            'mapBounds': bounds,
+            'initialHealth': initial_health,
+            'maxNumberOfRounds': 0,
+            'result': {
+                'isDraw': False,
+                'winningTeamId': winner['id'],
+                'winnerStyle': 'Victory',
+            },
+            'isPaused': False,
+            'gameServerNodeId': None,
+            'tournamentId': '',
+        }
+
+    def replay(self, player_id: str, duel_id: str, round_number: str, **query: str) -> Optional[List[Dict]]:
+        """Replay events for one player and round (duels.md, ReplayEvent)."""
+        variant = self._variant(duel_id)
+        game = self._duel(variant)
+        number = int(round_number) if round_number.isdigit() else 0
+        if not 1 <= number <= game['currentRoundNumber']:
+            return None
+
+        player = next((p for team in game['teams'] for p in team['players'] if p['playerId'] == player_id), None)
+        if player is None:
+            return None
+
+        rng = _rng(self.seed, 'replay', player_id, variant, number)
+        game_round = game['rounds'][number - 1]
+        guess = player['guesses'][number - 1]
+        pano = game_round['panorama']
+        time = int(parse_timestamp(game_round['startTime']) * 1000)
+        end = int(parse_timestamp(guess['created']) * 1000)
+
+        events = [
+            {'time': time, 'type': 'PanoPosition',
+             'payload': {'lat': pano['lat'], 'lng': pano['lng'], 'panoId': _token(rng, 22)}},
+            {'time': time, 'type': 'PanoPov', 'payload': {'heading': pano['heading'], 'pitch': pano['pitch']}},
+            {'time': time, 'type': 'PanoZoom', 'payload': {'zoom': 0}},
+        ]
+        step = max(1, (end - time) // max(1, self.replay_events))
+        map_open = False
+        pin_lat, pin_lng = guess['lat'], guess['lng']
+
+        for _ in range(max(0, self.replay_events - len(events) - 1)):
+            time += rng.randint(1, 2 * step)
+            if not map_open or rng.random() < 0.05:
+                map_open = not map_open
+                events.append({'time': time, 'type': 'MapDisplay',
+                               'payload': {'isActive': map_open, 'isSticky': False, 'size': rng.randint(1, 4)}})
+                continue
+
+            event_type = rng.choice(REPLAY_MOVE_TYPES)
+            if event_type == 'PanoPov':
+                payload = {'heading': rng.uniform(0, 360), 'pitch': rng.uniform(-30, 30)}
+            elif event_type in ('PanoZoom', 'MapZoom'):
+                payload = {'zoom': rng.uniform(0, 4) if event_type == 'PanoZoom' else rng.randint(1, 12)}
+            elif event_type == 'PinPosition':
+                pin_lat = guess['lat'] + rng.gauss(0, 2)
+                pin_lng = guess['lng'] + rng.gauss(0, 2)
+                payload = {'lat': pin_lat, 'lng': pin_lng}
+            else:
+                payload = {'lat': rng.uniform(-60, 70), 'lng': rng.uniform(-180, 180)}
+            events.append({'time': time, 'type': event_type, 'payload': payload})
+
+        events.append({'time': max(time, end), 'type': 'GuessWithLatLng',
+                       'payload': {'lat': guess['lat'], 'lng': guess['lng']}})
+        return events
+
+    # ===== Challenges =====
+
+    def _challenge_rounds(self, variant: int) -> List[Dict]:
+        rng = _rng(self.seed, 'challenge-rounds', variant)
+        start = BASE_TIME + rng.randrange(30 * 86400)
+        rounds = []
+        for index in range(5):
+            lat, lng = _location(rng)
+            rounds.append({
+                'lat': lat,
+                'lng': lng,
+                'panoId': _hex_id(rng, 44).upper(),
+                'heading': rng.randrange(360),
+                'pitch': rng.randint(-5, 5),
+                'zoom': 0,
+                'streakLocationCode': rng.choice(COUNTRY_CODES),
+                'startTime': _iso(start + index * 90),
+            })
+        return rounds
+
+    def challenge(self, token: str, **query: str) -> Dict:
+        """Challenge settings (challenges.md, Get Challenge Info)."""
+        return {'token': token, 'name': f'Challenge {token[:4]}', **self._challenge_settings(self._variant(token))}
+
+    def _challenge_settings(self, variant: int) -> Dict:
+        rng = _rng(self.seed, 'challenge', variant)
+        return {
+            'map': '6089bfcff6a0770001f645dd',
+            'mapName': 'An Arbitrary World',
+            'mode': 'standard',
+            'timeLimit': rng.choice((0, 60, 120)),
+            'forbidMoving': True,
+            'forbidZooming': True,
+            'forbidRotating': True,
+            'rounds': 5,
+            'creator': {'id': _hex_id(rng), 'nick': f'player_{_token(rng, 6).lower()}'},
+        }
+
+    def highscores(self, token: str, **query: str) -> bytes:
+        """Challenge leaderboard (challenges.md, PlayerResult)."""
+        return self._leaderboard(self._variant(token))
+
+    def _build_leaderboard(self, variant: int) -> Dict:
+        rng = _rng(self.seed, 'highscores', variant)
+        info = self._challenge_settings(variant)
+        rounds = self._challenge_rounds(variant)
+        items = []
+
+        for _ in range(self.leaderboard_size):
+            skill = rng.uniform(0.1, 3.0)
+            guesses = []
+            for location in rounds:
+                guess_lat, guess_lng, distance = _guess_near(rng, location['lat'], location['lng'], skill)
+                points = int(geo.score(distance))
+                guesses.append({
+                    'lat': guess_lat,
+                    'lng': guess_lng,
+                    'timedOut': False,
+                    'roundScore': _points(points, 5000),
+                    'roundScoreInPoints': points,
+                    'distance': _distance(distance),
+                    'distanceInMeters': distance,
+                    'time': rng.randint(3, 120),
+                    'stepsCount': 0,
+                })
+
+            total = sum(g['roundScoreInPoints'] for g in guesses)
+            total_distance = sum(g['distanceInMeters'] for g in guesses)
+            items.append({'game': {
+                'token': _token(rng),
+                'type': 'challenge',
+                'mode': info['mode'],
+                'state': 'finished',
+                'roundCount': len(rounds),
+                'timeLimit': info['timeLimit'],
+                'forbidMoving': info['forbidMoving'],
+                'forbidZooming': info['forbidZooming'],
+                'forbidRotating': info['forbidRotating'],
+                'streakType': 'countrystreak',
+                'map': info['map'],
+                'mapName': info['mapName'],
+                'round': len(rounds),
+                'rounds': rounds,
+                'player': {
+                    'id': _hex_id(rng),
+                    'nick': f'player_{_token(rng, 6).lower()}',
+                    'isVerified': False,
+                    'flair': rng.randint(0, 3),
+                    'countryCode': rng.choice(COUNTRY_CODES),
+                    'totalScore': _points(total, 25000),
+                    'totalDistance': _distance(total_distance),
+                    'totalDistanceInMeters': total_distance,
+                    'totalTime': sum(g['time'] for g in guesses),
+                    'guesses': guesses,
+                },
+            }})
+
+        items.sort(key=lambda item: -item['game']['player']['totalScore']['percentage'])
+        return {'items': items, 'paginationToken': None}
+
+    # ===== Feed =====
+
+    def _feed_entry(self, rng: random.Random, timestamp: float) -> Dict:
+        entry_type = rng.choice((2, 2, 6, 6, 6, 7, 9, 11))
+        if entry_type == 2:
+            payload: Any = {'mapSlug': 'world', 'mapName': 'World', 'points': rng.randint(0, 25000),
+                            'challengeToken': _token(rng), 'gameMode': 'Standard',
+                            'isDailyChallenge': rng.random() < 0.2}
+        elif entry_type in (6, 11):
+            payload = {'gameId': _hex_id(rng), 'gameMode': 'Duels',
+                       'competitiveGameMode': rng.choice(('NmpzDuels', 'NoMoveDuels', 'StandardDuels'))}
+        elif entry_type == 9:
+            payload = {'gameId': _uuid(rng), 'partyId': _uuid(rng), 'gameMode': rng.choice(('Bullseye', 'Duels'))}
+        else:
+            payload = [{'type': 2, 'time': _iso(timestamp - i * 60),
+                        'payload': {'mapSlug': 'world', 'mapName': 'World', 'points': rng.randint(0, 25000),
+                                    'challengeToken': _token(rng), 'gameMode': 'Standard',
+                                    'isDailyChallenge': False}}
+                       for i in range(rng.randint(2, 5))]
+
+        return {
+            'type': entry_type,
+            'time': _iso(timestamp),
+            'user': {
+                'id': _hex_id(rng),
+                'nick': f'player_{_token(rng, 6).lower()}',
+                'isVerified': False,
+                'flair': rng.randint(0, 3),
+                'avatar': _pin(rng),
+            },
+            'payload': json.dumps(payload, separators=(',', ':')),
+        }
+
+    def friends_feed(self, paginationToken: Optional[str] = None, **query: str) -> Optional[Dict]:
+        """One page of the friends feed (feed.md, FeedResponse)."""
+        page = 0
+        if paginationToken:
+            try:
+                page = json.loads(base64.b64decode(paginationToken))['page']
+            except (ValueError, KeyError, TypeError):
+                return None
+        if page >= self.feed_pages:
+            return {'entries': [], 'paginationToken': None}
+
+        rng = _rng(self.seed, 'feed', page)
+        newest = BASE_TIME + 30 * 86400 - page * self.feed_page_size * 300
+        entries = [self._feed_entry(rng, newest - i * 300) for i in range(self.feed_page_size)]
+        next_token = None
+        if page + 1 < self.feed_pages:
+            next_token = base64.b64encode(json.dumps({'page': page + 1}).encode('utf-8')).decode('ascii')
+        return {'entries': entries, 'paginationToken': next_token}
+
+    def private_feed(self, **query: str) -> Dict:
+        """Private feed, same shape as the friends feed."""
+        rng = _rng(self.seed, 'private-feed')
+        newest = BASE_TIME + 30 * 86400
+        return {'entries': [self._feed_entry(rng, newest - i * 3600) for i in range(10)],
+                'paginationToken': None}
+
+    # ===== Maps =====
+
+    def _map(self, rng: random.Random) -> Dict:
+        map_id = _hex_id(rng)
+        creator = _user(rng)
+        difficulty = rng.randint(1, 5)
+        lat, lng = _location(rng)
+        return {
+            'id': map_id,
+            'name': f'Map {_token(rng, 6)}',
+            'slug': map_id,
+            'description': None,
+            'url': f'/maps/{map_id}',
+            'playUrl': f'/maps/{map_id}/play',
+            'published': True,
+            'banned': False,
+            'images': {'backgroundLarge': None, 'incomplete': False},
+            'bounds': {'min': {'lat': lat - 10, 'lng': lng - 10}, 'max': {'lat': lat + 10, 'lng': lng + 10}},
+            'customCoordinates': None,
+            'coordinateCount': rng.choice(('250+', '1000+', '10K+', '50K+', '100K+', '1M+')),
+            'regions': None,
+            'creator': {
+                'nick': creator['nick'],
+                'id': creator['userId'],
+                'countryCode': creator['countryCode'],
+                'isProUser': creator['isProUser'],
+                'type': 'Pro',
+                'isVerified': creator['isVerified'],
+                'pin': creator['pin'],
+                'url': creator['url'],
+                'progress': creator['progress'],
+                'flair': creator['flair'],
+            },
+            'createdAt': _iso(BASE_TIME - rng.randrange(3 * 365 * 86400)),
+            'updatedAt': _iso(BASE_TIME - rng.randrange(30 * 86400)),
+            'numFinishedGames': rng.randrange(10_000_000),
+            'likedByUser': None,
+            'averageScore': rng.randrange(5000, 20000),
+            'avatar': {'background': 'day', 'decoration': 'cactus', 'ground': 'green', 'landscape': 'mountains'},
+            'difficulty': ('EASY', 'EASY', 'MEDIUM', 'HARD', 'HARD')[difficulty - 1],
+            'difficultyLevel': difficulty,
+            'highscore': None,
+            'isUserMap': True,
+            'highlighted': False,
+            'deleted': False,
+            'free': rng.random() < 0.5,
+            'panoramaProvider': 'StreetView',
+            'inExplorerMode': False,
+            'maxErrorDistance': rng.randint(100_000, WORLD_MAX_ERROR_DISTANCE),
+            'likes': rng.randrange(100_000),
+            'locationSelectionMode': 0,
+            'tags': rng.sample(('Global', 'Hand-picked', 'Official Cov.', 'Urban', 'Rural'), 2),
+            'collaborators': None,
+            'flair': 0,
+            'mapSize': None,
+        }
+
+    def browse_maps(self, category: str, **query: str) -> Optional[List[Dict]]:
+        """Ten maps for a browse category (maps.md, MapObject)."""
+        if category not in ('featured', 'popular/all', 'popular/official'):
+            return None
+        rng = _rng(self.seed, 'maps', category)
+        return [self._map(rng) for _ in range(10)]
+
+    def search_maps(self, q: str = '', **query: str) -> List[Dict]:
+        """Up to ten maps matching a query."""
+        rng = _rng(self.seed, 'search-maps', q.lower())
+        return [self._map(rng) for _ in range(10)]
+
+    # ===== Social =====
+
+    def friends(self, **query: str) -> List[Dict]:
+        """Friends list (social.md, Friend Object)."""
+        rng = _rng(self.seed, 'friends')
+        return [_user(rng) for _ in range(self.friend_count)]
+
+    def friend_requests_received(self, **query: str) -> List[Dict]:
+        rng = _rng(self.seed, 'friends-received')
+        return [_user(rng) for _ in range(3)]
+
+    def friend_requests_sent(self, **query: str) -> List[Dict]:
+        return []
+
+    def friend_suggestions(self, **query: str) -> List[Dict]:
+        rng = _rng(self.seed, 'friend-suggestions')
+        return [_user(rng) for _ in range(10)]
+
+    def badges_unclaimed(self, **query: str) -> List[Dict]:
+        return []
+
+    def badges_claimed(self, **query: str) -> List[Dict]:
+        rng = _rng(self.seed, 'badges')
+        return [{
+            'id': _token(rng, 32),
+            'name': f'Badge {index + 1}',
+            'hint': 'Complete a trip around the world in singleplayer',
+            'description': None,
+            'imagePath': f'badge/{_hex_id(rng, 32)}.png',
+        } for index in range(20)]
+
+    def unfinished_games(self, offset: str = '0', **query: str) -> Dict:
+        """One page of unfinished games (social.md, Unfinished Game Object)."""
+        start = int(offset) if offset.isdigit() else 0
+        rng = _rng(self.seed, 'unfinished', start)
+        games = []
+        for index in range(10):
+            round_number = rng.randint(1, 5)
+            scores = [rng.randint(0, 5000) for _ in range(round_number - 1)]
+            last_activity = BASE_TIME + 30 * 86400 - (start + index) * 3600
+            games.append({
+                'token': _token(rng),
+                'map': 'World',
+                'mapSlug': 'world',
+                'score': _points(sum(scores), 25000),
+                'dateTime': _iso(last_activity - 600),
+                'lastActivity': _iso(last_activity),
+                'guesses': [{'score': _points(score, 5000), 'distance': _distance(rng.uniform(0, 5_000_000))}
+                            for score in scores],
+                'rounds': 5,
+                'round': round_number,
+                'type': 0,
+                'mode': 0,
+                'locationThumbnail': None,
+                'mapImage': None,
+                'mapAvatar': None,
+            })
+        return {'games': games, 'nextOffset': str(start + 10)}
+
+
+async def serve(server: FakeGeoGuessrServer, host: str, port: int) -> None:
+    """Run a fake server until cancelled, printing its base URL first."""
+    base_url = await server.start(host, port)
+    print(f'Serving fake GeoGuessr API on {base_url}', flush=True)
+    print(f'  export GEOGUESSR_WWW_API={base_url}', flush=True)
+    print(f'  export GEOGUESSR_GAME_SERVER_API={base_url}', flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve fake GeoGuessr API responses locally.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080, help='0 picks a free port')
+    parser.add_argument('--latency', type=float, default=0.0, help='mean added latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latency standard deviation in seconds')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After sent with 429s')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--duel-rounds', type=int, default=8)
+    parser.add_argument('--team-size', type=int, default=1)
+    parser.add_argument('--replay-events', type=int, default=120)
+    parser.add_argument('--leaderboard-size', type=int, default=50, help='players per challenge leaderboard')
+    parser.add_argument('--feed-page-size', type=int, default=31)
+    parser.add_argument('--feed-pages', type=int, default=10)
+    parser.add_argument('--friend-count', type=int, default=50)
+    parser.add_argument('--variants', type=int, default=256, help='distinct duels and leaderboards')
+    parser.add_argument('--live-speed', type=float, default=1.0,
+                        help="how many times faster than real time 'live-' duels play")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prepare', action='store_true', help='generate all variants before serving')
+    args = parser.parse_args()
+
+    server = FakeGeoGuessrServer(
+        latency=args.latency, jitter=args.jitter, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, error_rate=args.error_rate, duel_rounds=args.duel_rounds,
+        team_size=args.team_size, replay_events=args.replay_events, leaderboard_size=args.leaderboard_size,
+        feed_page_size=args.feed_page_size, feed_pages=args.feed_pages, friend_count=args.friend_count,
+        variants=args.variants, live_speed=args.live_speed, seed=args.seed,
+    )
+    if args.prepare:
+        server.prepare()
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Fast JSON Decoding
+
+Decodes API responses with the fastest JSON library installed: orjson,
+then msgspec, then the standard library json module. Large leaderboards
+and replays decode several times faster with orjson or msgspec, and both
+clients and response.json() go through this module.
+
+Usage:
+    from geoguessr import fastjson
+
+    data = fastjson.loads(response.content)
+    fastjson.set_decoder('json')        # force a backend, or pass any callable
+
+    # Or choose the backend for every script without changing code:
+    export GEOGUESSR_JSON=json
+
+Requires: nothing (pip install orjson or msgspec for faster decoding)
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Union
+
+Decoder = Callable[[Union[bytes, str]], Any]
+
+
+def _orjson() -> Decoder:
+    import orjson
+    return orjson.loads
+
+
+def _msgspec() -> Decoder:
+    import msgspec
+
+    decode = msgspec.json.decode
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decode(data)
+        except msgspec.DecodeError as e:
+            # Callers expect the same ValueError subclass as json.loads raises
+            raise json.JSONDecodeError(str(e), data if isinstance(data, str) else '', 0) from e
+
+    return loads
+
+
+def _stdlib() -> Decoder:
+    return json.loads
+
+
+# Backends in order of preference
+BACKENDS: Dict[str, Callable[[], Decoder]] = {
+    'orjson': _orjson,
+    'msgspec': _msgspec,
+    'json': _stdlib,
+}
+
+backend: Optional[str] = None
+_loads: Decoder = json.loads
+
+
+def set_decoder(decoder: Union[str, Decoder, None] = None) -> str:
+    """
+    Choose the JSON decoder used by the clients.
+
+    Args:
+        decoder: Backend name ('orjson', 'msgspec' or 'json'), any callable
+            that takes bytes or str, or None for the fastest installed backend
+
+    Returns:
+        str: Name of the backend now in use ('custom' for a callable)
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If the named backend is not installed
+    """
+    global backend, _loads
+
+    if callable(decoder):
+        _loads, backend = decoder, 'custom'
+        return backend
+
+    if decoder is not None:
+        if decoder not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend {decoder!r}, expected one of {', '.join(BACKENDS)}")
+        _loads, backend = BACKENDS[decoder](), decoder
+        return backend
+
+    for name, factory in BACKENDS.items():
+        try:
+            _loads = factory()
+        except ImportError:
+            continue
+        backend = name
+        return backend
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document.
+
+    Args:
+        data: JSON text, as UTF-8 bytes or str
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If data is not valid JSON (json.JSONDecodeError for the
+            built-in backends)
+    """
+    return _loads(data)
+
+
+set_decoder(os.getenv('GEOGUESSR_JSON') or None)
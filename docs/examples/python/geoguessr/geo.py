@@ -0,0 +1,173 @@
+"""
+Vectorized Distances and Scores
+
+Great-circle distances and 5k-style round scores for whole arrays of
+(guess, target) pairs in one call. Any mix of scalars and arrays broadcasts,
+so one target can be scored against millions of guesses, or millions of
+guesses against their own targets. score_pins() scores every PinPosition in
+replay columns to show how close a player got before the final guess.
+
+Usage:
+    distance = haversine(guess_lat, guess_lng, target_lat, target_lng)
+    points = score(distance, max_error=game_map['maxErrorDistance'])
+
+    pins = score_pins(to_columns(events), pano['lat'], pano['lng'])
+    print(pins['closest_distance'], pins['final_score'])
+
+Requires: pip install numpy
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from .replay import GUESS, PIN_POSITION, ReplayColumns, first_index
+
+# Mean Earth radius in meters
+EARTH_RADIUS = 6371000.0
+
+# maxErrorDistance of the World map in meters
+WORLD_MAX_ERROR_DISTANCE = 14916862.0
+
+MAX_SCORE = 5000
+
+NAN = float('nan')
+
+
+def haversine(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray,
+              radius: float = EARTH_RADIUS) -> np.ndarray:
+    """
+    Great-circle distance between coordinate pairs.
+
+    Args:
+        lat1, lng1: First coordinates in degrees (scalars or arrays)
+        lat2, lng2: Second coordinates in degrees, broadcast against the first
+        radius: Sphere radius in meters
+
+    Returns:
+        np.ndarray: Distances in meters (float64), NaN where any input is NaN
+    """
+    phi1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    phi2 = np.radians(np.asarray(lat2, dtype=np.float64))
+    lambda1 = np.radians(np.asarray(lng1, dtype=np.float64))
+    lambda2 = np.radians(np.asarray(lng2, dtype=np.float64))
+
+    h = np.sin((phi2 - phi1) * 0.5)
+    h = h * h
+    sin_dlambda = np.sin((lambda2 - lambda1) * 0.5)
+    h = h + np.cos(phi1) * np.cos(phi2) * (sin_dlambda * sin_dlambda)
+
+    return (2.0 * radius) * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def score(distance: np.ndarray, max_error: float = WORLD_MAX_ERROR_DISTANCE) -> np.ndarray:
+    """
+    Round score for guess distances: 5000 * exp(-10 * distance / max_error).
+
+    Args:
+        distance: Distances in meters
+        max_error: The map's maxErrorDistance in meters
+
+    Returns:
+        np.ndarray: Scores rounded to whole points (float64, NaN where the
+        distance is NaN)
+    """
+    return np.rint(MAX_SCORE * np.exp(np.asarray(distance, dtype=np.float64) * (-10.0 / max_error)))
+
+
+def distance_for_score(points: np.ndarray, max_error: float = WORLD_MAX_ERROR_DISTANCE) -> np.ndarray:
+    """
+    Inverse of score(): the distance in meters at which a guess earns the given points.
+
+    Args:
+        points: Scores between 0 (exclusive) and 5000
+        max_error: The map's maxErrorDistance in meters
+
+    Returns:
+        np.ndarray: Distances in meters (float64)
+    """
+    return -(max_error / 10.0) * np.log(np.asarray(points, dtype=np.float64) / MAX_SCORE)
+
+
+def score_guesses(guess_lat: np.ndarray, guess_lng: np.ndarray, target_lat: np.ndarray,
+                  target_lng: np.ndarray, max_error: float = WORLD_MAX_ERROR_DISTANCE) -> Dict[str, np.ndarray]:
+    """
+    Distances and scores of guesses against their targets.
+
+    Args:
+        guess_lat, guess_lng: Guess coordinates in degrees
+        target_lat, target_lng: Target coordinates, broadcast against the guesses
+        max_error: The map's maxErrorDistance in meters
+
+    Returns:
+        dict: 'distance' in meters and 'score' in points
+    """
+    distance = haversine(guess_lat, guess_lng, target_lat, target_lng)
+    return {'distance': distance, 'score': score(distance, max_error)}
+
+
+def score_pins(columns: ReplayColumns, target_lat: np.ndarray, target_lng: np.ndarray,
+               max_error: float = WORLD_MAX_ERROR_DISTANCE) -> Dict[str, np.ndarray]:
+    """
+    Score every pin placement and the final guess of one or more replays.
+
+    Args:
+        columns: Replay columns (see geoguessr.replay), one or many replays
+        target_lat, target_lng: Round location of each replay (scalars for a
+            single replay, or arrays with one entry per replay)
+        max_error: The map's maxErrorDistance in meters
+
+    Returns:
+        dict: Per event (aligned with the columns): distance and score, NaN
+            for events other than PinPosition and GuessWithLatLng.
+            Per replay: pin_count, closest_distance and best_score over
+            the pins, closest_time (seconds from the replay's first event to
+            the closest pin), final_distance and final_score of the guess.
+    """
+    count = columns.replay_count
+    replay_index = columns.replay_index
+    target_lat = np.broadcast_to(np.asarray(target_lat, dtype=np.float64), (count,))
+    target_lng = np.broadcast_to(np.asarray(target_lng, dtype=np.float64), (count,))
+
+    is_pin = columns.type == PIN_POSITION
+    scored = is_pin | (columns.type == GUESS)
+    positions = np.flatnonzero(scored)
+
+    distance = np.full(len(columns), NAN)
+    owner = replay_index[positions]
+    distance[positions] = haversine(columns.lat[positions], columns.lng[positions],
+                                    target_lat[owner], target_lng[owner])
+    points = score(distance, max_error)
+
+    pin_positions = np.flatnonzero(is_pin)
+    pin_owner = replay_index[pin_positions]
+    closest_distance = np.full(count, np.inf)
+    np.minimum.at(closest_distance, pin_owner, distance[pin_positions])
+
+    # Earliest pin reaching each replay's closest distance
+    at_closest = np.zeros(len(columns), dtype=bool)
+    at_closest[pin_positions] = distance[pin_positions] == closest_distance[pin_owner]
+    closest = first_index(at_closest, replay_index, count)
+
+    pin_count = np.bincount(pin_owner, minlength=count)
+    closest_distance[pin_count == 0] = NAN
+
+    starts = columns.offsets[:-1]
+    closest_time = np.full(count, NAN)
+    found = closest >= 0
+    closest_time[found] = (columns.time[closest[found]] - columns.time[starts[found]]) / 1000
+
+    final = first_index(columns.type == GUESS, replay_index, count)
+    final_distance = np.full(count, NAN)
+    final_distance[final >= 0] = distance[final[final >= 0]]
+
+    return {
+        'distance': distance,
+        'score': points,
+        'pin_count': pin_count,
+        'closest_distance': closest_distance,
+        'best_score': score(closest_distance, max_error),
+        'closest_time': closest_time,
+        'final_distance': final_distance,
+        'final_score': score(final_distance, max_error),
+    }
@@ -0,0 +1,687 @@
+"""
+GeoClassics Rules Engine
+
+Recomputes duels under the GeoClassics Duels userscript rules (see
+docs/userscripts/geoclassics-duels.md) for many games at once, so a whole
+season of archived duels can be re-scored under several rule variants in
+one batch job. There are two modes:
+
+    CLASSICS      roundWinMultiplierIncrement > 0. Each round outside the
+                  tie range deals |score difference| * the winner's
+                  multiplier to the loser, and the winner's multiplier then
+                  grows by the increment. Ends when a team's health hits 0.
+    PINPOINTING   roundWinMultiplierIncrement == 0. Rounds award points
+                  (+2 for the only 5000, +1 to the faster of two 5000s, +1
+                  for a win outside the tie range). Guesses made before the
+                  penalty time score 0 unless they are 5000. Ends when a
+                  team reaches the win threshold.
+
+The tie range is floor((5000 - best score) / tie_divisor). Duels are first
+converted to per-round arrays; every simulation is then a loop over rounds
+that updates all games at once.
+
+Usage:
+    columns = to_geoclassics_columns(archive.iter_games(status='Finished'))
+    state = simulate_classics(columns, GeoClassicsRules(round_win_multiplier_increment=0.5))
+    table = compare_rules(columns, [GeoClassicsRules(round_win_multiplier_increment=i) for i in (0.25, 0.5, 1)])
+
+    geoclassics_summary(game)     # like calculateClassicsSummary for one duel
+
+    # Live: keep per-duel state and apply only newly finished rounds
+    tracker = GeoClassicsTracker(GeoClassicsRules(round_win_multiplier_increment=0.5))
+    for outcome in tracker.update(latest_game_state):
+        print(outcome.round_number, outcome.damage, outcome.health)
+
+Requires: pip install numpy
+"""
+
+import json
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import fastjson, geo
+from .geo import MAX_SCORE
+from .models import DuelGame, DuelGuess, DuelTeam, TeamRoundResult, as_game, parse_timestamp
+
+CLASSICS = 'classics'
+PINPOINTING = 'pinpointing'
+
+
+class GeoClassicsRules(NamedTuple):
+    """
+    Rule parameters. None means the value each game was played with.
+
+    Attributes:
+        round_win_multiplier_increment: Multiplier added to a round winner
+            (0 selects PINPOINTING)
+        tie_divisor: tieRange = floor((5000 - best) / tie_divisor)
+        initial_health: Starting health of both teams (CLASSICS)
+        win_threshold: Points needed to win, the game's
+            roundsWithoutDamageMultiplier by default (PINPOINTING)
+        starting_multiplier: Multiplier of both teams before the first round
+    """
+
+    round_win_multiplier_increment: Optional[float] = None
+    tie_divisor: float = 2
+    initial_health: Optional[float] = None
+    win_threshold: Optional[int] = None
+    starting_multiplier: float = 1.0
+
+
+class GeoClassicsColumns:
+    """
+    Two-team duels as per-round arrays, padded to the longest game.
+
+    Attributes:
+        game_ids: Duel game ID of each game (object array)
+        team_ids, team_names: ID and name of team 0 and team 1 ([games, 2] object arrays)
+        round_count: Completed rounds of each game (int16)
+        score: Team score of each round from roundResults ([games, rounds, 2] int32)
+        penalized_score: Best team score after the PINPOINTING penalty rule (int32)
+        perfect_time: Seconds from round start to the team's first 5000, inf
+            if it had none (float64)
+        initial_health: Game's initial health (float64)
+        increment: Game's roundWinMultiplierIncrement, NaN if unset (float64)
+        win_threshold: Game's roundsWithoutDamageMultiplier, 0 if unset (int16)
+        winner: Team that actually won (0 or 1), -1 for none (int8)
+    """
+
+    __slots__ = ('game_ids', 'team_ids', 'team_names', 'round_count', 'score', 'penalized_score', 'perfect_time',
+                 'initial_health', 'increment', 'win_threshold', 'winner')
+
+    def __init__(self, **columns: np.ndarray):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+
+    @property
+    def game_count(self) -> int:
+        return len(self.game_ids)
+
+    @property
+    def max_rounds(self) -> int:
+        return self.score.shape[1]
+
+
+def _guess_score(guess: DuelGuess, max_error: Optional[float]) -> int:
+    """Score of a guess, computed from its distance when the API only scored the team's best guess."""
+    if guess.score is not None:
+        return guess.score
+    if not max_error:
+        return 0
+    return int(geo.score(guess.distance, max_error))
+
+
+def _round_penalties(game: DuelGame, team: DuelTeam, round_number: int, score: int) -> Tuple[int, float]:
+    """Penalized best score and first 5000 time of one team in one round."""
+    game_round = game.rounds[round_number - 1] if round_number <= len(game.rounds) else None
+    guesses = [guess for player in team.players for guess in player.guesses if guess.round_number == round_number]
+    if game_round is None or not game_round.start_time or not guesses:
+        return score, math.inf
+
+    start = parse_timestamp(game_round.start_time)
+    penalty_time = -math.inf
+    if game.max_round_time and game.round_time is not None:
+        penalty_time = start + game.max_round_time - game.round_time
+
+    best, perfect_time = 0, math.inf
+    for guess in guesses:
+        points = _guess_score(guess, game.max_error_distance)
+        created = parse_timestamp(guess.created) if guess.created else start
+        if points == MAX_SCORE:
+            perfect_time = min(perfect_time, created - start)
+        elif created < penalty_time:
+            points = 0
+        best = max(best, points)
+    return best, perfect_time
+
+
+def to_geoclassics_columns(games: Iterable[Union[DuelGame, Dict[str, Any]]]) -> GeoClassicsColumns:
+    """
+    Convert two-team duels to per-round arrays. Games without exactly two teams are skipped.
+
+    Args:
+        games: DuelGame models or decoded duel responses
+
+    Returns:
+        GeoClassicsColumns
+    """
+    game_ids: List[str] = []
+    team_ids: List[List[str]] = []
+    team_names: List[List[str]] = []
+    per_game: List[np.ndarray] = []
+    initial_health: List[float] = []
+    increment: List[float] = []
+    win_threshold: List[int] = []
+    winner: List[int] = []
+
+    for game in games:
+        game = as_game(game)
+        if len(game.teams) != 2:
+            continue
+
+        rounds = max((result.round_number for team in game.teams for result in team.round_results), default=0)
+        # score, penalized_score and perfect_time of each round and team
+        values = np.zeros((3, rounds, 2))
+        values[2] = math.inf
+        for side, team in enumerate(game.teams):
+            for result in team.round_results:
+                index = result.round_number - 1
+                values[0, index, side] = result.score
+                values[1, index, side], values[2, index, side] = _round_penalties(
+                    game, team, result.round_number, result.score)
+
+        game_ids.append(game.game_id)
+        team_ids.append([team.id for team in game.teams])
+        team_names.append([team.name for team in game.teams])
+        per_game.append(values)
+        initial_health.append(game.initial_health or 0)
+        increment.append(math.nan if game.round_win_multiplier_increment is None
+                         else game.round_win_multiplier_increment)
+        win_threshold.append(game.rounds_without_damage_multiplier or 0)
+        winner.append(next((side for side, team in enumerate(game.teams) if team.id == game.winning_team_id), -1))
+
+    max_rounds = max((values.shape[1] for values in per_game), default=0)
+    count = len(per_game)
+    score = np.zeros((count, max_rounds, 2), dtype=np.int32)
+    penalized_score = np.zeros((count, max_rounds, 2), dtype=np.int32)
+    perfect_time = np.full((count, max_rounds, 2), np.inf)
+    round_count = np.zeros(count, dtype=np.int16)
+    for number, values in enumerate(per_game):
+        rounds = values.shape[1]
+        score[number, :rounds] = values[0]
+        penalized_score[number, :rounds] = values[1]
+        perfect_time[number, :rounds] = values[2]
+        round_count[number] = rounds
+
+    return GeoClassicsColumns(
+        game_ids=np.array(game_ids, dtype=object),
+        team_ids=np.array(team_ids, dtype=object).reshape(count, 2),
+        team_names=np.array(team_names, dtype=object).reshape(count, 2),
+        round_count=round_count,
+        score=score,
+        penalized_score=penalized_score,
+        perfect_time=perfect_time,
+        initial_health=np.array(initial_health, dtype=np.float64),
+        increment=np.array(increment, dtype=np.float64),
+        win_threshold=np.array(win_threshold, dtype=np.int16),
+        winner=np.array(winner, dtype=np.int8),
+    )
+
+
+def _option(value: Optional[float], per_game: np.ndarray) -> np.ndarray:
+    """The rule value for every game: the override if given, else each game's own."""
+    if value is None:
+        return per_game.astype(np.float64)
+    return np.full(len(per_game), float(value))
+
+
+def _tie_range(scores: np.ndarray, tie_divisor: float) -> np.ndarray:
+    return np.floor((MAX_SCORE - scores.max(axis=1)) / tie_divisor)
+
+
+def simulate_classics(columns: GeoClassicsColumns,
+                      rules: GeoClassicsRules = GeoClassicsRules()) -> Dict[str, np.ndarray]:
+    """
+    Play every game under CLASSICS rules (calculateGeoClassics).
+
+    Args:
+        columns: Columns from to_geoclassics_columns()
+        rules: Rule parameters
+
+    Returns:
+        dict: Per game: health and multiplier ([games, 2] after the last
+            round played), damage dealt by each team in each round
+            ([games, rounds, 2]), rounds (rounds played until a team's
+            health reached 0) and winner (0 or 1, -1 if both teams survived)
+    """
+    count, max_rounds = columns.game_count, columns.max_rounds
+    rows = np.arange(count)
+    increment = np.nan_to_num(_option(rules.round_win_multiplier_increment, columns.increment))
+    initial = _option(rules.initial_health, columns.initial_health)
+
+    health = np.repeat(initial[:, None], 2, axis=1)
+    multiplier = np.full((count, 2), float(rules.starting_multiplier))
+    damage = np.zeros((count, max_rounds, 2))
+    rounds = np.zeros(count, dtype=np.int16)
+
+    for index in range(max_rounds):
+        active = (index < columns.round_count) & (health > 0).all(axis=1)
+        if not active.any():
+            break
+        scores = columns.score[:, index].astype(np.float64)
+        difference = scores[:, 0] - scores[:, 1]
+        decisive = active & (np.abs(difference) > _tie_range(scores, rules.tie_divisor))
+
+        winner = (difference < 0).astype(np.intp)
+        loser = 1 - winner
+        dealt = np.where(decisive, np.abs(difference) * multiplier[rows, winner], 0.0)
+        health[rows, loser] = np.maximum(health[rows, loser] - dealt, 0.0)
+        multiplier[rows, winner] += np.where(decisive, increment, 0.0)
+        damage[rows, index, winner] = dealt
+        rounds += active
+
+    winner = np.where(health[:, 1] <= 0, 0, np.where(health[:, 0] <= 0, 1, -1)).astype(np.int8)
+    return {'health': health, 'multiplier': multiplier, 'damage': damage, 'rounds': rounds, 'winner': winner}
+
+
+def simulate_pinpointing(columns: GeoClassicsColumns,
+                         rules: GeoClassicsRules = GeoClassicsRules()) -> Dict[str, np.ndarray]:
+    """
+    Play every game under PINPOINTING rules (calculatePinpointing).
+
+    Args:
+        columns: Columns from to_geoclassics_columns()
+        rules: Rule parameters (win_threshold 0 plays every round)
+
+    Returns:
+        dict: Per game: points ([games, 2]), awarded points per round
+            ([games, rounds, 2]), rounds (rounds played until a team reached
+            the threshold) and winner (0 or 1, -1 if no team reached it)
+    """
+    count, max_rounds = columns.game_count, columns.max_rounds
+    threshold = _option(rules.win_threshold, columns.win_threshold)
+    has_threshold = threshold > 0
+
+    points = np.zeros((count, 2), dtype=np.int32)
+    awarded = np.zeros((count, max_rounds, 2), dtype=np.int8)
+    rounds = np.zeros(count, dtype=np.int16)
+
+    for index in range(max_rounds):
+        finished = has_threshold & (points >= threshold[:, None]).any(axis=1)
+        active = (index < columns.round_count) & ~finished
+        if not active.any():
+            break
+        scores = columns.penalized_score[:, index]
+        times = columns.perfect_time[:, index]
+        perfect = scores == MAX_SCORE
+        both = perfect.all(axis=1)
+        one = perfect.any(axis=1) & ~both
+
+        award = np.zeros((count, 2), dtype=np.int8)
+        award[both & (times[:, 0] < times[:, 1]), 0] = 1
+        award[both & (times[:, 1] < times[:, 0]), 1] = 1
+        award[one] = perfect[one] * 2
+
+        difference = scores[:, 0].astype(np.float64) - scores[:, 1]
+        decisive = ~perfect.any(axis=1) & (np.abs(difference) > _tie_range(scores, rules.tie_divisor))
+        award[decisive & (difference > 0), 0] = 1
+        award[decisive & (difference < 0), 1] = 1
+
+        award[~active] = 0
+        awarded[:, index] = award
+        points += award
+        rounds += active
+
+    reached = has_threshold[:, None] & (points >= threshold[:, None])
+    winner = np.where(reached[:, 0], 0, np.where(reached[:, 1], 1, -1)).astype(np.int8)
+    return {'points': points, 'awarded': awarded, 'rounds': rounds, 'winner': winner}
+
+
+def simulate(columns: GeoClassicsColumns, rules: GeoClassicsRules = GeoClassicsRules()) -> Dict[str, np.ndarray]:
+    """
+    Play every game in the mode its increment selects, as the userscript does.
+
+    Args:
+        columns: Columns from to_geoclassics_columns()
+        rules: Rule parameters
+
+    Returns:
+        dict: Per game: classics (True for CLASSICS games), rounds and winner
+    """
+    increment = _option(rules.round_win_multiplier_increment, columns.increment)
+    classics = increment > 0
+    classics_state = simulate_classics(columns, rules)
+    pinpointing_state = simulate_pinpointing(columns, rules)
+    return {
+        'classics': classics,
+        'rounds': np.where(classics, classics_state['rounds'], pinpointing_state['rounds']),
+        'winner': np.where(classics, classics_state['winner'], pinpointing_state['winner']),
+    }
+
+
+def compare_rules(columns: GeoClassicsColumns, rule_sets: Sequence[GeoClassicsRules]) -> Dict[str, np.ndarray]:
+    """
+    Re-score every game under each rule set.
+
+    Args:
+        columns: Columns from to_geoclassics_columns()
+        rule_sets: Rule variants to compare
+
+    Returns:
+        dict: Arrays with one entry per rule set: decided (share of games
+            with a winner), avg_rounds (rounds until the game was decided),
+            agreement (share of decided games won by the team that won on
+            GeoGuessr) and upsets (decided games won by the other team)
+    """
+    decided, avg_rounds, agreement, upsets = [], [], [], []
+    actual = columns.winner
+
+    for rules in rule_sets:
+        state = simulate(columns, rules)
+        winner = state['winner']
+        has_winner = winner >= 0
+        comparable = has_winner & (actual >= 0)
+        same = (winner == actual) & comparable
+
+        decided.append(has_winner.mean() if columns.game_count else math.nan)
+        avg_rounds.append(state['rounds'][has_winner].mean() if has_winner.any() else math.nan)
+        agreement.append(same.sum() / comparable.sum() if comparable.any() else math.nan)
+        upsets.append(int((comparable & ~same).sum()))
+
+    return {
+        'decided': np.array(decided),
+        'avg_rounds': np.array(avg_rounds),
+        'agreement': np.array(agreement),
+        'upsets': np.array(upsets, dtype=np.int64),
+    }
+
+
+def geoclassics_summary(game: Union[DuelGame, Dict[str, Any]],
+                        rules: GeoClassicsRules = GeoClassicsRules()) -> Dict[str, Any]:
+    """
+    Final GeoClassics state of one duel (calculateClassicsSummary / calculatePinpointingSummary).
+
+    Args:
+        game: DuelGame or decoded duel response with two teams
+        rules: Rule parameters
+
+    Returns:
+        dict: mode (CLASSICS or PINPOINTING), rounds, winner (team name or
+            None) and, by team name, health and multiplier (CLASSICS) or
+            points (PINPOINTING)
+
+    Raises:
+        ValueError: If the duel does not have exactly two teams
+    """
+    columns = to_geoclassics_columns([game])
+    if columns.game_count == 0:
+        raise ValueError('GeoClassics rules need a duel with exactly two teams')
+
+    names = list(columns.team_names[0])
+    increment = _option(rules.round_win_multiplier_increment, columns.increment)[0]
+    if increment > 0:
+        state = simulate_classics(columns, rules)
+        summary = {
+            'mode': CLASSICS,
+            'health': dict(zip(names, state['health'][0].tolist())),
+            'multiplier': dict(zip(names, state['multiplier'][0].tolist())),
+        }
+    else:
+        state = simulate_pinpointing(columns, rules)
+        summary = {'mode': PINPOINTING, 'points': dict(zip(names, state['points'][0].tolist()))}
+
+    winner = int(state['winner'][0])
+    summary['rounds'] = int(state['rounds'][0])
+    summary['winner'] = names[winner] if winner >= 0 else None
+    return summary
+
+
+# ===== Incremental Updates =====
+
+class RoundOutcome(NamedTuple):
+    """
+    Result of applying one round to a GeoClassicsState.
+
+    Attributes:
+        round_number: Round that was applied
+        scores: Scores of team 0 and team 1 (penalized in PINPOINTING)
+        winner: Team that won the round (0 or 1), -1 for a tie
+        damage: Damage dealt to the loser (CLASSICS)
+        awarded: Points awarded to each team (PINPOINTING)
+        health, multiplier, points: State of both teams after the round
+    """
+
+    round_number: int
+    scores: Tuple[int, int]
+    winner: int
+    damage: float
+    awarded: Tuple[int, int]
+    health: Tuple[float, float]
+    multiplier: Tuple[float, float]
+    points: Tuple[int, int]
+
+
+class GeoClassicsState:
+    """
+    GeoClassics state of one duel, updated with only the rounds finished since the last update.
+
+    Each update() costs O(new rounds) regardless of how far the duel has
+    progressed, and the state round-trips through to_dict()/from_dict(),
+    so a live scoring service can keep it between polls or restarts
+    instead of replaying the whole duel every time.
+
+    Attributes:
+        game_id: Duel game ID
+        team_ids, team_names: Team 0 and team 1
+        mode: CLASSICS or PINPOINTING
+        increment, tie_divisor, win_threshold: Rules in effect
+        health, multiplier: Per team (CLASSICS)
+        points: Per team (PINPOINTING)
+        rounds: Rounds applied so far
+        winner: Team that won (0 or 1), -1 while the game is undecided
+    """
+
+    __slots__ = ('game_id', 'team_ids', 'team_names', 'mode', 'increment', 'tie_divisor', 'win_threshold',
+                 'health', 'multiplier', 'points', 'rounds', 'winner')
+
+    def __init__(self, game_id: str, team_ids: Sequence[str], team_names: Sequence[str], mode: str,
+                 increment: float, tie_divisor: float, win_threshold: int, health: Sequence[float],
+                 multiplier: Sequence[float], points: Sequence[int] = (0, 0), rounds: int = 0, winner: int = -1):
+        self.game_id = game_id
+        self.team_ids = list(team_ids)
+        self.team_names = list(team_names)
+        self.mode = mode
+        self.increment = increment
+        self.tie_divisor = tie_divisor
+        self.win_threshold = win_threshold
+        self.health = list(health)
+        self.multiplier = list(multiplier)
+        self.points = list(points)
+        self.rounds = rounds
+        self.winner = winner
+
+    @classmethod
+    def start(cls, game: Union[DuelGame, Dict[str, Any]],
+              rules: GeoClassicsRules = GeoClassicsRules()) -> 'GeoClassicsState':
+        """
+        Create the state of a duel before its first round, with rules resolved against the game's options.
+
+        Raises:
+            ValueError: If the duel does not have exactly two teams
+        """
+        game = as_game(game)
+        if len(game.teams) != 2:
+            raise ValueError('GeoClassics rules need a duel with exactly two teams')
+
+        increment = rules.round_win_multiplier_increment
+        if increment is None:
+            increment = game.round_win_multiplier_increment or 0.0
+        win_threshold = rules.win_threshold
+        if win_threshold is None:
+            win_threshold = game.rounds_without_damage_multiplier or 0
+        health = rules.initial_health if rules.initial_health is not None else (game.initial_health or 0)
+
+        return cls(
+            game.game_id,
+            [team.id for team in game.teams],
+            [team.name for team in game.teams],
+            CLASSICS if increment > 0 else PINPOINTING,
+            float(increment),
+            float(rules.tie_divisor),
+            int(win_threshold),
+            [float(health)] * 2,
+            [float(rules.starting_multiplier)] * 2,
+        )
+
+    @property
+    def is_over(self) -> bool:
+        return self.winner >= 0
+
+    def update(self, game: Union[DuelGame, Dict[str, Any]]) -> List[RoundOutcome]:
+        """
+        Apply every round both teams have a result for and that was not applied yet.
+
+        Args:
+            game: Latest state of the same duel
+
+        Returns:
+            list: One RoundOutcome per round applied, empty if nothing changed
+        """
+        game = as_game(game)
+        outcomes = []
+        teams = game.teams
+        if len(teams) != 2:
+            return outcomes
+
+        while not self.is_over:
+            round_number = self.rounds + 1
+            results = [_round_result(team, round_number) for team in teams]
+            if results[0] is None or results[1] is None:
+                break
+
+            if self.mode == CLASSICS:
+                outcome = self._apply_classics(round_number, results[0].score, results[1].score)
+            else:
+                penalties = [_round_penalties(game, team, round_number, result.score)
+                             for team, result in zip(teams, results)]
+                outcome = self._apply_pinpointing(round_number, penalties)
+            self.rounds = round_number
+            outcomes.append(outcome)
+        return outcomes
+
+    def _apply_classics(self, round_number: int, score_0: int, score_1: int) -> RoundOutcome:
+        difference = score_0 - score_1
+        winner, damage = -1, 0.0
+        if abs(difference) > math.floor((MAX_SCORE - max(score_0, score_1)) / self.tie_divisor):
+            winner = 0 if difference > 0 else 1
+            loser = 1 - winner
+            damage = abs(difference) * self.multiplier[winner]
+            self.health[loser] = max(self.health[loser] - damage, 0.0)
+            self.multiplier[winner] += self.increment
+            if self.health[loser] <= 0:
+                self.winner = winner
+        return self._outcome(round_number, (score_0, score_1), winner, damage, (0, 0))
+
+    def _apply_pinpointing(self, round_number: int, penalties: List[Tuple[int, float]]) -> RoundOutcome:
+        (score_0, time_0), (score_1, time_1) = penalties
+        perfect = (score_0 == MAX_SCORE, score_1 == MAX_SCORE)
+        awarded = [0, 0]
+        if all(perfect):
+            if time_0 != time_1:
+                awarded[0 if time_0 < time_1 else 1] = 1
+        elif any(perfect):
+            awarded[0 if perfect[0] else 1] = 2
+        else:
+            difference = score_0 - score_1
+            if abs(difference) > math.floor((MAX_SCORE - max(score_0, score_1)) / self.tie_divisor):
+                awarded[0 if difference > 0 else 1] = 1
+
+        winner = awarded.index(max(awarded)) if any(awarded) else -1
+        self.points[0] += awarded[0]
+        self.points[1] += awarded[1]
+        if self.win_threshold > 0 and winner >= 0 and self.points[winner] >= self.win_threshold:
+            self.winner = winner
+        return self._outcome(round_number, (score_0, score_1), winner, 0.0, tuple(awarded))
+
+    def _outcome(self, round_number: int, scores: Tuple[int, int], winner: int, damage: float,
+                 awarded: Tuple[int, int]) -> RoundOutcome:
+        return RoundOutcome(round_number, scores, winner, damage, awarded, tuple(self.health),
+                            tuple(self.multiplier), tuple(self.points))
+
+    def summary(self) -> Dict[str, Any]:
+        """Final state in the form returned by geoclassics_summary()."""
+        names = self.team_names
+        if self.mode == CLASSICS:
+            summary = {'mode': CLASSICS, 'health': dict(zip(names, self.health)),
+                       'multiplier': dict(zip(names, self.multiplier))}
+        else:
+            summary = {'mode': PINPOINTING, 'points': dict(zip(names, self.points))}
+        summary['rounds'] = self.rounds
+        summary['winner'] = names[self.winner] if self.winner >= 0 else None
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot of the state."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GeoClassicsState':
+        """Restore a state saved with to_dict()."""
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return f'GeoClassicsState({self.game_id!r}, mode={self.mode!r}, rounds={self.rounds}, winner={self.winner})'
+
+
+def _round_result(team: DuelTeam, round_number: int) -> Optional[TeamRoundResult]:
+    """The team's result for a round, looked up from the end where new rounds are."""
+    results = team.round_results
+    if len(results) >= round_number and results[round_number - 1].round_number == round_number:
+        return results[round_number - 1]
+    for result in reversed(results):
+        if result.round_number == round_number:
+            return result
+    return None
+
+
+class GeoClassicsTracker:
+    """
+    Incremental GeoClassics states for many live duels.
+
+    Usage:
+        tracker = GeoClassicsTracker(GeoClassicsRules(round_win_multiplier_increment=0.5))
+        monitor.subscribe(tracker.on_change, kinds=('round_result',))
+
+        with open('states.json', 'w') as f:      # survive a restart
+            f.write(tracker.dumps())
+        tracker = GeoClassicsTracker.loads(open('states.json').read())
+    """
+
+    def __init__(self, rules: GeoClassicsRules = GeoClassicsRules()):
+        self.rules = rules
+        self.states: Dict[str, GeoClassicsState] = {}
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def update(self, game: Union[DuelGame, Dict[str, Any]]) -> List[RoundOutcome]:
+        """
+        Apply a duel's new rounds, starting its state on first sight.
+
+        Returns:
+            list: Outcomes of the rounds applied by this call
+        """
+        game = as_game(game)
+        state = self.states.get(game.game_id)
+        if state is None:
+            if len(game.teams) != 2:
+                return []
+            state = self.states[game.game_id] = GeoClassicsState.start(game, self.rules)
+        return state.update(game)
+
+    def on_change(self, change: Any) -> None:
+        """DuelMonitor callback: apply new rounds whenever a DuelChange carries a game."""
+        if change.game is not None:
+            self.update(change.game)
+
+    def discard(self, game_id: str) -> Optional[GeoClassicsState]:
+        """Stop tracking a duel and return its last state."""
+        return self.states.pop(game_id, None)
+
+    def dumps(self) -> str:
+        """Serialize the rules and every state as JSON."""
+        return json.dumps({
+            'rules': self.rules._asdict(),
+            'states': [state.to_dict() for state in self.states.values()],
+        })
+
+    @classmethod
+    def loads(cls, data: Union[bytes, str]) -> 'GeoClassicsTracker':
+        """Restore a tracker serialized with dumps()."""
+        snapshot = fastjson.loads(data)
+        tracker = cls(GeoClassicsRules(**snapshot['rules']))
+        for state in snapshot['states']:
+            tracker.states[state['game_id']] = GeoClassicsState.from_dict(state)
+        return tracker
@@ -0,0 +1,427 @@
+"""
+Streaming Challenge Highscores
+
+Parses /v3/results/highscores/{token} responses item by item while the body
+is still downloading, keeping only the requested fields of each entry.
+Every item carries the player's whole game (all rounds and guesses), so big
+community challenges return tens of MB. Here only one item is decoded at a
+time, and everything outside the requested fields is dropped right away,
+so memory stays flat however large the leaderboard is.
+
+Fields are given as {name: dotted path inside an item}. LEADERBOARD_FIELDS
+covers what the leaderboard examples print. fetch_highscores() collects
+the entries into a list shared by concurrent callers of the same challenge
+and fields, so they send one request.
+
+Usage:
+    for entry in stream_highscores(token):
+        print(entry['nick'], entry['score'])
+
+    fields = {'player_id': 'game.player.id', 'guesses': 'game.player.guesses'}
+    entries = list(stream_highscores(token, fields=fields))
+    entries = fetch_highscores(token, fields=fields)   # shared with concurrent callers
+
+    with open('highscores.json', 'rb') as f:          # a saved response
+        entries = list(iter_highscores(f))
+
+    board = Leaderboard.fetch(token)                   # indexed for rank queries
+    print(board.rank(player_id), board.percentile(player_id))
+
+Requires: pip install requests
+"""
+
+import bisect
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from . import endpoints
+from .client import GeoGuessrClient, get_client
+
+LEADERBOARD_FIELDS = {
+    'player_id': 'game.player.id',
+    'nick': 'game.player.nick',
+    'score': 'game.player.totalScore.amount',
+    'country': 'game.player.countryCode',
+    'is_pro': 'game.player.isProUser',
+    'created': 'game.created',
+    'game_token': 'game.token',
+}
+
+# Strings and brackets, so brackets inside strings are skipped. Group 1 is
+# the closing quote, missing when a string is cut off at the end of the buffer.
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\]]')
+
+_SEPARATORS = re.compile(r'[\s,]*')
+
+_ITEMS_KEY = '"items"'
+
+_decoder = json.JSONDecoder()
+
+Source = Union[bytes, Iterable[bytes], Any]
+
+
+def _chunks(source: Source, chunk_size: int) -> Iterator[bytes]:
+    """Chunks from bytes, a binary file object, or an iterable of bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def _compile_fields(fields: Optional[Mapping[str, str]]) -> Optional[Tuple[Tuple[str, Tuple[str, ...]], ...]]:
+    if fields is None:
+        return None
+    return tuple((name, tuple(path.split('.'))) for name, path in fields.items())
+
+
+def _project(item: Dict[str, Any], paths: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> Dict[str, Any]:
+    """Pick the fields at the given paths, None where a path is missing."""
+    entry = {}
+    for name, path in paths:
+        value: Any = item
+        for key in path:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+        entry[name] = value
+    return entry
+
+
+def _find_items(buffer: str, position: int, depth: int, after_items_key: bool) -> Tuple[int, int, bool, bool]:
+    """
+    Scan the top level of a response for the start of its "items" array.
+
+    Returns:
+        tuple: (position, depth, after_items_key, found). position is just
+        inside the array when found, else where scanning must resume
+        once more of the body has arrived.
+    """
+    while True:
+        match = _TOKEN.search(buffer, position)
+        if match is None:
+            return len(buffer), depth, after_items_key, False
+
+        token = match.group()
+        if token[0] == '"':
+            if match.group(1) is None:
+                # String continues in the next chunk
+                return match.start(), depth, after_items_key, False
+            if depth == 1:
+                after_items_key = token == _ITEMS_KEY
+        elif token in '{[':
+            depth += 1
+            if depth == 2 and after_items_key and token == '[':
+                return match.end(), depth, False, True
+            after_items_key = False
+        else:
+            depth -= 1
+        position = match.end()
+
+
+def iter_items(source: Source, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the objects of a response's top-level "items" array one at a time.
+
+    Each item is decoded on its own with the C scanner of the json module
+    as soon as its last byte has arrived.
+
+    Args:
+        source: Response body as bytes, a binary file object, or an iterable
+            of byte chunks (e.g. GeoGuessrClient.stream())
+        chunk_size: Bytes per read from a file object
+
+    Returns:
+        Iterator over decoded items. Only the item being read and at most
+        one chunk are held in memory at a time.
+
+    Raises:
+        ValueError: If the body ends before the items array does
+    """
+    decode = codecs.getincrementaldecoder('utf-8')().decode
+    buffer = ''
+    position = 0
+    depth = 0
+    after_items_key = False
+    in_items = False
+
+    for chunk in _chunks(source, chunk_size):
+        buffer += decode(chunk)
+
+        if not in_items:
+            position, depth, after_items_key, in_items = _find_items(buffer, position, depth, after_items_key)
+
+        while in_items:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = _decoder.raw_decode(buffer, position)
+            except ValueError:
+                # Item continues in the next chunk
+                break
+            yield item
+
+        buffer = buffer[position:]
+        position = 0
+
+    raise ValueError('Highscores response ended before the end of its items array')
+
+
+def iter_highscores(source: Source, fields: Optional[Mapping[str, str]] = LEADERBOARD_FIELDS,
+                    chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yield leaderboard entries from a highscores response body, in rank order.
+
+    Args:
+        source: Response body as bytes, a binary file object, or an iterable of byte chunks
+        fields: {name: dotted path} to keep from each item, or None for whole items
+        chunk_size: Bytes per read from a file object
+
+    Returns:
+        Iterator over {name: value} dicts (None where a path is missing)
+    """
+    paths = _compile_fields(fields)
+    for item in iter_items(source, chunk_size):
+        yield item if paths is None else _project(item, paths)
+
+
+def project_items(response: Dict[str, Any],
+                  fields: Optional[Mapping[str, str]] = LEADERBOARD_FIELDS) -> Iterator[Dict[str, Any]]:
+    """
+    Yield leaderboard entries from an already decoded highscores response.
+
+    Args:
+        response: Decoded highscores response (e.g. from client.get_json())
+        fields: {name: dotted path} to keep from each item, or None for whole items
+
+    Returns:
+        Iterator over {name: value} dicts in rank order, as iter_highscores()
+    """
+    paths = _compile_fields(fields)
+    for item in response.get('items') or ():
+        yield item if paths is None else _project(item, paths)
+
+
+def stream_highscores(challenge_token: str, cookie: Optional[str] = None,
+                      fields: Optional[Mapping[str, str]] = LEADERBOARD_FIELDS,
+                      client: Optional[GeoGuessrClient] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Download a challenge leaderboard and yield entries as they arrive.
+
+    Every call streams its own download. Use fetch_highscores() to share
+    one download between concurrent callers.
+
+    Args:
+        challenge_token: The challenge token
+        cookie: Your _ncfa cookie value
+        fields: {name: dotted path} to keep from each item, or None for whole items
+        client: Client to use (defaults to the shared client for the cookie)
+
+    Returns:
+        Iterator over entries in rank order
+
+    Raises:
+        requests.exceptions.HTTPError: On a non-2xx response
+    """
+    client = client or get_client(cookie)
+    yield from iter_highscores(client.stream(endpoints.HIGHSCORES.format(token=challenge_token)), fields)
+
+
+def fetch_highscores(challenge_token: str, cookie: Optional[str] = None,
+                     fields: Optional[Mapping[str, str]] = LEADERBOARD_FIELDS,
+                     client: Optional[GeoGuessrClient] = None) -> List[Dict[str, Any]]:
+    """
+    Download a challenge leaderboard into a list, sharing concurrent downloads.
+
+    Concurrent calls for the same challenge and fields share one download
+    and one list of entries, as GeoGuessrClient coalesces identical GETs,
+    so the list and its entries must not be modified. The body is still
+    parsed as it arrives, keeping only the requested fields. If the client
+    has a response cache, the body is fetched through the cache instead.
+
+    Args:
+        challenge_token: The challenge token
+        cookie: Your _ncfa cookie value
+        fields: {name: dotted path} to keep from each item, or None for whole items
+        client: Client to use (defaults to the shared client for the cookie)
+
+    Returns:
+        list: Entries in rank order (read-only)
+
+    Raises:
+        requests.exceptions.HTTPError: On a non-2xx response
+    """
+    client = client or get_client(cookie)
+    url = endpoints.HIGHSCORES.format(token=challenge_token)
+
+    if client.cache is not None:
+        # The cache keeps whole bodies anyway, so gain its hits and coalescing instead
+        response = client.get(url)
+        response.raise_for_status()
+        return list(iter_highscores(response.content, fields))
+
+    key = ('highscores', url, None if fields is None else tuple(fields.items()))
+    return client.inflight.do(key, lambda: list(iter_highscores(client.stream(url), fields)))
+
+
+class Leaderboard:
+    """
+    A challenge leaderboard indexed by player, for fast "where am I?" queries.
+
+    Players are kept in rank order as parallel sorted lists, with a hash
+    index from player ID to entry. rank(), percentile() and neighbours()
+    cost O(log n) plus the size of the answer. Adding a result costs
+    O(log n) comparisons plus one list insert. Ties are ranked by arrival,
+    as in the API's own order.
+
+    Usage:
+        board = Leaderboard.fetch(token, cookie)
+        board.rank(player_id), board.percentile(player_id)
+        for rank, entry in board.neighbours(player_id):
+            print(rank, entry['nick'], entry['score'])
+        board.add({'player_id': ..., 'nick': ..., 'score': 21000})   # a new result
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._keys: List[Tuple[int, int]] = []      # (-score, arrival), ascending
+        self._ids: List[str] = []                    # player IDs, aligned with _keys
+        self._arrival: Dict[str, int] = {}
+        self._next_arrival = 0
+        self._total = 0
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def fetch(cls, challenge_token: str, cookie: Optional[str] = None,
+              client: Optional[GeoGuessrClient] = None) -> 'Leaderboard':
+        """Build a leaderboard from a streamed highscores response."""
+        return cls(stream_highscores(challenge_token, cookie, client=client))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._entries
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Entries in rank order."""
+        return (self._entries[player_id] for player_id in self._ids)
+
+    def get(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """The player's entry, or None."""
+        return self._entries.get(player_id)
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """
+        Add a result, or replace the player's previous one.
+
+        Args:
+            entry: Leaderboard entry with at least player_id and score
+                (score may be the API's string amount)
+
+        Returns:
+            bool: True if the leaderboard changed
+        """
+        player_id = entry['player_id']
+        entry = dict(entry, score=int(entry['score']))
+        previous = self._entries.get(player_id)
+        if previous is not None:
+            if previous == entry:
+                return False
+            self._remove(player_id)
+
+        arrival = self._arrival.get(player_id)
+        if arrival is None:
+            arrival = self._arrival[player_id] = self._next_arrival
+            self._next_arrival += 1
+
+        key = (-entry['score'], arrival)
+        index = bisect.bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._ids.insert(index, player_id)
+        self._entries[player_id] = entry
+        self._total += entry['score']
+        return True
+
+    def remove(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a player's result and return it."""
+        if player_id not in self._entries:
+            return None
+        entry = self._remove(player_id)
+        del self._arrival[player_id]
+        return entry
+
+    def _remove(self, player_id: str) -> Dict[str, Any]:
+        entry = self._entries.pop(player_id)
+        index = self._index(player_id, entry)
+        del self._keys[index]
+        del self._ids[index]
+        self._total -= entry['score']
+        return entry
+
+    def _index(self, player_id: str, entry: Dict[str, Any]) -> int:
+        return bisect.bisect_left(self._keys, (-entry['score'], self._arrival[player_id]))
+
+    # ===== Queries =====
+
+    def rank(self, player_id: str) -> Optional[int]:
+        """1-based rank of a player, or None if they have not played."""
+        entry = self._entries.get(player_id)
+        return None if entry is None else self._index(player_id, entry) + 1
+
+    def rank_of_score(self, score: int) -> int:
+        """1-based rank a new result with this score would get (after earlier equal scores)."""
+        return bisect.bisect_left(self._keys, (-int(score), self._next_arrival)) + 1
+
+    def percentile(self, player_id: str) -> Optional[float]:
+        """Share of players ranked at or below the player, in percent (100 for first place)."""
+        rank = self.rank(player_id)
+        return None if rank is None else (len(self) - rank + 1) / len(self) * 100
+
+    def at(self, rank: int) -> Dict[str, Any]:
+        """Entry at a 1-based rank."""
+        return self._entries[self._ids[rank - 1]]
+
+    def neighbours(self, player_id: str, above: int = 2, below: int = 2) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Entries around a player, including the player.
+
+        Returns:
+            list: (rank, entry) pairs in rank order, empty if the player has not played
+        """
+        rank = self.rank(player_id)
+        if rank is None:
+            return []
+        start = max(0, rank - 1 - above)
+        end = min(len(self), rank + below)
+        return [(index + 1, self._entries[self._ids[index]]) for index in range(start, end)]
+
+    @property
+    def top_score(self) -> Optional[int]:
+        return -self._keys[0][0] if self._keys else None
+
+    @property
+    def mean_score(self) -> Optional[float]:
+        return self._total / len(self) if self._keys else None
+
+    @property
+    def median_score(self) -> Optional[float]:
+        count = len(self)
+        if not count:
+            return None
+        middle = count // 2
+        if count % 2:
+            return -self._keys[middle][0]
+        return -(self._keys[middle - 1][0] + self._keys[middle][0]) / 2
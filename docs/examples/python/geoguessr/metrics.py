@@ -0,0 +1,292 @@
+"""
+Client Metrics
+
+Per-endpoint request counts, latency histograms, bytes transferred, status
+codes, retries and cache hits, recorded by both clients. Endpoints are
+labeled by URL template (e.g. /api/duels/{game_id}) and host, so you can
+tell whether www.geoguessr.com or game-server.geoguessr.com is slower.
+
+Usage:
+    metrics = get_metrics()                 # process-wide, used by both clients
+    print(metrics.to_prometheus())          # Prometheus text format
+    json.dump(metrics.snapshot(), f)        # JSON snapshot
+"""
+
+import bisect
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import endpoints
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+# Placeholders whose values contain slashes (browse categories such as popular/all)
+_MULTI_SEGMENT = {'category'}
+
+
+def _template_pattern(template: str) -> Tuple[str, re.Pattern, str]:
+    """Turn an endpoint URL template into (host, path regex, path label)."""
+    parts = urlsplit(template)
+    regex = re.sub(r'\\\{(\w+)\\\}', lambda m: '.+' if m.group(1) in _MULTI_SEGMENT else '[^/]+',
+                   re.escape(parts.path))
+    return parts.hostname, re.compile(regex + '$'), parts.path
+
+
+# Literal paths are tried before templated ones (/v3/games/streak before
+# /v3/games/{token}), then longer templates before shorter ones.
+_TEMPLATES = sorted(
+    (_template_pattern(value) for name, value in vars(endpoints).items()
+     if name.isupper() and isinstance(value, str) and value.count('/') > 3),
+    key=lambda item: (item[2].count('{'), -len(item[2])),
+)
+
+# Path segments that look like IDs or tokens, for URLs that match no template
+_ID_SEGMENT = re.compile(r'/(?=[^/]*\d)[A-Za-z0-9_-]{8,}(?=/|$)')
+
+
+def endpoint_label(url: str) -> Tuple[str, str]:
+    """
+    Label a URL by host and endpoint template.
+
+    Args:
+        url: Request URL
+
+    Returns:
+        tuple: (host, template), e.g. ('game-server.geoguessr.com', '/api/duels/{game_id}')
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+
+    for template_host, pattern, label in _TEMPLATES:
+        if template_host == host and pattern.match(parts.path):
+            return host, label
+
+    return host, _ID_SEGMENT.sub('/{id}', parts.path)
+
+
+class _EndpointStats:
+    __slots__ = ('requests', 'statuses', 'retries', 'bytes', 'latency_buckets', 'latency_sum',
+                 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes = 0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a latency quantile from the histogram (linear within a bucket)."""
+        if not self.requests:
+            return None
+
+        rank = q * self.requests
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(LATENCY_BUCKETS, self.latency_buckets):
+            if count and seen + count >= rank:
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+
+class Metrics:
+    """
+    Thread-safe metrics registry for GeoGuessr requests.
+
+    Each upstream attempt is recorded once: a request retried twice counts
+    as three requests and two retries.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str, str], _EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, method: str, url: str) -> _EndpointStats:
+        host, label = endpoint_label(url)
+        key = (host, label, method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _EndpointStats()
+        return stats
+
+    def record_request(self, method: str, url: str, status: Any, seconds: float, size: int = 0) -> None:
+        """
+        Record one upstream request.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            status: HTTP status code, or 'error' if no response was received
+            seconds: Time until the response body was read
+            size: Response body size in bytes
+        """
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            stats = self._get(method, url)
+            stats.requests += 1
+            stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+            stats.bytes += size
+            stats.latency_sum += seconds
+            stats.latency_buckets[index] += 1
+
+    def record_retry(self, method: str, url: str) -> None:
+        """Record that a request is about to be retried."""
+        with self._lock:
+            self._get(method, url).retries += 1
+
+    def record_cache(self, url: str, hit: bool) -> None:
+        """Record a cache lookup for a GET request."""
+        with self._lock:
+            stats = self._get('GET', url)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return all metrics as JSON-serializable data.
+
+        Returns:
+            dict: {'endpoints': [...], 'totals': {...}} where each endpoint
+            entry has host, endpoint, method, requests, statuses, retries,
+            bytes, latency (sum, mean, p50, p90, p99, buckets) and cache
+            (hits, misses, hit_ratio).
+        """
+        with self._lock:
+            items = sorted(self._stats.items())
+            endpoint_list: List[Dict[str, Any]] = []
+            totals = {'requests': 0, 'retries': 0, 'bytes': 0, 'cache_hits': 0, 'cache_misses': 0}
+
+            for (host, label, method), stats in items:
+                lookups = stats.cache_hits + stats.cache_misses
+                endpoint_list.append({
+                    'host': host,
+                    'endpoint': label,
+                    'method': method,
+                    'requests': stats.requests,
+                    'statuses': dict(stats.statuses),
+                    'retries': stats.retries,
+                    'bytes': stats.bytes,
+                    'latency': {
+                        'sum': stats.latency_sum,
+                        'mean': stats.latency_sum / stats.requests if stats.requests else None,
+                        'p50': stats.quantile(0.5),
+                        'p90': stats.quantile(0.9),
+                        'p99': stats.quantile(0.99),
+                        'buckets': {_le(upper): count
+                                    for upper, count in zip(LATENCY_BUCKETS, stats.latency_buckets)},
+                    },
+                    'cache': {
+                        'hits': stats.cache_hits,
+                        'misses': stats.cache_misses,
+                        'hit_ratio': stats.cache_hits / lookups if lookups else None,
+                    },
+                })
+                totals['requests'] += stats.requests
+                totals['retries'] += stats.retries
+                totals['bytes'] += stats.bytes
+                totals['cache_hits'] += stats.cache_hits
+                totals['cache_misses'] += stats.cache_misses
+
+        lookups = totals['cache_hits'] + totals['cache_misses']
+        totals['cache_hit_ratio'] = totals['cache_hits'] / lookups if lookups else None
+        return {'endpoints': endpoint_list, 'totals': totals}
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Return snapshot() encoded as JSON."""
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix: str = 'geoguessr') -> str:
+        """
+        Return all metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            str: Text suitable for a /metrics endpoint or a textfile collector
+        """
+        lines = [
+            f'# HELP {prefix}_requests_total Upstream requests by endpoint and status.',
+            f'# TYPE {prefix}_requests_total counter',
+        ]
+        histogram = [
+            f'# HELP {prefix}_request_duration_seconds Upstream request latency.',
+            f'# TYPE {prefix}_request_duration_seconds histogram',
+        ]
+        counters = {
+            'response_bytes_total': ('Response body bytes received.', []),
+            'retries_total': ('Requests retried after 429/5xx or connection errors.', []),
+            'cache_hits_total': ('GET requests served from the response cache.', []),
+            'cache_misses_total': ('GET requests not found in the response cache.', []),
+        }
+
+        with self._lock:
+            for (host, label, method), stats in sorted(self._stats.items()):
+                labels = f'host="{host}",endpoint="{_escape(label)}",method="{method}"'
+
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'{prefix}_requests_total{{{labels},status="{status}"}} {count}')
+
+                cumulative = 0
+                for upper, count in zip(LATENCY_BUCKETS, stats.latency_buckets):
+                    cumulative += count
+                    histogram.append(
+                        f'{prefix}_request_duration_seconds_bucket{{{labels},le="{_le(upper)}"}} {cumulative}'
+                    )
+                histogram.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {stats.latency_sum}')
+                histogram.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {stats.requests}')
+
+                counters['response_bytes_total'][1].append(f'{{{labels}}} {stats.bytes}')
+                counters['retries_total'][1].append(f'{{{labels}}} {stats.retries}')
+                counters['cache_hits_total'][1].append(f'{{{labels}}} {stats.cache_hits}')
+                counters['cache_misses_total'][1].append(f'{{{labels}}} {stats.cache_misses}')
+
+        lines.extend(histogram)
+        for name, (help_text, samples) in counters.items():
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            lines.extend(f'{prefix}_{name}{sample}' for sample in samples)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _le(upper: float) -> str:
+    return '+Inf' if upper == float('inf') else repr(upper)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry shared by all clients."""
+    global _metrics
+
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
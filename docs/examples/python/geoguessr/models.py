@@ -0,0 +1,424 @@
+"""
+Duel Models
+
+Compact classes for the duel structures in duels.md: DuelGame, DuelTeam,
+DuelPlayer, DuelGuess, TeamRoundResult, DuelRound and ReplayEvent. Each
+class uses __slots__ and keeps only the fields the examples use, IDs and
+other repeated strings are interned, and a round result's best guess is
+the same object as the player's guess. A decoded duel takes a fraction of
+the memory of the nested response dicts.
+
+Usage:
+    game = DuelGame.decode(response.content)
+    for team in game.teams:
+        print(team.name, team.health, sum(r.damage_dealt for r in team.round_results))
+
+    events = ReplayEvent.decode_list(replay_response.content)
+"""
+
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from . import fastjson
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse an API timestamp such as '2026-01-11T19:50:47.5130000Z'."""
+    return datetime.fromisoformat(value[:26]).replace(tzinfo=timezone.utc).timestamp()
+
+
+class DuelGuess:
+    """
+    One player's guess in one round.
+
+    Attributes:
+        round_number: Round the guess was made in
+        lat, lng: Guess coordinates
+        distance: Distance from the location in meters
+        score: Round score, or None if it was not the team's best guess
+        is_best: Whether this was the team's best guess of the round
+        created: ISO 8601 time the guess was made
+    """
+
+    __slots__ = ('round_number', 'lat', 'lng', 'distance', 'score', 'is_best', 'created')
+
+    def __init__(self, round_number: int, lat: float, lng: float, distance: float,
+                 score: Optional[int] = None, is_best: bool = False, created: Optional[str] = None):
+        self.round_number = round_number
+        self.lat = lat
+        self.lng = lng
+        self.distance = distance
+        self.score = score
+        self.is_best = is_best
+        self.created = created
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DuelGuess':
+        return cls(data['roundNumber'], data['lat'], data['lng'], data['distance'], data.get('score'),
+                   data.get('isTeamsBestGuessOnRound', False), data.get('created'))
+
+    def __repr__(self) -> str:
+        return f'DuelGuess(round={self.round_number}, distance={self.distance:.0f}, score={self.score})'
+
+
+class DuelPlayer:
+    """
+    A player in a duel.
+
+    Attributes:
+        player_id: Player's user ID
+        rating: Rating shown in the game
+        country_code: Player's country
+        guesses: Guesses in round order
+        rating_before, rating_after: Game mode rating around this game, from
+            progressChange.rankedSystemProgress (None for unranked games)
+    """
+
+    __slots__ = ('player_id', 'rating', 'country_code', 'guesses', 'rating_before', 'rating_after')
+
+    def __init__(self, player_id: str, rating: Optional[int], country_code: Optional[str],
+                 guesses: List[DuelGuess], rating_before: Optional[int] = None,
+                 rating_after: Optional[int] = None):
+        self.player_id = player_id
+        self.rating = rating
+        self.country_code = country_code
+        self.guesses = guesses
+        self.rating_before = rating_before
+        self.rating_after = rating_after
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DuelPlayer':
+        progress = (data.get('progressChange') or {}).get('rankedSystemProgress') or {}
+        return cls(
+            _intern(data['playerId']),
+            data.get('rating'),
+            _intern(data.get('countryCode')),
+            [DuelGuess.from_dict(guess) for guess in data.get('guesses', ())],
+            progress.get('gameModeRatingBefore'),
+            progress.get('gameModeRatingAfter'),
+        )
+
+    @property
+    def rating_change(self) -> Optional[int]:
+        """Rating gained or lost in this game, if ranked."""
+        if self.rating_before is None or self.rating_after is None:
+            return None
+        return self.rating_after - self.rating_before
+
+    def __repr__(self) -> str:
+        return f'DuelPlayer({self.player_id!r}, rating={self.rating}, guesses={len(self.guesses)})'
+
+
+class TeamRoundResult:
+    """
+    A team's result for one round.
+
+    Attributes:
+        round_number: Round number
+        score: Score of the team's best guess
+        health_before, health_after: Team health around the round
+        damage_dealt: Damage this team dealt to the other team
+        multiplier: Damage multiplier of the round
+        best_guess: The team's best guess (the same object as in the
+            player's guesses when it can be matched)
+    """
+
+    __slots__ = ('round_number', 'score', 'health_before', 'health_after', 'damage_dealt', 'multiplier',
+                 'best_guess')
+
+    def __init__(self, round_number: int, score: int, health_before: int, health_after: int,
+                 damage_dealt: int, multiplier: float, best_guess: Optional[DuelGuess] = None):
+        self.round_number = round_number
+        self.score = score
+        self.health_before = health_before
+        self.health_after = health_after
+        self.damage_dealt = damage_dealt
+        self.multiplier = multiplier
+        self.best_guess = best_guess
+
+    @classmethod
+    def from_dict(cls, data: Dict, guesses: Optional[Dict[tuple, DuelGuess]] = None) -> 'TeamRoundResult':
+        best = data.get('bestGuess')
+        best_guess = None
+        if best:
+            key = (best['roundNumber'], best['lat'], best['lng'])
+            best_guess = (guesses or {}).get(key) or DuelGuess.from_dict(best)
+        return cls(data['roundNumber'], data['score'], data['healthBefore'], data['healthAfter'],
+                   data['damageDealt'], data['multiplier'], best_guess)
+
+    def __repr__(self) -> str:
+        return f'TeamRoundResult(round={self.round_number}, score={self.score}, damage={self.damage_dealt})'
+
+
+class DuelTeam:
+    """
+    A duel team.
+
+    Attributes:
+        id: Team ID
+        name: 'blue' or 'red'
+        health: Current health
+        players: Team members
+        round_results: Results of completed rounds
+        current_multiplier: Damage multiplier of the current round
+        is_multiplier_active: Whether the multiplier applies
+    """
+
+    __slots__ = ('id', 'name', 'health', 'players', 'round_results', 'current_multiplier',
+                 'is_multiplier_active')
+
+    def __init__(self, id: str, name: str, health: int, players: List[DuelPlayer],
+                 round_results: List[TeamRoundResult], current_multiplier: float = 1,
+                 is_multiplier_active: bool = False):
+        self.id = id
+        self.name = name
+        self.health = health
+        self.players = players
+        self.round_results = round_results
+        self.current_multiplier = current_multiplier
+        self.is_multiplier_active = is_multiplier_active
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DuelTeam':
+        players = [DuelPlayer.from_dict(player) for player in data.get('players', ())]
+        guesses = {(g.round_number, g.lat, g.lng): g for player in players for g in player.guesses}
+        return cls(
+            _intern(data['id']),
+            _intern(data['name']),
+            data['health'],
+            players,
+            [TeamRoundResult.from_dict(result, guesses) for result in data.get('roundResults', ())],
+            data.get('currentMultiplier', 1),
+            data.get('isMultiplierActive', False),
+        )
+
+    @property
+    def total_damage(self) -> int:
+        """Damage dealt over all completed rounds."""
+        return sum(result.damage_dealt for result in self.round_results)
+
+    def __repr__(self) -> str:
+        return f'DuelTeam({self.name!r}, health={self.health}, players={len(self.players)})'
+
+
+class DuelRound:
+    """
+    Round location and timing.
+
+    Attributes:
+        round_number: Round number
+        lat, lng: Panorama location
+        country_code: Country of the location
+        multiplier: Damage multiplier
+        is_healing_round: Whether the round heals instead of dealing damage
+        has_processed_round_timeout: Whether the round is over
+        start_time, end_time, timer_start_time: ISO 8601 times (None until known)
+    """
+
+    __slots__ = ('round_number', 'lat', 'lng', 'country_code', 'multiplier', 'is_healing_round',
+                 'has_processed_round_timeout', 'start_time', 'end_time', 'timer_start_time')
+
+    def __init__(self, round_number: int, lat: float, lng: float, country_code: Optional[str],
+                 multiplier: float = 1, is_healing_round: bool = False,
+                 has_processed_round_timeout: bool = False, start_time: Optional[str] = None,
+                 end_time: Optional[str] = None, timer_start_time: Optional[str] = None):
+        self.round_number = round_number
+        self.lat = lat
+        self.lng = lng
+        self.country_code = country_code
+        self.multiplier = multiplier
+        self.is_healing_round = is_healing_round
+        self.has_processed_round_timeout = has_processed_round_timeout
+        self.start_time = start_time
+        self.end_time = end_time
+        self.timer_start_time = timer_start_time
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DuelRound':
+        panorama = data.get('panorama') or {}
+        return cls(
+            data['roundNumber'],
+            panorama.get('lat'),
+            panorama.get('lng'),
+            _intern(panorama.get('countryCode')),
+            data.get('multiplier', 1),
+            data.get('isHealingRound', False),
+            data.get('hasProcessedRoundTimeout', False),
+            data.get('startTime'),
+            data.get('endTime'),
+            data.get('timerStartTime'),
+        )
+
+    def __repr__(self) -> str:
+        return f'DuelRound({self.round_number}, country={self.country_code!r}, multiplier={self.multiplier})'
+
+
+class DuelGame:
+    """
+    Duel game state.
+
+    Attributes:
+        game_id: Duel game ID
+        status: 'InProgress', 'Finished' or 'Paused'
+        current_round_number: Latest round number
+        version: Increments with every state update
+        initial_health: Starting health of each team
+        game_mode: options.competitiveGameMode, e.g. 'NoMoveDuels'
+        map_name: Name of the map
+        max_error_distance: The map's maxErrorDistance in meters, used by
+            the score formula
+        round_time: Seconds per round once the round timer has started
+        max_round_time: Longest a round can last in seconds (0 for no limit)
+        round_win_multiplier_increment: Party option used by GeoClassics
+            rules (None when the game does not set it)
+        rounds_without_damage_multiplier: Rounds played before multipliers start
+        is_team_duels: Whether teams have more than one player
+        teams: Both teams
+        rounds: Rounds played so far
+        winning_team_id: ID of the winning team (None until finished or on a draw)
+        winner_style: e.g. 'Victory' or 'ComebackVictory'
+        is_draw: Whether the game ended in a draw
+    """
+
+    __slots__ = ('game_id', 'status', 'current_round_number', 'version', 'initial_health', 'game_mode',
+                 'map_name', 'max_error_distance', 'round_time', 'max_round_time', 'round_win_multiplier_increment',
+                 'rounds_without_damage_multiplier', 'is_team_duels', 'teams', 'rounds', 'winning_team_id',
+                 'winner_style', 'is_draw')
+
+    def __init__(self, game_id: str, status: str, current_round_number: int, version: int,
+                 initial_health: int, game_mode: Optional[str], map_name: Optional[str],
+                 max_error_distance: Optional[float], round_time: Optional[int], max_round_time: Optional[int],
+                 round_win_multiplier_increment: Optional[float], rounds_without_damage_multiplier: Optional[int],
+                 is_team_duels: bool, teams: List[DuelTeam], rounds: List[DuelRound],
+                 winning_team_id: Optional[str] = None, winner_style: Optional[str] = None,
+                 is_draw: bool = False):
+        self.game_id = game_id
+        self.status = status
+        self.current_round_number = current_round_number
+        self.version = version
+        self.initial_health = initial_health
+        self.game_mode = game_mode
+        self.map_name = map_name
+        self.max_error_distance = max_error_distance
+        self.round_time = round_time
+        self.max_round_time = max_round_time
+        self.round_win_multiplier_increment = round_win_multiplier_increment
+        self.rounds_without_damage_multiplier = rounds_without_damage_multiplier
+        self.is_team_duels = is_team_duels
+        self.teams = teams
+        self.rounds = rounds
+        self.winning_team_id = winning_team_id
+        self.winner_style = winner_style
+        self.is_draw = is_draw
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DuelGame':
+        """Build a DuelGame from a decoded /api/duels/{gameId} response."""
+        options = data.get('options') or {}
+        result = data.get('result') or {}
+        game_map = options.get('map') or {}
+        return cls(
+            data['gameId'],
+            _intern(data['status']),
+            data.get('currentRoundNumber', 0),
+            data.get('version', 0),
+            data.get('initialHealth', options.get('initialHealth')),
+            _intern(options.get('competitiveGameMode')),
+            _intern(game_map.get('name')),
+            game_map.get('maxErrorDistance'),
+            options.get('roundTime'),
+            options.get('maxRoundTime'),
+            options.get('roundWinMultiplierIncrement'),
+            options.get('roundsWithoutDamageMultiplier'),
+            options.get('isTeamDuels', False),
+            [DuelTeam.from_dict(team) for team in data.get('teams', ())],
+            [DuelRound.from_dict(game_round) for game_round in data.get('rounds', ())],
+            _intern(result.get('winningTeamId')),
+            _intern(result.get('winnerStyle')),
+            result.get('isDraw', False),
+        )
+
+    @classmethod
+    def decode(cls, data: Union[bytes, str]) -> 'DuelGame':
+        """Decode a DuelGame from a raw response body."""
+        return cls.from_dict(fastjson.loads(data))
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status == 'Finished'
+
+    @property
+    def winner(self) -> Optional[DuelTeam]:
+        """The winning team, if the game has one."""
+        return self.team(self.winning_team_id) if self.winning_team_id else None
+
+    @property
+    def current_round(self) -> Optional[DuelRound]:
+        """The latest round, if one has started."""
+        return self.rounds[-1] if self.rounds else None
+
+    def team(self, team_id: str) -> Optional[DuelTeam]:
+        """Find a team by ID."""
+        return next((team for team in self.teams if team.id == team_id), None)
+
+    def players(self) -> Iterator[DuelPlayer]:
+        """Iterate over the players of both teams."""
+        for team in self.teams:
+            yield from team.players
+
+    def __repr__(self) -> str:
+        return f'DuelGame({self.game_id!r}, status={self.status!r}, round={self.current_round_number})'
+
+
+class ReplayEvent:
+    """
+    One replay event, with the payload fields flattened.
+
+    Fields the event type does not have are None.
+
+    Attributes:
+        time: Unix timestamp in milliseconds
+        type: Event type, e.g. 'PanoPov' (see EVENT_TYPES in geoguessr.replay)
+        lat, lng: PanoPosition, MapPosition, PinPosition and GuessWithLatLng
+        heading, pitch: PanoPov
+        zoom: PanoZoom and MapZoom
+        is_active: MapDisplay
+    """
+
+    __slots__ = ('time', 'type', 'lat', 'lng', 'heading', 'pitch', 'zoom', 'is_active')
+
+    def __init__(self, time: int, type: str, lat: Optional[float] = None, lng: Optional[float] = None,
+                 heading: Optional[float] = None, pitch: Optional[float] = None,
+                 zoom: Optional[float] = None, is_active: Optional[bool] = None):
+        self.time = time
+        self.type = type
+        self.lat = lat
+        self.lng = lng
+        self.heading = heading
+        self.pitch = pitch
+        self.zoom = zoom
+        self.is_active = is_active
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ReplayEvent':
+        payload = data.get('payload') or {}
+        return cls(data['time'], sys.intern(data['type']), payload.get('lat'), payload.get('lng'),
+                   payload.get('heading'), payload.get('pitch'), payload.get('zoom'), payload.get('isActive'))
+
+    @classmethod
+    def decode_list(cls, data: Union[bytes, str]) -> List['ReplayEvent']:
+        """Decode the events of a raw /api/replays/... response body."""
+        return [cls.from_dict(event) for event in fastjson.loads(data)]
+
+    def __repr__(self) -> str:
+        return f'ReplayEvent({self.time}, {self.type!r})'
+
+
+def as_game(game: Union[DuelGame, Dict[str, Any]]) -> DuelGame:
+    """Return game as a DuelGame, converting a decoded response dict if needed."""
+    return game if isinstance(game, DuelGame) else DuelGame.from_dict(game)
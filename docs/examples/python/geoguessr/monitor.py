@@ -0,0 +1,273 @@
+"""
+Live Duel Monitor
+
+Watches many live duels from one event loop and reports only what changed
+between polls: new rounds, new guesses, round results, health and status.
+Each game schedules its own next poll: right after the round timer runs
+out, at the base interval between rounds, and with growing delays while
+nothing changes. Finished games stop being polled.
+
+Usage:
+    monitor = DuelMonitor(interval=2.0)
+    monitor.subscribe(print)                                  # every change
+    monitor.subscribe(on_health, kinds=('health', 'finished'))
+    final_states = asyncio.run(monitor.run(game_ids))
+
+Requires: pip install aiohttp
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .async_client import AsyncGeoGuessrClient
+from .models import DuelGame, DuelPlayer, DuelTeam, parse_timestamp
+
+# Kinds of DuelChange, in the order they are reported for one poll
+CHANGE_KINDS = ('started', 'status', 'round', 'guess', 'round_result', 'health', 'finished', 'error')
+
+
+class DuelChange(NamedTuple):
+    """
+    One change between two polls of a duel.
+
+    Attributes:
+        game_id: Duel game ID
+        kind: One of CHANGE_KINDS
+        game: Latest known state (None for an error before the first poll)
+        team: Team the change belongs to ('guess', 'round_result', 'health')
+        player: Player who guessed ('guess')
+        data: DuelRound for 'round', DuelGuess for 'guess', TeamRoundResult
+            for 'round_result', (before, after) for 'health' and 'status',
+            the winning DuelTeam (None on a draw) for 'finished' and the
+            exception for 'error'
+    """
+    game_id: str
+    kind: str
+    game: Optional[DuelGame]
+    team: Optional[DuelTeam] = None
+    player: Optional[DuelPlayer] = None
+    data: Any = None
+
+    def __str__(self) -> str:
+        prefix = f'[{self.game_id}]'
+        if self.kind == 'started':
+            return f'{prefix} Watching: {self.game.status}, round {self.game.current_round_number}'
+        if self.kind == 'status':
+            return f'{prefix} Status {self.data[0]} -> {self.data[1]}'
+        if self.kind == 'round':
+            return f'{prefix} Round {self.data.round_number} started ({self.data.multiplier}x)'
+        if self.kind == 'guess':
+            return f'{prefix} Team {self.team.name}: {self.player.player_id[:8]} guessed'
+        if self.kind == 'round_result':
+            return (f'{prefix} Team {self.team.name}: round {self.data.round_number} score {self.data.score}, '
+                    f'damage {self.data.damage_dealt}')
+        if self.kind == 'health':
+            return f'{prefix} Team {self.team.name}: {self.data[0]} -> {self.data[1]} HP'
+        if self.kind == 'finished':
+            return f"{prefix} Finished, winner: {self.data.name if self.data else 'draw'}"
+        return f'{prefix} Error: {self.data!r}'
+
+
+def diff_games(old: Optional[DuelGame], new: DuelGame) -> List[DuelChange]:
+    """
+    List the changes between two states of the same duel.
+
+    Args:
+        old: Previous state, or None for the first poll (which reports only
+            'started', plus 'finished' if the game is already over)
+        new: Current state
+
+    Returns:
+        list: DuelChange objects in CHANGE_KINDS order
+    """
+    game_id = new.game_id
+    if old is None:
+        changes = [DuelChange(game_id, 'started', new)]
+        if new.is_finished:
+            changes.append(DuelChange(game_id, 'finished', new, data=new.winner))
+        return changes
+
+    if old.version == new.version and old.status == new.status:
+        return []
+
+    changes = []
+    if old.status != new.status:
+        changes.append(DuelChange(game_id, 'status', new, data=(old.status, new.status)))
+
+    last_round = old.rounds[-1].round_number if old.rounds else 0
+    changes.extend(DuelChange(game_id, 'round', new, data=game_round)
+                   for game_round in new.rounds if game_round.round_number > last_round)
+
+    health_changes = []
+    for team in new.teams:
+        old_team = old.team(team.id)
+        old_players = {player.player_id: player for player in old_team.players} if old_team else {}
+
+        for player in team.players:
+            old_player = old_players.get(player.player_id)
+            seen = len(old_player.guesses) if old_player else 0
+            changes.extend(DuelChange(game_id, 'guess', new, team, player, guess)
+                           for guess in player.guesses[seen:])
+
+        seen = len(old_team.round_results) if old_team else 0
+        changes.extend(DuelChange(game_id, 'round_result', new, team, data=result)
+                       for result in team.round_results[seen:])
+
+        if old_team and old_team.health != team.health:
+            health_changes.append(DuelChange(game_id, 'health', new, team, data=(old_team.health, team.health)))
+
+    changes.extend(health_changes)
+    if new.is_finished and not old.is_finished:
+        changes.append(DuelChange(game_id, 'finished', new, data=new.winner))
+    return changes
+
+
+Callback = Callable[[DuelChange], Any]
+
+
+class DuelMonitor:
+    """
+    Poll many duels concurrently and report their changes to callbacks.
+
+    Each watched game runs as its own task on the event loop, and all of
+    them share one AsyncGeoGuessrClient, so its per-host limit and rate
+    limiter apply to the whole bracket.
+
+    Args:
+        client: Client to poll with (a new one is created and closed by run()
+            when omitted)
+        interval: Seconds between polls while a game is changing
+        max_interval: Longest delay between polls of an idle or paused game
+        backoff: Factor the delay grows by after each poll without changes
+        grace: Seconds to wait after a round timer runs out before polling,
+            so the round result is processed
+        max_errors: Consecutive failed polls after which a game is dropped
+    """
+
+    def __init__(self, client: Optional[AsyncGeoGuessrClient] = None, interval: float = 2.0,
+                 max_interval: float = 30.0, backoff: float = 1.5, grace: float = 1.0, max_errors: int = 5):
+        self.client = client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.grace = grace
+        self.max_errors = max_errors
+        self.games: Dict[str, DuelGame] = {}
+        self.polls = 0
+        self._callbacks: List[Tuple[Callback, Optional[frozenset]]] = []
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._client: Optional[AsyncGeoGuessrClient] = None
+
+    def subscribe(self, callback: Callback, kinds: Optional[Iterable[str]] = None) -> None:
+        """
+        Call callback(change) for every change, or only for the given kinds.
+
+        Callbacks may be plain functions or coroutine functions.
+        """
+        self._callbacks.append((callback, frozenset(kinds) if kinds is not None else None))
+
+    def watch(self, game_id: str) -> None:
+        """Start polling a game (from inside the running event loop)."""
+        if game_id not in self._tasks or self._tasks[game_id].done():
+            self._tasks[game_id] = asyncio.ensure_future(self._watch(game_id))
+
+    def unwatch(self, game_id: str) -> None:
+        """Stop polling a game."""
+        task = self._tasks.pop(game_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def run(self, game_ids: Iterable[str] = ()) -> Dict[str, DuelGame]:
+        """
+        Watch the given games until every watched game has finished or been
+        dropped after max_errors failed polls.
+
+        Games added with watch() while running are waited for too.
+
+        Returns:
+            dict: Last known state of every game, by game ID
+        """
+        self._client = self.client or AsyncGeoGuessrClient()
+        try:
+            for game_id in game_ids:
+                self.watch(game_id)
+            while True:
+                pending = [task for task in self._tasks.values() if not task.done()]
+                if not pending:
+                    break
+                await asyncio.wait(pending)
+            for task in self._tasks.values():
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            if self.client is None:
+                await self._client.close()
+            self._client = None
+        return self.games
+
+    async def _emit(self, changes: List[DuelChange]) -> None:
+        for change in changes:
+            for callback, kinds in self._callbacks:
+                if kinds is None or change.kind in kinds:
+                    result = callback(change)
+                    if inspect.isawaitable(result):
+                        await result
+
+    async def _watch(self, game_id: str) -> None:
+        delay = self.interval
+        errors = 0
+
+        while True:
+            old = self.games.get(game_id)
+            try:
+                self.polls += 1
+                game = DuelGame.from_dict(await self._client.get_duel(game_id))
+            except Exception as e:
+                errors += 1
+                await self._emit([DuelChange(game_id, 'error', old, data=e)])
+                if errors >= self.max_errors:
+                    return
+                await asyncio.sleep(min(self.interval * self.backoff ** errors, self.max_interval))
+                continue
+
+            errors = 0
+            changes = diff_games(old, game)
+            self.games[game_id] = game
+            await self._emit(changes)
+
+            if game.is_finished:
+                return
+
+            delay = self.next_delay(game, delay if old is not None and not changes else None)
+            await asyncio.sleep(delay)
+
+    def next_delay(self, game: DuelGame, idle_delay: Optional[float] = None) -> float:
+        """
+        Seconds until the next poll of a game.
+
+        Args:
+            game: Latest state
+            idle_delay: Previous delay if the last poll found no changes, or
+                None if it did
+
+        Returns:
+            float: interval after a change, growing by backoff while idle,
+            capped at max_interval, and cut short to poll grace seconds
+            after the current round timer runs out
+        """
+        if game.status == 'Paused':
+            return self.max_interval
+
+        delay = self.interval if idle_delay is None else min(idle_delay * self.backoff, self.max_interval)
+
+        current = game.current_round
+        if current and not current.has_processed_round_timeout and current.timer_start_time and game.round_time:
+            remaining = parse_timestamp(current.timer_start_time) + game.round_time + self.grace - time.time()
+            if remaining <= 0:
+                # Timer ran out: the result is due any moment
+                return self.interval
+            delay = min(delay, remaining)
+
+        return delay
@@ -0,0 +1,208 @@
+"""
+Adaptive Rate Limiting
+
+A token bucket per host (www.geoguessr.com and game-server.geoguessr.com)
+that slows down when the API answers 429 or 5xx and speeds back up slowly
+while requests succeed (additive increase, multiplicative decrease). The
+buckets never sleep themselves: reserve() returns how long the caller must
+wait, so the same limiter is shared by worker threads (time.sleep) and
+asyncio tasks (asyncio.sleep) in one process.
+
+Usage:
+    limiter = get_rate_limiter()           # process-wide, used by both clients
+    limiter.configure('game-server.geoguessr.com', rate=5, burst=10)
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+
+# Statuses that mean "slow down and try again"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adjustable rate.
+
+    Args:
+        rate: Requests per second to start at
+        burst: Requests allowed back-to-back after an idle period
+        min_rate: Lowest rate throttling can push the bucket to
+        max_rate: Highest rate successes can raise the bucket to
+        increase: Requests per second added after each success
+        decrease: Factor the rate is multiplied by when throttled
+    """
+
+    def __init__(self, rate: float = 10.0, burst: float = 20.0, min_rate: float = 0.5,
+                 max_rate: Optional[float] = None, increase: float = 0.05, decrease: float = 0.5):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 2
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = burst
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token, possibly going into debt.
+
+        Returns:
+            float: Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def on_success(self) -> None:
+        """Raise the rate a little after a successful request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Cut the rate after a 429/5xx and pause for Retry-After if given.
+
+        Concurrent requests often fail together, so the rate is cut at most
+        once per second.
+
+        Args:
+            retry_after: Seconds the server asked us to wait (optional)
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            if now - self._last_decrease >= 1.0:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by host, created on first use.
+
+    Args:
+        rate: Default starting requests per second for each host
+        burst: Default burst size for each host
+        **bucket_options: Other TokenBucket arguments applied to every host
+    """
+
+    def __init__(self, rate: float = 10.0, burst: float = 20.0, **bucket_options: float):
+        self.rate = rate
+        self.burst = burst
+        self.bucket_options = bucket_options
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, **bucket_options: float) -> TokenBucket:
+        """
+        Replace the bucket for a host with one using custom settings.
+
+        Args:
+            host: Host name, e.g. 'game-server.geoguessr.com'
+            **bucket_options: TokenBucket arguments
+
+        Returns:
+            TokenBucket: The new bucket
+        """
+        options = {'rate': self.rate, 'burst': self.burst, **self.bucket_options, **bucket_options}
+        with self._lock:
+            bucket = self._buckets[host] = TokenBucket(**options)
+        return bucket
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Return the bucket for a URL's host."""
+        host = urlsplit(url).hostname or ''
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    bucket = self._buckets[host] = TokenBucket(self.rate, self.burst, **self.bucket_options)
+        return bucket
+
+
+class RetryPolicy:
+    """
+    Retry with full-jitter exponential backoff.
+
+    Args:
+        max_retries: Retries after the first attempt (0 disables retrying)
+        base: Backoff for the first retry, in seconds
+        cap: Longest backoff, in seconds
+        statuses: HTTP statuses that are retried
+    """
+
+    def __init__(self, max_retries: int = 5, base: float = 0.5, cap: float = 30.0,
+                 statuses: frozenset = RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+        self.statuses = statuses
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number attempt (0-based).
+
+        Never shorter than the server's Retry-After.
+        """
+        delay = random.uniform(0, min(self.cap, self.base * (2 ** attempt)))
+        return max(delay, retry_after or 0.0)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Read a Retry-After header given in seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter shared by all clients."""
+    global _rate_limiter
+
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
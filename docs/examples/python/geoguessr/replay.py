@@ -0,0 +1,291 @@
+"""
+Columnar Replay Events
+
+Converts replay events (see ReplayEvent in duels.md) into typed NumPy columns
+once, then analyzes them in a single vectorized pass instead of filtering the
+list of dicts once per event type. Many replays can be stacked into one set
+of columns and summarized together.
+
+Usage:
+    columns = to_columns(events)
+    summary = summarize_replay(columns)
+
+    stacked = ReplayColumns.concat([to_columns(e) for e in many_replays])
+    summaries = summarize_replays(stacked)  # one array entry per replay
+
+Requires: pip install numpy
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+EVENT_TYPES = (
+    'PanoPosition',
+    'PanoPov',
+    'PanoZoom',
+    'MapDisplay',
+    'MapPosition',
+    'MapZoom',
+    'PinPosition',
+    'GuessWithLatLng',
+)
+
+TYPE_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+# Code used for event types not listed in EVENT_TYPES
+UNKNOWN_TYPE = len(EVENT_TYPES)
+
+PANO_POSITION = TYPE_CODES['PanoPosition']
+PANO_POV = TYPE_CODES['PanoPov']
+PANO_ZOOM = TYPE_CODES['PanoZoom']
+MAP_DISPLAY = TYPE_CODES['MapDisplay']
+MAP_POSITION = TYPE_CODES['MapPosition']
+MAP_ZOOM = TYPE_CODES['MapZoom']
+PIN_POSITION = TYPE_CODES['PinPosition']
+GUESS = TYPE_CODES['GuessWithLatLng']
+
+NAN = float('nan')
+
+
+class ReplayColumns:
+    """
+    Replay events stored as parallel NumPy arrays.
+
+    Payload fields an event does not have are NaN (floats) or -1 (active).
+
+    Attributes:
+        time: Event timestamps in milliseconds (int64)
+        type: Event type codes, see EVENT_TYPES (int8)
+        lat, lng: Coordinates for position, pin and guess events (float64)
+        heading, pitch: Camera direction for PanoPov events (float32)
+        zoom: Zoom level for PanoZoom and MapZoom events (float32)
+        active: MapDisplay isActive as 1/0 (a missing isActive is 0), -1 for other events (int8)
+        offsets: Start index of each replay plus the total length, so replay
+            i spans offsets[i]:offsets[i + 1]
+    """
+
+    __slots__ = ('time', 'type', 'lat', 'lng', 'heading', 'pitch', 'zoom', 'active', 'offsets')
+
+    COLUMNS = ('time', 'type', 'lat', 'lng', 'heading', 'pitch', 'zoom', 'active')
+
+    def __init__(self, time: np.ndarray, type: np.ndarray, lat: np.ndarray, lng: np.ndarray,
+                 heading: np.ndarray, pitch: np.ndarray, zoom: np.ndarray, active: np.ndarray,
+                 offsets: Optional[np.ndarray] = None):
+        self.time = time
+        self.type = type
+        self.lat = lat
+        self.lng = lng
+        self.heading = heading
+        self.pitch = pitch
+        self.zoom = zoom
+        self.active = active
+        self.offsets = offsets if offsets is not None else np.array([0, len(time)], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @property
+    def replay_count(self) -> int:
+        """Number of replays stored in these columns."""
+        return len(self.offsets) - 1
+
+    @property
+    def replay_index(self) -> np.ndarray:
+        """Replay number of every event (int32)."""
+        return np.repeat(np.arange(self.replay_count, dtype=np.int32), np.diff(self.offsets))
+
+    @classmethod
+    def concat(cls, parts: Sequence['ReplayColumns']) -> 'ReplayColumns':
+        """
+        Stack several replays into one set of columns.
+
+        Args:
+            parts: Columns for each replay, in order
+
+        Returns:
+            ReplayColumns: Columns whose offsets mark each input replay
+        """
+        lengths = [len(part) for part in parts]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        columns = {}
+        for name in cls.COLUMNS:
+            arrays = [getattr(part, name) for part in parts]
+            columns[name] = np.concatenate(arrays) if arrays else _empty(name)
+
+        return cls(offsets=offsets, **columns)
+
+
+_DTYPES = {
+    'time': np.int64,
+    'type': np.int8,
+    'lat': np.float64,
+    'lng': np.float64,
+    'heading': np.float32,
+    'pitch': np.float32,
+    'zoom': np.float32,
+    'active': np.int8,
+}
+
+
+def _empty(name: str) -> np.ndarray:
+    return np.empty(0, dtype=_DTYPES[name])
+
+
+def to_columns(events: List[Dict]) -> ReplayColumns:
+    """
+    Convert one replay's events to columns in a single pass.
+
+    Args:
+        events: Replay events from the replays endpoint
+
+    Returns:
+        ReplayColumns: Typed columns for the replay
+    """
+    times, types, lats, lngs, headings, pitches, zooms, actives = [], [], [], [], [], [], [], []
+
+    for event in events:
+        payload = event.get('payload') or {}
+        event_type = TYPE_CODES.get(event['type'], UNKNOWN_TYPE)
+        active = payload.get('isActive')
+        if active is None:
+            # A MapDisplay event without isActive is a close
+            active = 0 if event_type == MAP_DISPLAY else -1
+
+        times.append(event['time'])
+        types.append(event_type)
+        lats.append(payload.get('lat', NAN))
+        lngs.append(payload.get('lng', NAN))
+        headings.append(payload.get('heading', NAN))
+        pitches.append(payload.get('pitch', NAN))
+        zooms.append(payload.get('zoom', NAN))
+        actives.append(int(active))
+
+    return ReplayColumns(
+        time=np.array(times, dtype=_DTYPES['time']),
+        type=np.array(types, dtype=_DTYPES['type']),
+        lat=np.array(lats, dtype=_DTYPES['lat']),
+        lng=np.array(lngs, dtype=_DTYPES['lng']),
+        heading=np.array(headings, dtype=_DTYPES['heading']),
+        pitch=np.array(pitches, dtype=_DTYPES['pitch']),
+        zoom=np.array(zooms, dtype=_DTYPES['zoom']),
+        active=np.array(actives, dtype=_DTYPES['active']),
+    )
+
+
+def first_index(mask: np.ndarray, replay_index: np.ndarray, replay_count: int) -> np.ndarray:
+    """
+    Find the first matching event of every replay.
+
+    Args:
+        mask: One boolean per event, e.g. columns.type == GUESS
+        replay_index: Replay of each event (ReplayColumns.replay_index)
+        replay_count: Number of replays
+
+    Returns:
+        np.ndarray: Per replay, the event index of its first True in mask,
+            or -1 if it has none (int64)
+    """
+    positions = np.flatnonzero(mask)
+    first = np.full(replay_count, -1, dtype=np.int64)
+    replays, first_of_each = np.unique(replay_index[positions], return_index=True)
+    first[replays] = positions[first_of_each]
+    return first
+
+
+def _take(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """values[index] as float64, with NaN wherever index is -1."""
+    result = np.full(len(index), NAN)
+    found = index >= 0
+    result[found] = values[index[found]]
+    return result
+
+
+def summarize_replays(columns: ReplayColumns) -> Dict[str, np.ndarray]:
+    """
+    Compute behavior statistics for every replay in one vectorized pass.
+
+    Args:
+        columns: Columns holding one or more replays
+
+    Returns:
+        dict: Arrays with one entry per replay:
+            event_count, type_counts (replays x event types, last column is
+            unknown types), total_seconds, map_opens, map_closes,
+            pin_adjustments, zoom_changes, pov_changes, time_to_guess,
+            guess_lat, guess_lng, first_map_open, heading_range.
+            Times are seconds from the replay's first event; NaN means the
+            event did not happen.
+    """
+    count = columns.replay_count
+    replay_index = columns.replay_index
+    starts, ends = columns.offsets[:-1], columns.offsets[1:]
+    event_count = ends - starts
+    nonempty = event_count > 0
+
+    type_counts = np.bincount(
+        replay_index.astype(np.int64) * (UNKNOWN_TYPE + 1) + columns.type,
+        minlength=count * (UNKNOWN_TYPE + 1),
+    ).reshape(count, UNKNOWN_TYPE + 1)
+
+    start_time = np.full(count, NAN)
+    end_time = np.full(count, NAN)
+    start_time[nonempty] = columns.time[starts[nonempty]]
+    end_time[nonempty] = columns.time[ends[nonempty] - 1]
+
+    is_map_display = columns.type == MAP_DISPLAY
+    map_open = is_map_display & (columns.active == 1)
+    map_close = is_map_display & (columns.active == 0)
+
+    first_guess = first_index(columns.type == GUESS, replay_index, count)
+    first_open = first_index(map_open, replay_index, count)
+
+    heading = np.where(columns.type == PANO_POV, columns.heading, np.float32(NAN))
+    heading_range = np.full(count, NAN)
+    if nonempty.any():
+        segment_starts = starts[nonempty]
+        heading_range[nonempty] = (np.fmax.reduceat(heading, segment_starts)
+                                   - np.fmin.reduceat(heading, segment_starts))
+
+    return {
+        'event_count': event_count,
+        'type_counts': type_counts,
+        'total_seconds': (end_time - start_time) / 1000,
+        'map_opens': np.bincount(replay_index, weights=map_open, minlength=count).astype(np.int64),
+        'map_closes': np.bincount(replay_index, weights=map_close, minlength=count).astype(np.int64),
+        'pin_adjustments': type_counts[:, PIN_POSITION],
+        'zoom_changes': type_counts[:, PANO_ZOOM],
+        'pov_changes': type_counts[:, PANO_POV],
+        'time_to_guess': (_take(columns.time, first_guess) - start_time) / 1000,
+        'guess_lat': _take(columns.lat, first_guess),
+        'guess_lng': _take(columns.lng, first_guess),
+        'first_map_open': (_take(columns.time, first_open) - start_time) / 1000,
+        'heading_range': heading_range,
+    }
+
+
+def summarize_replay(columns: ReplayColumns) -> Dict[str, Any]:
+    """
+    Compute behavior statistics for a single replay.
+
+    Args:
+        columns: Columns from to_columns()
+
+    Returns:
+        dict: Same keys as summarize_replays() with plain Python scalars.
+        type_counts maps event type names to counts.
+    """
+    summary = summarize_replays(columns)
+    result = {key: value[0].item() for key, value in summary.items() if key != 'type_counts'}
+
+    type_counts = summary['type_counts'][0]
+    result['type_counts'] = {
+        event_type: int(type_counts[code]) for code, event_type in enumerate(EVENT_TYPES) if type_counts[code]
+    }
+    if type_counts[UNKNOWN_TYPE]:
+        result['type_counts']['Unknown'] = int(type_counts[UNKNOWN_TYPE])
+
+    return result
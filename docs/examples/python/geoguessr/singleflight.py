@@ -0,0 +1,111 @@
+"""
+Single-Flight Request Coalescing
+
+When several callers ask for the same thing at the same time, only the
+first one does the work; the others wait for it and receive the same result
+(or the same exception). Used by both clients so concurrent dashboards that
+request e.g. the same challenge leaderboard share one upstream request.
+
+Results are shared objects: callers must not modify them.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescing of identical concurrent calls.
+
+    Attributes:
+        coalesced: Number of calls that were served by another caller's work
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() unless a call with the same key is already in flight.
+
+        Args:
+            key: Identifies identical calls (e.g. the request URL)
+            fn: Function doing the work
+
+        Returns:
+            The result of fn(), possibly produced for another caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    Coalescing of identical concurrent coroutine calls on one event loop.
+
+    Attributes:
+        coalesced: Number of calls that were served by another caller's work
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn() unless a call with the same key is already in flight.
+
+        The shared work keeps running if the caller that started it is
+        cancelled, so the other waiters still get their result.
+
+        Args:
+            key: Identifies identical calls (e.g. the request URL)
+            fn: Coroutine function doing the work
+
+        Returns:
+            The result of fn(), possibly produced for another caller
+        """
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(future)
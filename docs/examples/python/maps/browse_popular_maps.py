@@ -13,8 +13,13 @@ Note: This endpoint does NOT require authentication
 """
 
 import requests
+import os
+import sys
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import get_client  # noqa: E402
+
 
 def browse_popular_maps():
     """
@@ -27,7 +32,7 @@ def browse_popular_maps():
         url = 'https://www.geoguessr.com/api/v3/maps/browse/popular'
 
         # Note: No authentication required for browsing maps
-        response = requests.get(url)
+        response = get_client().get(url)
         response.raise_for_status()
 
         maps = response.json()
@@ -85,7 +90,7 @@ def browse_popular_maps():
 def browse_featured_maps():
     """Fetch featured maps."""
     try:
-        response = requests.get('https://www.geoguessr.com/api/v3/maps/browse/featured')
+        response = get_client().get('https://www.geoguessr.com/api/v3/maps/browse/featured')
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -96,7 +101,7 @@ def browse_featured_maps():
 def browse_new_maps():
     """Fetch new maps."""
     try:
-        response = requests.get('https://www.geoguessr.com/api/v3/maps/browse/new')
+        response = get_client().get('https://www.geoguessr.com/api/v3/maps/browse/new')
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -107,7 +112,7 @@ def browse_new_maps():
 def browse_hot_maps():
     """Fetch hot/trending maps."""
     try:
-        response = requests.get('https://www.geoguessr.com/api/v3/maps/browse/hot')
+        response = get_client().get('https://www.geoguessr.com/api/v3/maps/browse/hot')
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -13,6 +13,11 @@ Note: This endpoint does NOT require authentication
 """
 
 import requests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import get_client  # noqa: E402
 
 
 def search_maps(query):
@@ -29,7 +34,7 @@ def search_maps(query):
         url = f'https://www.geoguessr.com/api/v3/search/map?q={query}'
 
         # Note: No authentication required for searching maps
-        response = requests.get(url)
+        response = get_client().get(url)
         response.raise_for_status()
 
         maps = response.json()
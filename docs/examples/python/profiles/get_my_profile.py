@@ -11,9 +11,13 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def get_my_profile(cookie):
     """
@@ -26,10 +30,7 @@ def get_my_profile(cookie):
         dict: Your profile data
     """
     try:
-        response = requests.get(
-            'https://www.geoguessr.com/api/v3/profiles',
-            cookies={'_ncfa': cookie}
-        )
+        response = get_client(cookie).get(endpoints.PROFILE)
         response.raise_for_status()
 
         profile = response.json()
@@ -11,8 +11,12 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def search_users(query, cookie):
     """
@@ -30,9 +34,9 @@ def search_users(query, cookie):
             print('❌ Search query cannot be empty')
             return None
 
-        url = f'https://www.geoguessr.com/api/v3/search/user?q={query}'
+        url = f'{endpoints.SEARCH_USERS}?q={query}'
 
-        response = requests.get(url, cookies={'_ncfa': cookie})
+        response = get_client(cookie).get(url)
         response.raise_for_status()
 
         results = response.json()
@@ -11,9 +11,13 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def get_friends_list(cookie):
     """
@@ -26,10 +30,7 @@ def get_friends_list(cookie):
         list: List of friends
     """
     try:
-        response = requests.get(
-            'https://www.geoguessr.com/api/v3/social/friends',
-            cookies={'_ncfa': cookie}
-        )
+        response = get_client(cookie).get(endpoints.FRIENDS)
         response.raise_for_status()
 
         friends = response.json()
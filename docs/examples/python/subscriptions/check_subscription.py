@@ -11,9 +11,13 @@ Requirements:
 """
 
 import requests
+import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def check_subscription(cookie):
     """
@@ -26,10 +30,7 @@ def check_subscription(cookie):
         dict: Subscription object
     """
     try:
-        response = requests.get(
-            'https://www.geoguessr.com/api/v3/subscriptions',
-            cookies={'_ncfa': cookie}
-        )
+        response = get_client(cookie).get(endpoints.SUBSCRIPTION)
 
         if response.status_code == 404:
             print('❌ No active subscription found.')
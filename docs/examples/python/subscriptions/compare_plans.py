@@ -13,8 +13,13 @@ Note: This endpoint does NOT require authentication
 """
 
 import requests
+import os
+import sys
 from collections import defaultdict
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geoguessr import endpoints, get_client  # noqa: E402
+
 
 def get_product_name(product_id):
     """Get human-readable product name."""
@@ -36,7 +41,7 @@ def compare_plans():
     """
     try:
         # No authentication required for this endpoint
-        response = requests.get('https://www.geoguessr.com/api/v3/subscriptions/plans')
+        response = get_client().get(endpoints.SUBSCRIPTION_PLANS)
         response.raise_for_status()
 
         plans = response.json()